@@ -0,0 +1,210 @@
+"""
+Detección adaptativa para reducir el costo de MediaPipe
+=======================================================
+Reemplaza el ``cvtColor`` + ``hands.process`` de cuadro completo por:
+
+    - ROI: si hubo mano en el frame anterior, se recorta un cuadrado con
+      margen alrededor de sus landmarks y solo eso se convierte y procesa.
+      Los landmarks se re-proyectan a coordenadas del frame completo (in situ
+      sobre el proto de MediaPipe, así el overlay los dibuja bien). Si en el
+      recorte no aparece la mano, se reintenta con el frame completo.
+    - Reposo: sin mano, la detección corre sobre el frame reducido a
+      ``idle_scale`` (las coordenadas normalizadas no cambian).
+    - Salto por movimiento: si la miniatura en gris del ROI casi no cambió
+      respecto del frame anterior, no se corre MediaPipe y se reutiliza el
+      último resultado (como máximo ``max_skip`` frames seguidos).
+    - Reutilizar predicción: si los landmarks se movieron menos que
+      ``landmark_threshold`` (relativo al tamaño de la mano), el tracker no
+      vuelve a llamar al modelo ONNX y devuelve la letra ya estabilizada
+      (ese frame no suma evidencia al suavizado ni a la ventana de secuencias).
+"""
+
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+from metrics import STAGE_CONVERT, STAGE_MEDIAPIPE
+
+THUMB_SIZE = 32
+
+
+class AdaptiveDetector:
+    """
+    Envuelve una instancia de MediaPipe Hands con ROI, reposo y salto por movimiento.
+
+    Args:
+        hands: Instancia de ``mp.solutions.hands.Hands``
+        roi_padding: Margen del ROI como fracción del tamaño de la mano
+        min_roi: Lado mínimo del ROI en píxeles
+        idle_scale: Escala del frame cuando no hay mano (1.0 = sin reducir)
+        motion_threshold: Diferencia media de gris (0-255) bajo la cual se
+            salta MediaPipe (0 desactiva el salto)
+        landmark_threshold: Desplazamiento medio de landmarks, relativo al
+            tamaño de la mano, bajo el cual se reutiliza la predicción
+            (0 desactiva)
+        max_skip: Máximo de frames seguidos sin correr MediaPipe
+    """
+
+    def __init__(self, hands, roi_padding: float = 0.35, min_roi: int = 96,
+                 idle_scale: float = 0.5, motion_threshold: float = 2.0,
+                 landmark_threshold: float = 0.015, max_skip: int = 4):
+        self.hands = hands
+        self.roi_padding = float(roi_padding)
+        self.min_roi = int(min_roi)
+        self.idle_scale = float(idle_scale)
+        self.motion_threshold = float(motion_threshold)
+        self.landmark_threshold = float(landmark_threshold)
+        self.max_skip = int(max_skip)
+
+        self._last_hand = None
+        self._points = np.zeros((21, 2), dtype=np.float32)
+        self._predicted_points = np.zeros((21, 2), dtype=np.float32)
+        self._has_prediction = False
+        self._roi = None
+        self._skipped = 0
+        self._thumb_bgr = np.zeros((THUMB_SIZE, THUMB_SIZE, 3), dtype=np.uint8)
+        self._thumb = np.zeros((THUMB_SIZE, THUMB_SIZE), dtype=np.uint8)
+        self._prev_thumb = np.zeros((THUMB_SIZE, THUMB_SIZE), dtype=np.uint8)
+        self._diff = np.zeros((THUMB_SIZE, THUMB_SIZE), dtype=np.uint8)
+        self._has_thumb = False
+
+        self.stats: Dict[str, int] = {
+            "frames": 0, "roi": 0, "roi_miss": 0, "full": 0, "idle": 0,
+            "skipped": 0, "reused_predictions": 0,
+        }
+
+    def reset(self):
+        """Olvida la mano anterior (p. ej. al cambiar el modo espejo)."""
+        self._last_hand = None
+        self._has_prediction = False
+        self._has_thumb = False
+        self._roi = None
+        self._skipped = 0
+
+    def _compute_roi(self, width: int, height: int) -> Tuple[int, int, int, int]:
+        pts = self._points
+        x_min, y_min = pts.min(axis=0)
+        x_max, y_max = pts.max(axis=0)
+        size = max((x_max - x_min) * width, (y_max - y_min) * height)
+        side = int(max(self.min_roi, size * (1.0 + 2.0 * self.roi_padding)))
+        side = min(side, width, height)
+        cx = (x_min + x_max) * 0.5 * width
+        cy = (y_min + y_max) * 0.5 * height
+        x0 = int(np.clip(cx - side / 2, 0, width - side))
+        y0 = int(np.clip(cy - side / 2, 0, height - side))
+        return x0, y0, x0 + side, y0 + side
+
+    def _motion(self, roi_bgr: np.ndarray) -> float:
+        cv2.resize(roi_bgr, (THUMB_SIZE, THUMB_SIZE), dst=self._thumb_bgr, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._thumb_bgr, cv2.COLOR_BGR2GRAY, dst=self._thumb)
+        if not self._has_thumb:
+            motion = float("inf")
+        else:
+            cv2.absdiff(self._thumb, self._prev_thumb, dst=self._diff)
+            motion = cv2.mean(self._diff)[0]
+        self._thumb, self._prev_thumb = self._prev_thumb, self._thumb
+        self._has_thumb = True
+        return motion
+
+    def _process(self, bgr: np.ndarray, metrics):
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        if metrics is not None:
+            metrics.lap(STAGE_CONVERT)
+        results = self.hands.process(rgb)
+        if metrics is not None:
+            metrics.lap(STAGE_MEDIAPIPE)
+        return results.multi_hand_landmarks[0] if results.multi_hand_landmarks else None
+
+    def _store_points(self, hand_landmarks, x0: float = 0.0, y0: float = 0.0,
+                      sx: float = 1.0, sy: float = 1.0):
+        """Copia x, y a ``_points``; con ROI re-proyecta el proto al frame completo."""
+        pts = self._points
+        remap = sx != 1.0 or sy != 1.0 or x0 or y0
+        for i, landmark in enumerate(hand_landmarks.landmark):
+            if remap:
+                landmark.x = x0 + landmark.x * sx
+                landmark.y = y0 + landmark.y * sy
+                landmark.z = landmark.z * sx
+            pts[i, 0] = landmark.x
+            pts[i, 1] = landmark.y
+
+    def detect(self, frame: np.ndarray, metrics=None):
+        """
+        Detecta la mano en un frame BGR.
+
+        Returns:
+            Tupla (hand_landmarks o None, reutilizar_predicción). Si el segundo
+            valor es True el llamador puede conservar la letra anterior.
+        """
+        self.stats["frames"] += 1
+        height, width = frame.shape[:2]
+
+        if self._last_hand is not None:
+            x0, y0, x1, y1 = self._compute_roi(width, height)
+            # ROI "pegajoso": pequeños corrimientos no invalidan la miniatura
+            if self._roi is not None and \
+                    max(abs(a - b) for a, b in zip(self._roi, (x0, y0, x1, y1))) < 0.1 * (x1 - x0):
+                x0, y0, x1, y1 = self._roi
+            roi = frame[y0:y1, x0:x1]
+
+            if self.motion_threshold > 0 and self._roi == (x0, y0, x1, y1):
+                motion = self._motion(roi)
+                if motion < self.motion_threshold and self._skipped < self.max_skip:
+                    self._skipped += 1
+                    self.stats["skipped"] += 1
+                    self.stats["reused_predictions"] += 1
+                    return self._last_hand, self._has_prediction
+            elif self.motion_threshold > 0:
+                self._has_thumb = False
+                self._motion(roi)
+            self._skipped = 0
+            self._roi = (x0, y0, x1, y1)
+
+            hand = self._process(roi, metrics)
+            if hand is not None:
+                self.stats["roi"] += 1
+                self._store_points(hand, x0 / width, y0 / height,
+                                   (x1 - x0) / width, (y1 - y0) / height)
+                return self._finish(hand)
+            self.stats["roi_miss"] += 1
+
+        # Frame completo (tras perder la mano en el ROI) o reducido en reposo
+        idle = self._last_hand is None
+        source = frame
+        if idle and 0.0 < self.idle_scale < 1.0:
+            source = cv2.resize(frame, None, fx=self.idle_scale, fy=self.idle_scale,
+                                interpolation=cv2.INTER_AREA)
+            self.stats["idle"] += 1
+        else:
+            self.stats["full"] += 1
+
+        hand = self._process(source, metrics)
+        if hand is None:
+            self.reset()
+            return None, False
+        self._store_points(hand)
+        return self._finish(hand)
+
+    def _finish(self, hand):
+        """Decide si los landmarks se movieron lo suficiente como para volver a predecir."""
+        self._last_hand = hand
+        reuse = False
+        if self._has_prediction and self.landmark_threshold > 0:
+            pts = self._points
+            extent = float(np.ptp(pts, axis=0).max()) or 1.0
+            displacement = float(np.abs(pts - self._predicted_points).mean()) / extent
+            reuse = displacement < self.landmark_threshold
+        if reuse:
+            self.stats["reused_predictions"] += 1
+        else:
+            np.copyto(self._predicted_points, self._points)
+            self._has_prediction = True
+        return hand, reuse
+
+    def summary(self) -> str:
+        s = self.stats
+        frames = max(1, s["frames"])
+        return (f"{s['frames']} frames | ROI {s['roi']} (fallos {s['roi_miss']}) | completo {s['full']} | "
+                f"reposo {s['idle']} | sin MediaPipe {s['skipped']} ({s['skipped'] / frames:.0%}) | "
+                f"predicción reutilizada {s['reused_predictions']} ({s['reused_predictions'] / frames:.0%})")
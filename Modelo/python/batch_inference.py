@@ -0,0 +1,368 @@
+"""
+Inferencia offline por lotes
+============================
+Re-evalúa sesiones grabadas sin cámara: recorre videos, carpetas de imágenes
+o archivos de landmarks ya extraídos, corre MediaPipe (con salto de frames),
+acumula los landmarks en arrays grandes y los evalúa con el modelo ONNX en
+lotes de N x 63 en lugar de una fila por frame. Si el modelo declara
+features (model.features.json, ver features.py) se calculan para todas las
+filas en una sola operación antes de la inferencia.
+
+El resultado es un archivo columnar (.npz, o .csv) con una fila por frame
+procesado: source, frame, hand_detected, letter, confidence.
+
+Uso:
+    python hand_tracker.py batch sesion1.mp4 sesion2.mp4 capturas/ -o scores.npz
+    python hand_tracker.py batch landmarks.npz --model nuevo_modelo.onnx -o scores.csv
+"""
+
+import argparse
+import csv
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from features import FeatureExtractor, check_input_width, load_spec
+from onnx_model import create_session, predict_batch
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+LANDMARK_EXTENSIONS = ('.npz', '.lmrec')
+
+
+class LandmarkAccumulator:
+    """Acumula filas de 63 landmarks en bloques preasignados (sin listas por frame)."""
+
+    def __init__(self, block_size: int = 4096):
+        self.block_size = block_size
+        self._blocks: List[np.ndarray] = []
+        self._frames: List[np.ndarray] = []
+        self._detected: List[np.ndarray] = []
+        self._new_block()
+
+    def _new_block(self):
+        self._block = np.zeros((self.block_size, 63), dtype=np.float32)
+        self._block_frames = np.zeros(self.block_size, dtype=np.int32)
+        self._block_detected = np.zeros(self.block_size, dtype=bool)
+        self._fill = 0
+
+    def _flush(self):
+        if self._fill:
+            self._blocks.append(self._block[:self._fill])
+            self._frames.append(self._block_frames[:self._fill])
+            self._detected.append(self._block_detected[:self._fill])
+
+    def row(self, frame_index: int, detected: bool) -> np.ndarray:
+        """Reserva la siguiente fila y devuelve su vista (21, 3) para escribir in situ."""
+        if self._fill == self.block_size:
+            self._flush()
+            self._new_block()
+        i = self._fill
+        self._fill += 1
+        self._block_frames[i] = frame_index
+        self._block_detected[i] = detected
+        return self._block[i].reshape(21, 3)
+
+    def finish(self) -> Dict[str, np.ndarray]:
+        self._flush()
+        self._new_block()
+        if not self._blocks:
+            return {
+                "frame": np.zeros(0, dtype=np.int32),
+                "hand_detected": np.zeros(0, dtype=bool),
+                "landmarks": np.zeros((0, 63), dtype=np.float32),
+            }
+        return {
+            "frame": np.concatenate(self._frames),
+            "hand_detected": np.concatenate(self._detected),
+            "landmarks": np.concatenate(self._blocks),
+        }
+
+
+def list_images(path: str) -> List[str]:
+    """Nombres de imagen de una carpeta, en orden."""
+    return sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def count_frames(path: str) -> int:
+    """Cantidad de frames de un video o carpeta (0 si el contenedor no la reporta)."""
+    if os.path.isdir(path):
+        return len(list_images(path))
+    cap = cv2.VideoCapture(path)
+    try:
+        return max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT))) if cap.isOpened() else 0
+    finally:
+        cap.release()
+
+
+def iter_frames(path: str, stride: int = 1, max_frames: Optional[int] = None,
+                start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Recorre los frames BGR de un video o de una carpeta de imágenes.
+
+    Los frames saltados por ``stride`` en un video solo se ``grab``-ean (no se
+    decodifican). ``start`` / ``stop`` delimitan un rango de índices absolutos
+    (para repartir un mismo archivo entre procesos).
+
+    Yields:
+        Tuplas (índice_de_frame, frame_bgr)
+    """
+    stride = max(1, int(stride))
+    emitted = 0
+
+    if os.path.isdir(path):
+        names = list_images(path)
+        end = len(names) if stop is None else min(stop, len(names))
+        first = -(-start // stride) * stride
+        for index in range(first, end, stride):
+            frame = cv2.imread(os.path.join(path, names[index]))
+            if frame is None:
+                continue
+            yield index, frame
+            emitted += 1
+            if max_frames is not None and emitted >= max_frames:
+                return
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"[ERROR] No se pudo abrir: {path}")
+        return
+    try:
+        index = 0
+        if start > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            index = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            # Algunos backends no soportan el seek: avanzar sin decodificar
+            while index < start and cap.grab():
+                index += 1
+        while stop is None or index < stop:
+            if index % stride:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index, frame
+            index += 1
+            emitted += 1
+            if max_frames is not None and emitted >= max_frames:
+                break
+    finally:
+        cap.release()
+
+
+def create_hands(static_image_mode: bool, max_num_hands: Optional[int] = None):
+    """Crea una instancia de MediaPipe Hands con la configuración del tracker."""
+    import mediapipe as mp
+    from hand_tracker import MAX_NUM_HANDS, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE
+
+    return mp.solutions.hands.Hands(
+        static_image_mode=static_image_mode,
+        max_num_hands=MAX_NUM_HANDS if max_num_hands is None else max_num_hands,
+        min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=MIN_TRACKING_CONFIDENCE
+    )
+
+
+def extract_source_landmarks(hands, path: str, stride: int = 1, mirror: bool = False,
+                             max_frames: Optional[int] = None,
+                             start: int = 0, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Corre MediaPipe sobre un video o carpeta de imágenes.
+
+    Returns:
+        Dict con ``frame`` (N,), ``hand_detected`` (N,) y ``landmarks`` (N, 63);
+        las filas sin mano quedan en cero.
+    """
+    acc = LandmarkAccumulator()
+    for index, frame in iter_frames(path, stride, max_frames, start, stop):
+        if mirror:
+            frame = cv2.flip(frame, 1)
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        detected = bool(results.multi_hand_landmarks)
+        points = acc.row(index, detected)
+        if detected:
+            for i, landmark in enumerate(results.multi_hand_landmarks[0].landmark):
+                row = points[i]
+                row[0] = landmark.x
+                row[1] = landmark.y
+                row[2] = landmark.z
+    return acc.finish()
+
+
+def load_landmark_file(path: str) -> Dict[str, np.ndarray]:
+    """
+    Carga un archivo .npz de landmarks (p. ej. uno escrito con --save-landmarks)
+    o una grabación .lmrec del tracker.
+
+    Requiere la columna ``landmarks`` (N, 63); ``frame`` y ``hand_detected``
+    son opcionales.
+    """
+    if path.lower().endswith('.lmrec'):
+        from landmark_recording import load_recording_columns
+        return load_recording_columns(path)
+
+    with np.load(path, allow_pickle=False) as data:
+        landmarks = np.asarray(data["landmarks"], dtype=np.float32).reshape(-1, 63)
+        n = landmarks.shape[0]
+        frame = np.asarray(data["frame"], dtype=np.int32) if "frame" in data else np.arange(n, dtype=np.int32)
+        if "hand_detected" in data:
+            detected = np.asarray(data["hand_detected"], dtype=bool)
+        else:
+            detected = np.any(landmarks != 0.0, axis=1)
+    return {"frame": frame, "hand_detected": detected, "landmarks": landmarks}
+
+
+def score_landmarks(session, input_name: str, supports_batch: bool,
+                    columns: Dict[str, np.ndarray], batch_size: int,
+                    features: Optional[FeatureExtractor] = None) -> Dict[str, np.ndarray]:
+    """
+    Agrega ``letter`` y ``confidence`` evaluando solo las filas con mano.
+
+    Args:
+        features: Features de entrada del modelo (default: landmarks sin transformar)
+    """
+    n = columns["landmarks"].shape[0]
+    letters = np.full(n, "", dtype="<U1")
+    confidences = np.zeros(n, dtype=np.float32)
+    detected = columns["hand_detected"]
+    if session is not None and detected.any():
+        rows = columns["landmarks"][detected]
+        if features is not None:
+            rows = features.transform(rows)
+        batch_letters, batch_conf = predict_batch(session, input_name, rows, supports_batch, batch_size)
+        # El ancho del dtype sale de las etiquetas del modelo (no truncarlas a 1 carácter)
+        letters = letters.astype(np.result_type(letters.dtype, batch_letters.dtype))
+        letters[detected] = batch_letters
+        confidences[detected] = batch_conf
+    columns["letter"] = letters
+    columns["confidence"] = confidences
+    return columns
+
+
+def write_results(path: str, columns: Dict[str, np.ndarray], save_landmarks: bool):
+    """Escribe las columnas como .npz (por defecto) o .csv según la extensión."""
+    if path.lower().endswith('.csv'):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(("source", "frame", "hand_detected", "letter", "confidence"))
+            for source, frame, detected, letter, conf in zip(
+                    columns["source"], columns["frame"], columns["hand_detected"],
+                    columns["letter"], columns["confidence"]):
+                writer.writerow((source, int(frame), int(detected), letter, f"{conf:.6f}"))
+        return
+
+    data = {k: v for k, v in columns.items() if save_landmarks or k != "landmarks"}
+    np.savez_compressed(path, **data)
+
+
+def run_batch(inputs: List[str], model_path: str, output: str, stride: int = 1,
+              batch_size: int = 4096, mirror: bool = False, max_frames: Optional[int] = None,
+              save_landmarks: bool = False, workers: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Extrae landmarks de todas las fuentes, los evalúa por lotes y escribe el resultado.
+
+    Con ``workers > 1`` la extracción de videos / imágenes se reparte en un
+    pool de procesos (ver landmark_pool.py); ``max_frames`` no aplica en ese caso.
+    """
+    session, input_name, supports_batch = create_session(model_path, batch=True, drop_zipmap=True)
+    if not supports_batch:
+        print("[WARN] Paquete 'onnx' no disponible: inferencia fila por fila")
+    features = FeatureExtractor(load_spec(model_path))
+    check_input_width(features.spec, session)
+    print(f"[INFO] Features: {features.spec.describe()}")
+
+    t_start = time.perf_counter()
+    media = [p for p in inputs if not p.lower().endswith(LANDMARK_EXTENSIONS)]
+    pooled: Dict[str, List[Dict[str, np.ndarray]]] = {}
+    if workers > 1 and media:
+        from landmark_pool import iter_extracted
+        # Mismo modo que el camino de un solo proceso: imagen estática para
+        # carpetas de imágenes, tracking para videos (un pool por modo)
+        for static_image_mode in (False, True):
+            group = [p for p in media if os.path.isdir(p) == static_image_mode]
+            if not group:
+                continue
+            for path, columns in iter_extracted(group, workers=workers, stride=stride,
+                                                static_image_mode=static_image_mode, mirror=mirror):
+                pooled.setdefault(path, []).append(columns)
+        print(f"[OK] Extracción paralela ({workers} procesos): {time.perf_counter() - t_start:.1f} s")
+
+    per_source = []
+    for path in inputs:
+        t0 = time.perf_counter()
+        if path.lower().endswith(LANDMARK_EXTENSIONS):
+            columns = load_landmark_file(path)
+        elif path in pooled:
+            parts = pooled.pop(path)
+            columns = {key: np.concatenate([c[key] for c in parts]) for key in parts[0]}
+        else:
+            hands = create_hands(static_image_mode=os.path.isdir(path))
+            try:
+                columns = extract_source_landmarks(hands, path, stride, mirror, max_frames)
+            finally:
+                hands.close()
+        n = columns["landmarks"].shape[0]
+        columns["source"] = np.full(n, path)
+        per_source.append(columns)
+        print(f"[OK] {path}: {n} frames ({int(columns['hand_detected'].sum())} con mano) "
+              f"en {time.perf_counter() - t0:.1f} s")
+
+    merged = {key: np.concatenate([c[key] for c in per_source]) for key in
+              ("source", "frame", "hand_detected", "landmarks")} if per_source else {
+        "source": np.zeros(0, dtype=str), "frame": np.zeros(0, dtype=np.int32),
+        "hand_detected": np.zeros(0, dtype=bool), "landmarks": np.zeros((0, 63), dtype=np.float32)}
+
+    t0 = time.perf_counter()
+    merged = score_landmarks(session, input_name, supports_batch, merged, batch_size, features)
+    print(f"[OK] Inferencia: {merged['landmarks'].shape[0]} filas en {time.perf_counter() - t0:.2f} s")
+
+    write_results(output, merged, save_landmarks)
+    print(f"[OK] Resultados escritos en {output} ({time.perf_counter() - t_start:.1f} s en total)")
+    return merged
+
+
+def main(argv=None):
+    """Punto de entrada del subcomando ``batch``."""
+    from hand_tracker import MODEL_PATH
+
+    parser = argparse.ArgumentParser(
+        prog='hand_tracker.py batch',
+        description='Inferencia offline por lotes sobre videos, imágenes o landmarks grabados'
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help='Videos, carpetas de imágenes o archivos de landmarks (.npz / .lmrec)')
+    parser.add_argument('--output', '-o', type=str, default='batch_results.npz',
+                        help='Archivo de salida .npz o .csv (default: batch_results.npz)')
+    parser.add_argument('--model', '-m', type=str, default=MODEL_PATH,
+                        help=f'Ruta al modelo ONNX (default: {MODEL_PATH})')
+    parser.add_argument('--stride', type=int, default=1,
+                        help='Procesar 1 de cada N frames (default: 1)')
+    parser.add_argument('--max-frames', type=int, default=None,
+                        help='Máximo de frames procesados por fuente')
+    parser.add_argument('--batch-size', type=int, default=4096,
+                        help='Filas por llamada al modelo ONNX (default: 4096)')
+    parser.add_argument('--mirror', action='store_true',
+                        help='Voltear horizontalmente los frames (como el modo espejo en vivo)')
+    parser.add_argument('--save-landmarks', action='store_true',
+                        help='Incluir la columna landmarks (N x 63) en el .npz de salida')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Procesos para extraer landmarks en paralelo (default: 1)')
+    args = parser.parse_args(argv)
+
+    try:
+        run_batch(args.inputs, args.model, args.output, stride=args.stride,
+                  batch_size=args.batch_size, mirror=args.mirror,
+                  max_frames=args.max_frames, save_landmarks=args.save_landmarks,
+                  workers=args.workers)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+
+
+if __name__ == "__main__":
+    main()
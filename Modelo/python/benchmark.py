@@ -0,0 +1,264 @@
+"""
+Benchmark de las etapas del pipeline
+====================================
+Mide por separado cada etapa del hand tracker sin necesitar cámara, sobre
+frames sintéticos (o un video / carpeta de imágenes) y landmarks grabados
+(o sintéticos), y reporta latencia p50/p95/p99 y throughput por etapa.
+
+Etapas:
+    color_convert     cv2.cvtColor BGR -> RGB
+    mediapipe         hands.process (se omite si MediaPipe no está disponible)
+    predict_letter    HandTracker.predict_letter
+    predict_proba     HandTracker.predict_proba (vector por clase, sin caché)
+    sequence          ventana + modelo de secuencias + fusión en cada frame
+                      (solo con --sequence-model, ver sequence.py)
+    features          features de entrada según model.features.json (ver features.py)
+    features_norm     muñeca + escala + distancias entre puntas + ángulos, una fila
+    features_all      muñeca + escala + los 210 pares + ángulos, una fila
+    serialize_json    HandTracker.encode_message(wire_format="json")
+    serialize_binary  HandTracker.encode_message(wire_format="binary")
+    video_encode      HandTracker.encode_video_frame (resize + JPEG)
+    draw_overlay      HandTracker.draw_overlay
+
+Uso:
+    python hand_tracker.py benchmark
+    python hand_tracker.py benchmark --landmarks sesion.lmrec --frames video.mp4 --json out.json
+
+El JSON incluye versiones de dependencias y el hash del modelo para poder
+comparar corridas entre versiones.
+"""
+
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+import cv2
+import numpy as np
+
+from metrics import summarize
+
+
+def time_stage(fn: Callable[[int], object], iterations: int, warmup: int = 10) -> np.ndarray:
+    """Ejecuta ``fn(i)`` ``warmup + iterations`` veces y devuelve las duraciones medidas."""
+    for i in range(warmup):
+        fn(i)
+    samples = np.empty(iterations, dtype=np.float64)
+    clock = time.perf_counter
+    for i in range(iterations):
+        t0 = clock()
+        fn(i)
+        samples[i] = clock() - t0
+    return samples
+
+
+def synthetic_frames(count: int = 8, width: int = 640, height: int = 480,
+                     seed: int = 0) -> np.ndarray:
+    """Frames BGR con gradiente + ruido (más realistas para JPEG que ruido puro)."""
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:height, 0:width]
+    base = np.stack([(xs * 255 // width), (ys * 255 // height),
+                     ((xs + ys) * 255 // (width + height))], axis=-1).astype(np.int16)
+    frames = np.empty((count, height, width, 3), dtype=np.uint8)
+    for i in range(count):
+        noise = rng.integers(-12, 13, size=base.shape, dtype=np.int16)
+        frames[i] = np.clip(base + noise, 0, 255).astype(np.uint8)
+    return frames
+
+
+def synthetic_landmarks(count: int = 256, seed: int = 0) -> np.ndarray:
+    """Landmarks (N, 63) con una mano alrededor del centro de la imagen."""
+    rng = np.random.default_rng(seed)
+    center = rng.uniform(0.35, 0.65, size=(count, 1, 2))
+    xy = center + rng.normal(0.0, 0.08, size=(count, 21, 2))
+    z = rng.normal(0.0, 0.03, size=(count, 21, 1))
+    return np.concatenate([xy, z], axis=-1).reshape(count, 63).astype(np.float32)
+
+
+def load_frames(path: str, limit: int) -> np.ndarray:
+    from batch_inference import iter_frames
+    frames = [frame for _, frame in iter_frames(path, max_frames=limit)]
+    if not frames:
+        raise ValueError(f"No se pudieron leer frames de: {path}")
+    return np.stack(frames)
+
+
+def load_landmarks(path: str) -> np.ndarray:
+    from batch_inference import load_landmark_file
+    columns = load_landmark_file(path)
+    landmarks = columns["landmarks"][columns["hand_detected"]]
+    if landmarks.shape[0] == 0:
+        raise ValueError(f"El archivo no tiene frames con mano: {path}")
+    return np.ascontiguousarray(landmarks, dtype=np.float32)
+
+
+def _landmark_proto(landmarks: np.ndarray):
+    """Convierte 63 valores en NormalizedLandmarkList para draw_overlay (None si no hay MediaPipe)."""
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        return None
+    proto = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in landmarks.reshape(21, 3):
+        proto.landmark.add(x=float(x), y=float(y), z=float(z))
+    return proto
+
+
+def _file_sha256(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _versions() -> Dict[str, Optional[str]]:
+    versions = {"python": platform.python_version(), "numpy": np.__version__, "opencv": cv2.__version__}
+    for name in ("onnxruntime", "mediapipe"):
+        try:
+            versions[name] = __import__(name).__version__
+        except Exception:
+            versions[name] = None
+    return versions
+
+
+def run_benchmark(model_path: str, iterations: int = 500, warmup: int = 10,
+                  frames: Optional[np.ndarray] = None,
+                  landmarks: Optional[np.ndarray] = None,
+                  skip_mediapipe: bool = False,
+                  sequence_model: Optional[str] = None) -> Dict[str, object]:
+    """Corre todas las etapas y devuelve el reporte (listo para serializar a JSON)."""
+    from features import FeatureExtractor, FeatureSpec
+    from hand_tracker import HandTracker
+
+    frames = synthetic_frames() if frames is None else frames
+    landmarks = synthetic_landmarks() if landmarks is None else landmarks
+
+    tracker = None
+    if not skip_mediapipe:
+        try:
+            tracker = HandTracker(model_path=model_path, camera_id=None, show_window=False,
+                                  sequence_model=sequence_model)
+        except Exception as e:
+            print(f"[WARN] MediaPipe no disponible, se omite su etapa: {e}")
+    if tracker is None:
+        tracker = HandTracker(model_path=model_path, camera_id=None, show_window=False,
+                              use_mediapipe=False, sequence_model=sequence_model)
+
+    n_frames = frames.shape[0]
+    n_landmarks = landmarks.shape[0]
+    rgb_frames = np.empty_like(frames)
+    for i in range(n_frames):
+        cv2.cvtColor(frames[i], cv2.COLOR_BGR2RGB, dst=rgb_frames[i])
+    labels = [tracker.predict_letter(landmarks[i]) for i in range(min(n_landmarks, 64))]
+    overlay_frame = frames[0].copy()
+    overlay_hand = _landmark_proto(landmarks[0]) if tracker.hands is not None else None
+
+    stages: Dict[str, Callable[[int], object]] = {
+        "color_convert": lambda i: cv2.cvtColor(frames[i % n_frames], cv2.COLOR_BGR2RGB),
+    }
+    if tracker.hands is not None:
+        stages["mediapipe"] = lambda i: tracker.hands.process(rgb_frames[i % n_frames])
+    stages["predict_letter"] = lambda i: tracker.predict_letter(landmarks[i % n_landmarks])
+    stages["predict_proba"] = lambda i: tracker.predict_proba(landmarks[i % n_landmarks])
+    stages["features"] = lambda i: tracker.features.transform(landmarks[i % n_landmarks])
+    normalized = FeatureExtractor(FeatureSpec(wrist_relative=True, scale="max_xy", distances="fingertips",
+                                              angles=True))
+    stages["features_norm"] = lambda i: normalized.transform(landmarks[i % n_landmarks])
+    full = FeatureExtractor(FeatureSpec(wrist_relative=True, scale="max_xy", distances="all", angles=True))
+    stages["features_all"] = lambda i: full.transform(landmarks[i % n_landmarks])
+    if tracker.sequence is not None:
+        probabilities = tracker.predict_proba(landmarks[0])
+        stages["sequence"] = lambda i: tracker._fuse_sequence(*labels[i % len(labels)],
+                                                              landmarks[i % n_landmarks], probabilities)
+    for fmt in ("json", "binary"):
+        stages[f"serialize_{fmt}"] = (
+            lambda i, fmt=fmt: tracker.encode_message(
+                landmarks[i % n_landmarks], *labels[i % len(labels)], True, wire_format=fmt))
+    stages["video_encode"] = lambda i: tracker.encode_video_frame(frames[i % n_frames])
+    stages["draw_overlay"] = lambda i: tracker.draw_overlay(overlay_frame, overlay_hand, "A", 0.9)
+
+    results = {}
+    for name, fn in stages.items():
+        results[name] = summarize(time_stage(fn, iterations, warmup))
+
+    sizes = {
+        "json_bytes": len(tracker.encode_message(landmarks[0], "A", 0.9, True, wire_format="json")),
+        "binary_bytes": len(tracker.encode_message(landmarks[0], "A", 0.9, True, wire_format="binary")),
+        "jpeg_bytes": int(tracker.encode_video_frame(frames[0]).size),
+    }
+    tracker.cleanup()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": {"path": model_path, "sha256": _file_sha256(model_path)},
+        "versions": _versions(),
+        "platform": platform.platform(),
+        "config": {"iterations": iterations, "warmup": warmup,
+                   "frame_shape": list(frames.shape[1:]), "landmark_rows": int(n_landmarks),
+                   "video_width": tracker.video_width, "video_jpeg_quality": tracker.video_jpeg_quality},
+        "sizes": sizes,
+        "stages": results,
+    }
+
+
+def print_report(report: Dict[str, object]):
+    print(f"\n{'etapa':<18}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'media ms':>10}{'ops/s':>11}")
+    print("-" * 66)
+    for name, r in report["stages"].items():
+        print(f"{name:<18}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}"
+              f"{r['mean_ms']:>10.3f}{r['throughput_per_s']:>11.1f}")
+    sizes = report["sizes"]
+    print(f"\nTamaños: JSON {sizes['json_bytes']} B | binario {sizes['binary_bytes']} B | "
+          f"JPEG {sizes['jpeg_bytes']} B\n")
+
+
+def main(argv=None):
+    """Punto de entrada del subcomando ``benchmark``."""
+    from hand_tracker import MODEL_PATH
+
+    parser = argparse.ArgumentParser(
+        prog='hand_tracker.py benchmark',
+        description='Benchmark por etapa del pipeline (sin cámara)'
+    )
+    parser.add_argument('--model', '-m', type=str, default=MODEL_PATH,
+                        help=f'Ruta al modelo ONNX (default: {MODEL_PATH})')
+    parser.add_argument('--iterations', '-n', type=int, default=500,
+                        help='Iteraciones medidas por etapa (default: 500)')
+    parser.add_argument('--warmup', type=int, default=10,
+                        help='Iteraciones de calentamiento por etapa (default: 10)')
+    parser.add_argument('--frames', type=str, default=None,
+                        help='Video o carpeta de imágenes en lugar de frames sintéticos')
+    parser.add_argument('--landmarks', type=str, default=None,
+                        help='Archivo .lmrec / .npz en lugar de landmarks sintéticos')
+    parser.add_argument('--no-mediapipe', action='store_true',
+                        help='Omitir la etapa de MediaPipe')
+    parser.add_argument('--sequence-model', type=str, default=None,
+                        help='Medir también el modelo de señas dinámicas (ver sequence.py)')
+    parser.add_argument('--json', type=str, default=None,
+                        help="Escribir el reporte en este archivo JSON ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        args.model, iterations=args.iterations, warmup=args.warmup,
+        frames=load_frames(args.frames, 64) if args.frames else None,
+        landmarks=load_landmarks(args.landmarks) if args.landmarks else None,
+        skip_mediapipe=args.no_mediapipe,
+        sequence_model=args.sequence_model,
+    )
+    print_report(report)
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"[OK] Reporte escrito en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
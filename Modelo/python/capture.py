@@ -0,0 +1,382 @@
+"""
+Captura de video
+================
+Abre la fuente de frames del tracker con backend, formato y buffer
+configurables y la envuelve en un ``FrameSource`` con la misma interfaz que
+``cv2.VideoCapture`` (``read`` / ``isOpened`` / ``get`` / ``set`` / ``release``).
+
+Fuentes:
+    - cámara por índice ("0", "1"...) con el backend elegido: "v4l2",
+      "gstreamer", "dshow", "msmf", "avfoundation" o "auto"
+    - pipeline de GStreamer (con ``backend="gstreamer"``)
+    - archivo de video (se reproduce al ritmo de sus FPS, como una cámara)
+    - "synthetic": patrón animado generado en memoria, para probar sin cámara
+
+Negociación de formato: FOURCC (p. ej. MJPG, que evita el límite de ancho
+de banda de YUYV en USB), tamaño, FPS y tamaño del buffer del driver se
+piden en ese orden (V4L2 necesita el FOURCC antes del tamaño) y se reporta
+lo que el driver aceptó realmente.
+
+Modos de lectura:
+    "direct"  ``read`` llama al ``read`` de la captura (comportamiento histórico)
+    "latest"  un hilo hace ``grab`` + ``retrieve`` continuamente y ``read``
+              devuelve siempre el frame más reciente, descartando los que el
+              bucle no alcanzó a procesar (nunca frames viejos del buffer)
+
+Cada frame lleva el instante de captura; ``mark_processed`` acumula la
+latencia captura -> procesado (media y p95).
+
+Uso:
+    python hand_tracker.py capture --source synthetic --seconds 5
+    python hand_tracker.py capture --source 0 --backend v4l2 --fourcc MJPG --fps 30
+"""
+
+import argparse
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from pipeline import LatestSlot
+
+BACKENDS = {
+    "auto": cv2.CAP_ANY,
+    "v4l2": cv2.CAP_V4L2,
+    "gstreamer": cv2.CAP_GSTREAMER,
+    "ffmpeg": cv2.CAP_FFMPEG,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+    "avfoundation": cv2.CAP_AVFOUNDATION,
+}
+
+CAPTURE_MODES = ("latest", "direct")
+# Espera antes de reintentar un grab fallido de una cámara (falla transitoria de USB / V4L2)
+GRAB_RETRY_DELAY = 0.01
+
+
+def fourcc_to_str(value: float) -> str:
+    code = int(value)
+    if code <= 0:
+        return "?"
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+class SyntheticCapture:
+    """
+    Fuente sintética con interfaz de ``cv2.VideoCapture``: un patrón que se
+    mueve y el número de frame.
+
+    Se comporta como el driver de una cámara: expone un frame cada
+    ``1 / fps`` segundos lo lea alguien o no, guarda los ``buffer_size`` más
+    viejos sin leer y ``grab`` entrega el más antiguo de ellos. Así un
+    bucle más lento que la cámara recibe frames atrasados igual que con
+    una cámara real. ``frame_timestamp`` es el instante de exposición del
+    último frame (reloj ``time.perf_counter``).
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0, buffer_size: int = 4):
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = float(fps) if fps and fps > 0 else 30.0
+        self.buffer_size = max(1, int(buffer_size))
+        self._frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._background = np.empty_like(self._frame)
+        self._background[:] = np.linspace(40, 120, self.width, dtype=np.uint8)[None, :, None]
+        self._start = time.perf_counter()
+        self._index = -1
+        self.frame_timestamp = 0.0
+        self._opened = True
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def grab(self) -> bool:
+        if not self._opened:
+            return False
+        exposed = int((time.perf_counter() - self._start) * self.fps)
+        # Los frames que no entraron en el buffer se perdieron en el driver
+        self._index = max(self._index + 1, exposed - self.buffer_size + 1)
+        self.frame_timestamp = self._start + self._index / self.fps
+        delay = self.frame_timestamp - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, np.ndarray]:
+        frame = self._frame if image is None else image
+        np.copyto(frame, self._background)
+        t = self._index / self.fps
+        cx = int((0.5 + 0.35 * np.sin(t * 1.3)) * self.width)
+        cy = int((0.5 + 0.35 * np.cos(t * 0.9)) * self.height)
+        cv2.circle(frame, (cx, cy), max(8, self.height // 8), (60, 170, 230), -1)
+        cv2.putText(frame, f"#{self._index}", (10, self.height - 10), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6, (255, 255, 255), 1)
+        return True, frame.copy() if image is None else frame
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop: int) -> float:
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: float(self.width),
+            cv2.CAP_PROP_FRAME_HEIGHT: float(self.height),
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_BUFFERSIZE: float(self.buffer_size),
+        }.get(prop, 0.0)
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_BUFFERSIZE and value >= 1:
+            self.buffer_size = int(value)
+            return True
+        return False
+
+    def getBackendName(self) -> str:
+        return "synthetic"
+
+    def release(self):
+        self._opened = False
+
+
+class FrameSource:
+    """
+    Envoltorio de una captura con lectura "latest" o "direct" y medición de
+    latencia.
+
+    Args:
+        capture: ``cv2.VideoCapture`` o ``SyntheticCapture`` ya configurada
+        mode: "latest" o "direct"
+        pace_fps: Si > 0, limita las lecturas a este ritmo (archivos de
+            video, que si no se leen tan rápido como decodifica el CPU)
+        description: Texto para los logs
+    """
+
+    def __init__(self, capture, mode: str = "latest", pace_fps: float = 0.0, description: str = ""):
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"Modo de captura desconocido: {mode} (opciones: {', '.join(CAPTURE_MODES)})")
+        self.capture = capture
+        self.mode = mode
+        self.pace_interval = 1.0 / pace_fps if pace_fps > 0 else 0.0
+        self.description = description
+        self.finished = False
+        self.frames = 0
+        self.read_errors = 0
+        self.last_timestamp = 0.0
+        self._next_read = time.perf_counter()
+        self._latencies = deque(maxlen=512)
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._slot: Optional[LatestSlot] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if mode == "latest" and self.isOpened():
+            self._slot = LatestSlot()
+            self._thread = threading.Thread(target=self._grab_loop, name="HandTracker-grab", daemon=True)
+            self._thread.start()
+
+    @property
+    def dropped(self) -> int:
+        """Frames capturados que se reemplazaron antes de que el bucle los leyera."""
+        return self._slot.dropped if self._slot is not None else 0
+
+    def _pace(self):
+        if self.pace_interval <= 0:
+            return
+        delay = self._next_read - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_read = max(self._next_read + self.pace_interval, time.perf_counter() - self.pace_interval)
+
+    def _read_capture(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        self._pace()
+        if not self.capture.grab():
+            return False, None, 0.0
+        # Instante de exposición si la fuente lo conoce, si no el del grab
+        timestamp = getattr(self.capture, "frame_timestamp", 0.0) or time.perf_counter()
+        ret, frame = self.capture.retrieve()
+        return ret, frame, timestamp
+
+    def _at_end(self) -> bool:
+        """Una lectura fallida es fin de la fuente solo si la captura se cerró o es un archivo."""
+        return not self.capture.isOpened() or self.pace_interval > 0
+
+    def _grab_loop(self):
+        while not self._stop.is_set():
+            ret, frame, timestamp = self._read_capture()
+            if not ret:
+                if self._at_end():
+                    self.finished = True
+                    self._slot.close()
+                    return
+                # Cámara en vivo: reintentar en lugar de cortar la sesión
+                self.read_errors += 1
+                self._stop.wait(GRAB_RETRY_DELAY)
+                continue
+            self._slot.put((frame, timestamp))
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Como ``cv2.VideoCapture.read``; en modo "latest" devuelve el frame más reciente."""
+        if self._slot is not None:
+            item = self._slot.get(timeout=1.0)
+            if item is None:
+                return False, None
+            frame, self.last_timestamp = item
+        else:
+            ret, frame, timestamp = self._read_capture()
+            if not ret:
+                self.read_errors += 1
+                self.finished = self.finished or self._at_end()
+                return False, None
+            self.last_timestamp = timestamp
+        self.frames += 1
+        return True, frame
+
+    def mark_processed(self, now: Optional[float] = None) -> float:
+        """
+        Registra que el último frame leído terminó de procesarse.
+
+        Returns:
+            Latencia captura -> procesado en segundos
+        """
+        latency = (time.perf_counter() if now is None else now) - self.last_timestamp
+        self._latencies.append(latency)
+        self._latency_sum += latency
+        self._latency_count += 1
+        return latency
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Latencia captura -> procesado: media total y p95 de los últimos frames, en ms."""
+        recent = np.fromiter(self._latencies, dtype=np.float64) if self._latencies else None
+        return {
+            "mean_ms": self._latency_sum / self._latency_count * 1000.0 if self._latency_count else 0.0,
+            "p95_ms": float(np.percentile(recent, 95)) * 1000.0 if recent is not None else 0.0,
+        }
+
+    def summary(self) -> str:
+        text = f"{self.frames} frames leídos, {self.dropped} descartados"
+        if self.read_errors:
+            text += f", {self.read_errors} lecturas fallidas"
+        if self._latency_count:
+            stats = self.latency_stats()
+            text += (f" | latencia captura->proceso media {stats['mean_ms']:.1f} ms, "
+                     f"p95 {stats['p95_ms']:.1f} ms")
+        return text
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+    def get(self, prop: int) -> float:
+        return self.capture.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        return self.capture.set(prop, value)
+
+    def release(self):
+        self._stop.set()
+        if self._slot is not None:
+            self._slot.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.capture.release()
+
+
+def open_source(source: Union[int, str] = 0, backend: str = "auto", width: int = 640, height: int = 480,
+                fps: float = 0.0, fourcc: Optional[str] = None, buffer_size: Optional[int] = None,
+                mode: str = "latest") -> FrameSource:
+    """
+    Abre y configura una fuente de frames.
+
+    Args:
+        source: Índice de cámara, ruta de video, pipeline de GStreamer o "synthetic"
+        backend: Clave de ``BACKENDS``
+        width, height: Tamaño pedido (0 = el del driver)
+        fps: FPS pedidos (0 = los del driver)
+        fourcc: Código de 4 letras, p. ej. "MJPG" (None = el del driver)
+        buffer_size: Frames en el buffer del driver (None = el del driver)
+        mode: "latest" o "direct" (ver ``FrameSource``)
+    """
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+
+    if source == "synthetic":
+        capture = SyntheticCapture(width or 640, height or 480, fps or 30.0,
+                                   buffer_size if buffer_size is not None else 4)
+        return FrameSource(capture, mode, description=f"sintética {capture.width}x{capture.height} "
+                                                      f"@ {capture.fps:g} fps, buffer {capture.buffer_size}")
+
+    capture = cv2.VideoCapture(source, BACKENDS[backend])
+    if not capture.isOpened():
+        return FrameSource(capture, "direct", description=str(source))
+
+    is_file = isinstance(source, str) and backend != "gstreamer"
+    if not is_file:
+        # V4L2 aplica el FOURCC al negociar el tamaño: va primero
+        if fourcc:
+            capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc[:4].ljust(4)))
+        if width and height:
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            capture.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size is not None:
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+    actual_fps = capture.get(cv2.CAP_PROP_FPS)
+    description = (f"{capture.getBackendName()} {int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))}x"
+                   f"{int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))} "
+                   f"{fourcc_to_str(capture.get(cv2.CAP_PROP_FOURCC))} @ {actual_fps:g} fps")
+    if not is_file and buffer_size is not None:
+        description += f", buffer {int(capture.get(cv2.CAP_PROP_BUFFERSIZE))}"
+    pace = (fps or actual_fps or 30.0) if is_file else 0.0
+    return FrameSource(capture, mode, pace_fps=pace, description=description)
+
+
+def main(argv=None):
+    """Punto de entrada del subcomando ``capture``: mide FPS y latencia de una fuente."""
+    parser = argparse.ArgumentParser(
+        prog='hand_tracker.py capture',
+        description='Prueba de la fuente de captura: formato negociado, FPS y latencia'
+    )
+    parser.add_argument('--source', default='0',
+                        help='Índice de cámara, archivo de video, pipeline de GStreamer o "synthetic" (default: 0)')
+    parser.add_argument('--backend', choices=list(BACKENDS), default='auto', help='Backend de captura')
+    parser.add_argument('--size', default='640x480', help='Tamaño pedido, ANCHOxALTO (default: 640x480)')
+    parser.add_argument('--fps', type=float, default=0.0, help='FPS pedidos (default: los del driver)')
+    parser.add_argument('--fourcc', default=None, help='Formato de píxel, p. ej. MJPG o YUYV')
+    parser.add_argument('--buffer', type=int, default=None, help='Frames en el buffer del driver')
+    parser.add_argument('--mode', choices=CAPTURE_MODES, default='latest', help='Modo de lectura (default: latest)')
+    parser.add_argument('--work-ms', type=float, default=0.0,
+                        help='Simular este tiempo de procesamiento por frame (default: 0)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duración de la prueba (default: 5)')
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    source = open_source(args.source, args.backend, width, height, args.fps, args.fourcc, args.buffer, args.mode)
+    if not source.isOpened():
+        print(f"[ERROR] No se pudo abrir la fuente: {args.source}")
+        return
+    print(f"[OK] Fuente: {source.description} | modo {source.mode}")
+
+    processed = 0
+    t_start = time.perf_counter()
+    try:
+        while time.perf_counter() - t_start < args.seconds:
+            ret, frame = source.read()
+            if not ret:
+                if source.finished:
+                    break
+                continue
+            if args.work_ms > 0:
+                time.sleep(args.work_ms / 1000.0)
+            source.mark_processed()
+            processed += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        elapsed = time.perf_counter() - t_start
+        source.release()
+    print(f"[STATS] {processed / elapsed:.1f} fps procesados | {source.summary()}")
@@ -0,0 +1,281 @@
+"""
+Features de entrada del modelo
+==============================
+Transforma filas de 63 landmarks (21 puntos x, y, z en coordenadas de
+imagen, como los entrega ``extract_landmarks``) en el vector que espera el
+modelo. Todo se calcula por lotes sobre un array (N, 21, 3), así que el
+bucle en vivo (N = manos del frame), el modo batch y la exportación para
+entrenar usan exactamente el mismo código:
+
+    - ``wrist_relative``: resta la muñeca (punto 0) a todos los puntos
+    - ``scale``: "none", "max_xy" (el punto más lejano de la muñeca en x, y
+      queda a distancia 1) o "palm" (distancia muñeca -> base del dedo medio
+      en x, y igual a 1)
+    - ``distances``: distancias 3D entre pares de puntos: "none",
+      "fingertips" (muñeca y las 5 puntas, 15 pares) o "all" (210 pares)
+    - ``angles``: ángulo (radianes) en cada articulación de los 5 dedos (15)
+
+Vector resultante: [coordenadas (63) | distancias | ángulos].
+
+Especificación versionada: el modelo ``model.onnx`` declara sus features en
+``model.features.json`` (mismo nombre, al lado). Sin ese archivo se asume la
+especificación "raw" (coordenadas sin transformar), que es la del modelo
+entrenado originalmente; con "raw" la etapa no copia ni calcula nada.
+
+Uso:
+    python hand_tracker.py features ../model.onnx
+    python hand_tracker.py features nuevo.onnx --wrist-relative --scale max_xy --distances fingertips --angles
+"""
+
+import argparse
+import json
+import os
+from itertools import combinations
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+FEATURE_SPEC_VERSION = 1
+SPEC_SUFFIX = ".features.json"
+NUM_LANDMARK_VALUES = 63
+WRIST = 0
+MIDDLE_MCP = 9
+FINGERTIPS = (4, 8, 12, 16, 20)
+SCALES = ("none", "max_xy", "palm")
+DISTANCE_SETS = ("none", "fingertips", "all")
+
+# Cadenas muñeca -> punta de cada dedo; los ángulos se miden en los tres
+# puntos intermedios de cada una
+_FINGER_CHAINS = ((0, 1, 2, 3, 4), (0, 5, 6, 7, 8), (0, 9, 10, 11, 12),
+                  (0, 13, 14, 15, 16), (0, 17, 18, 19, 20))
+_ANGLE_TRIPLETS = np.array([chain[i:i + 3] for chain in _FINGER_CHAINS for i in range(3)], dtype=np.int64)
+_PAIRS = {
+    "none": np.zeros((0, 2), dtype=np.int64),
+    "fingertips": np.array(list(combinations((WRIST,) + FINGERTIPS, 2)), dtype=np.int64),
+    "all": np.array(list(combinations(range(21), 2)), dtype=np.int64),
+}
+
+
+class FeatureSpec(NamedTuple):
+    """Features que espera un modelo (se guarda como JSON al lado del .onnx)."""
+    wrist_relative: bool = False
+    scale: str = "none"
+    distances: str = "none"
+    angles: bool = False
+    version: int = FEATURE_SPEC_VERSION
+
+    @property
+    def is_raw(self) -> bool:
+        return not self.wrist_relative and self.scale == "none" and self.distances == "none" and not self.angles
+
+    @property
+    def num_features(self) -> int:
+        return NUM_LANDMARK_VALUES + len(_PAIRS[self.distances]) + (len(_ANGLE_TRIPLETS) if self.angles else 0)
+
+    def describe(self) -> str:
+        if self.is_raw:
+            return f"raw v{self.version} ({self.num_features} valores)"
+        parts = []
+        if self.wrist_relative:
+            parts.append("relativo a la muñeca")
+        if self.scale != "none":
+            parts.append(f"escala {self.scale}")
+        if self.distances != "none":
+            parts.append(f"distancias {self.distances}")
+        if self.angles:
+            parts.append("ángulos")
+        return f"{', '.join(parts)} v{self.version} ({self.num_features} valores)"
+
+    def validate(self) -> "FeatureSpec":
+        if self.version > FEATURE_SPEC_VERSION:
+            raise ValueError(f"Especificación de features v{self.version} más nueva que la soportada "
+                             f"(v{FEATURE_SPEC_VERSION})")
+        if self.scale not in SCALES:
+            raise ValueError(f"Escala desconocida: {self.scale} (opciones: {', '.join(SCALES)})")
+        if self.distances not in DISTANCE_SETS:
+            raise ValueError(f"Distancias desconocidas: {self.distances} (opciones: {', '.join(DISTANCE_SETS)})")
+        if self.scale != "none" and not self.wrist_relative:
+            raise ValueError("La normalización de escala requiere wrist_relative")
+        return self
+
+
+RAW_SPEC = FeatureSpec()
+
+
+def spec_path(model_path: str) -> str:
+    """``modelo.onnx`` -> ``modelo.features.json``."""
+    return os.path.splitext(model_path)[0] + SPEC_SUFFIX
+
+
+def spec_to_dict(spec: FeatureSpec) -> dict:
+    data = spec._asdict()
+    data["num_features"] = spec.num_features
+    return data
+
+
+def spec_from_dict(data: dict) -> FeatureSpec:
+    fields = {key: data[key] for key in FeatureSpec._fields if key in data}
+    spec = FeatureSpec(**fields).validate()
+    expected = data.get("num_features")
+    if expected is not None and int(expected) != spec.num_features:
+        raise ValueError(f"num_features={expected} no coincide con la especificación ({spec.num_features})")
+    return spec
+
+
+def load_spec(model_path: str) -> FeatureSpec:
+    """Especificación de features de un modelo; "raw" si no tiene archivo."""
+    path = spec_path(model_path)
+    if not os.path.exists(path):
+        return RAW_SPEC
+    with open(path, "r", encoding="utf-8") as f:
+        return spec_from_dict(json.load(f))
+
+
+def save_spec(spec: FeatureSpec, model_path: str) -> str:
+    path = spec_path(model_path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(spec_to_dict(spec.validate()), f, indent=2)
+        f.write("\n")
+    return path
+
+
+def check_input_width(spec: FeatureSpec, session):
+    """Falla si la entrada del modelo no tiene el ancho que produce la especificación."""
+    width = session.get_inputs()[0].shape[-1]
+    if isinstance(width, int) and width != spec.num_features:
+        raise ValueError(f"el modelo espera {width} valores y su especificación de features "
+                         f"produce {spec.num_features}")
+
+
+def normalize_landmarks(landmarks, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Landmarks relativos a la muñeca y escalados para que el punto más lejano
+    (en x, y) quede a distancia 1.
+
+    Args:
+        landmarks: 63 valores o array (21, 3)
+        out: Array (21, 3) float32 donde escribir (opcional)
+
+    Returns:
+        Array (21, 3) float32
+    """
+    points = np.asarray(landmarks, dtype=np.float32).reshape(21, 3)
+    if out is None:
+        out = np.empty((21, 3), dtype=np.float32)
+    np.subtract(points, points[WRIST], out=out)
+    scale = float(np.sqrt((out[:, :2] ** 2).sum(axis=1).max()))
+    if scale > 1e-6:
+        out *= 1.0 / scale
+    return out
+
+
+class FeatureExtractor:
+    """
+    Aplica una ``FeatureSpec`` a lotes de filas de landmarks.
+
+    Los buffers de hasta ``max_rows`` filas se reservan una vez: el
+    resultado de ``transform`` para lotes chicos es una vista que se
+    sobrescribe en la siguiente llamada (como ``extract_landmarks``).
+
+    Args:
+        spec: Especificación de features
+        max_rows: Filas para las que se preasignan buffers (p. ej. manos por frame)
+    """
+
+    def __init__(self, spec: FeatureSpec = RAW_SPEC, max_rows: int = 1):
+        self.spec = spec.validate()
+        self.num_features = spec.num_features
+        # Todas las diferencias entre puntos (pares de distancias y los dos
+        # vectores de cada ángulo) salen de un solo gather
+        pairs = [_PAIRS[spec.distances]]
+        if spec.angles:
+            pairs += [_ANGLE_TRIPLETS[:, [0, 1]], _ANGLE_TRIPLETS[:, [2, 1]]]
+        pairs = np.concatenate(pairs)
+        self._from, self._to = pairs[:, 0], pairs[:, 1]
+        self._num_distances = len(_PAIRS[spec.distances])
+        self._rows = max(1, int(max_rows))
+        self._points = np.empty((self._rows, 21, 3), dtype=np.float32)
+        self._out = np.empty((self._rows, self.num_features), dtype=np.float32)
+
+    def transform(self, landmarks, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Args:
+            landmarks: Una fila de 63 valores o array (N, 63)
+            out: Array (N, num_features) float32 donde escribir (opcional)
+
+        Returns:
+            Array (N, num_features) float32. Con la especificación "raw" es
+            la misma entrada vista como (N, 63), sin copia.
+        """
+        rows = np.asarray(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARK_VALUES)
+        if self.spec.is_raw:
+            return rows
+        n = rows.shape[0]
+        if n <= self._rows:
+            points = self._points[:n]
+            out = self._out[:n] if out is None else out
+        else:
+            points = np.empty((n, 21, 3), dtype=np.float32)
+            out = np.empty((n, self.num_features), dtype=np.float32) if out is None else out
+
+        spec = self.spec
+        if spec.wrist_relative:
+            np.subtract(rows.reshape(n, 21, 3), rows[:, None, WRIST * 3:WRIST * 3 + 3], out=points)
+            if spec.scale != "none":
+                xy = points[:, :, :2] if spec.scale == "max_xy" else points[:, MIDDLE_MCP:MIDDLE_MCP + 1, :2]
+                squared = np.einsum("nij,nij->ni", xy, xy).max(axis=1)
+                # Una mano degenerada (todos los puntos en la muñeca) queda en cero
+                points *= (1.0 / np.sqrt(np.maximum(squared, 1e-12)))[:, None, None]
+        else:
+            np.copyto(points, rows.reshape(n, 21, 3))
+        out[:, :NUM_LANDMARK_VALUES] = points.reshape(n, NUM_LANDMARK_VALUES)
+        if not len(self._from):
+            return out
+
+        deltas = points[:, self._from] - points[:, self._to]
+        squared = np.einsum("nij,nij->ni", deltas, deltas)
+        d = self._num_distances
+        column = NUM_LANDMARK_VALUES + d
+        np.sqrt(squared[:, :d], out=out[:, NUM_LANDMARK_VALUES:column])
+        if spec.angles:
+            k = len(_ANGLE_TRIPLETS)
+            u, v = deltas[:, d:d + k], deltas[:, d + k:]
+            cosine = np.einsum("nij,nij->ni", u, v)
+            cosine /= np.sqrt(np.maximum(squared[:, d:d + k] * squared[:, d + k:], 1e-24))
+            np.clip(cosine, -1.0, 1.0, out=cosine)
+            np.arccos(cosine, out=out[:, column:])
+        return out
+
+    __call__ = transform
+
+
+def main(argv=None):
+    """Punto de entrada del subcomando ``features``: muestra o escribe la especificación de un modelo."""
+    parser = argparse.ArgumentParser(
+        prog='hand_tracker.py features',
+        description='Muestra o escribe la especificación de features (modelo.features.json) de un modelo'
+    )
+    parser.add_argument('model', help='Modelo ONNX (la especificación va al lado)')
+    parser.add_argument('--wrist-relative', action='store_true', help='Coordenadas relativas a la muñeca')
+    parser.add_argument('--scale', choices=SCALES, default=None, help='Normalización de escala')
+    parser.add_argument('--distances', choices=DISTANCE_SETS, default=None,
+                        help='Distancias entre pares de puntos')
+    parser.add_argument('--angles', action='store_true', help='Ángulos de las articulaciones de los dedos')
+    parser.add_argument('--raw', action='store_true', help='Escribir la especificación sin transformación')
+    args = parser.parse_args(argv)
+
+    write = args.raw or args.wrist_relative or args.scale or args.distances or args.angles
+    if not write:
+        spec = load_spec(args.model)
+        source = spec_path(args.model) if os.path.exists(spec_path(args.model)) else "sin archivo"
+        print(f"[INFO] Features de {args.model}: {spec.describe()} ({source})")
+        return
+
+    spec = FeatureSpec(wrist_relative=args.wrist_relative, scale=args.scale or "none",
+                       distances=args.distances or "none", angles=args.angles)
+    try:
+        path = save_spec(spec, args.model)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return
+    print(f"[OK] {path}: {spec.describe()}")
@@ -16,16 +16,99 @@ Uso:
     
     Presiona 'q' para salir
     Presiona 'm' para alternar el modo espejo
+
+    python hand_tracker.py --pipeline
+        Captura, inferencia y salida en hilos separados; la latencia queda
+        acotada por la etapa más lenta y no por la suma de todas.
+
+    python hand_tracker.py --wire-format binary
+        Envía los landmarks en el datagrama binario de 272 bytes descrito en
+        wire_protocol.py en lugar de JSON.
+
+    python hand_tracker.py batch sesion.mp4 capturas/ -o scores.npz
+        Re-evalúa videos / imágenes / landmarks grabados sin cámara, con
+        inferencia ONNX por lotes (ver batch_inference.py).
+
+    python hand_tracker.py extract videos/ -o landmarks.npz --workers 8
+        Extracción de landmarks en paralelo, un MediaPipe por proceso
+        (ver landmark_pool.py).
+
+    python hand_tracker.py --record sesion.lmrec
+    python hand_tracker.py --replay sesion.lmrec [--replay-max-speed] [--replay-loop]
+        Graba landmarks durante una sesión en vivo y los reproduce después
+        contra Unity sin cámara ni MediaPipe (ver landmark_recording.py).
+
+    python hand_tracker.py benchmark [--landmarks sesion.lmrec] [--json out.json]
+        Latencia p50/p95/p99 y throughput por etapa, sin cámara
+        (ver benchmark.py).
+
+    python hand_tracker.py --video-transport fragmented --video-width 1280
+        Parte cada JPEG en fragmentos del tamaño de la MTU, sin el límite de
+        ~65 KB por datagrama (ver video_transport.py).
+
+    python hand_tracker.py --video-target-kbps 1500 --video-encode-budget 6
+        El JPEG se codifica en un hilo aparte; calidad, ancho y FPS del video
+        se ajustan solos al bitrate y al tiempo de codificación pedidos
+        (ver video_encoder.py).
+
+    python hand_tracker.py --video-transport shm
+    python hand_tracker.py shm-reader [--show]
+        Frames sin comprimir en un ring en memoria compartida para un Unity en
+        la misma máquina, y un lector de prueba (ver shm_transport.py).
+
+    python hand_tracker.py --control-port 5007 [--control-host 0.0.0.0]
+    python hand_tracker.py subscribe --rate 5 -o sesion.jsonl
+        Reparte landmarks y video a todos los clientes suscriptos (con
+        heartbeats y límite de mensajes por cliente), más un cliente
+        registrador de ejemplo (ver subscriber_hub.py).
+
+    python hand_tracker.py --max-hands 2
+        Sigue varias manos: un solo batch al modelo por frame, con ID estable
+        y lateralidad por mano en el mensaje (ver multi_hand.py).
+
+    python hand_tracker.py --smoothing ema --send-on-change
+        Letra estable (media exponencial / votación + histéresis) y envío a
+        Unity solo cuando cambia (ver smoothing.py).
+
+    python hand_tracker.py --onnx-profile latency --onnx-cache-dir ~/.cache/hand_tracker
+        Un hilo de ONNX Runtime por llamada y el modelo optimizado guardado
+        en disco; reporta tiempo de arranque, warm-up y primer frame.
+
+    python hand_tracker.py --capture-backend v4l2 --capture-fourcc MJPG --capture-fps 30
+    python hand_tracker.py --source synthetic --no-window
+    python hand_tracker.py capture --source sesion.mp4 --work-ms 20
+        Backend, formato y buffer de la cámara negociados explícitamente; el
+        bucle lee siempre el frame más reciente y mide la latencia captura ->
+        proceso. También acepta archivos de video y una fuente sintética
+        (ver capture.py).
+
+    python hand_tracker.py --sequence-model secuencias.onnx
+    python hand_tracker.py sequence secuencias.onnx sesion.lmrec
+        Reconoce las señas con movimiento (J, Z) con un segundo modelo sobre
+        una ventana deslizante de landmarks, fusionado con el clasificador
+        estático (ver sequence.py).
+
+    python hand_tracker.py features ../model.onnx --wrist-relative --scale max_xy --angles
+        Declara en model.features.json qué features espera el modelo
+        (relativas a la muñeca, escala, distancias, ángulos); el bucle en
+        vivo, batch y extract las calculan igual (ver features.py).
 """
 
-import cv2
-import mediapipe as mp
+import time
+
+_PROCESS_START = time.perf_counter()
+
 import socket
 import json
 import numpy as np
-import time
 import argparse
-from typing import Optional, Tuple, List
+import importlib
+import sys
+import threading
+from typing import Dict, Optional, Tuple, List
+
+from metrics import (STAGE_CAPTURE, STAGE_CONVERT, STAGE_MEDIAPIPE,
+                     STAGE_INFERENCE, STAGE_SEND, STAGE_OUTPUT)
 
 # =============================================================================
 # CONFIGURACIÓN
@@ -43,6 +126,9 @@ MAX_NUM_HANDS = 1
 MIN_DETECTION_CONFIDENCE = 0.7
 MIN_TRACKING_CONFIDENCE = 0.5
 
+# Con --send-on-change, reenviar el estado al menos cada tantos segundos
+SEND_KEEPALIVE = 1.0
+
 import os
 
 # Ruta al modelo ONNX (relativa a este script)
@@ -54,6 +140,24 @@ CLASSES = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K',
            'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'T', 'U', 'V', 
            'W', 'X', 'Y']
 
+# Letras con movimiento que puede agregar el modelo de secuencias
+# (--sequence-model). Van después de CLASSES para no cambiar los índices
+# del formato binario.
+DYNAMIC_CLASSES = ['J', 'Z']
+
+# OpenCV y MediaPipe se importan al crear un tracker que los usa: --replay y
+# los subcomandos (batch, subscribe, shm-reader...) arrancan sin pagarlos
+cv2 = None
+
+
+def _import_cv2():
+    """Importa OpenCV bajo demanda y lo deja en el ``cv2`` del módulo."""
+    global cv2
+    if cv2 is None:
+        import cv2 as opencv
+        cv2 = opencv
+    return cv2
+
 # =============================================================================
 # CLASE PRINCIPAL
 # =============================================================================
@@ -73,7 +177,59 @@ class HandTracker:
                  video_jpeg_quality: int = 55,
                  camera_id: int = 0,
                  mirror_mode: bool = True,
-                 show_window: bool = True):
+                 show_window: bool = True,
+                 pipelined: bool = False,
+                 stats_interval: float = 5.0,
+                 wire_format: str = "json",
+                 record_path: Optional[str] = None,
+                 replay_path: Optional[str] = None,
+                 replay_realtime: bool = True,
+                 replay_loop: bool = False,
+                 use_mediapipe: bool = True,
+                 metrics: bool = False,
+                 metrics_http_port: Optional[int] = None,
+                 stats_port: Optional[int] = None,
+                 adaptive: bool = False,
+                 adaptive_motion_threshold: float = 2.0,
+                 adaptive_idle_scale: float = 0.5,
+                 prediction_cache_size: int = 0,
+                 prediction_cache_grid: float = 0.1,
+                 video_transport: str = "single",
+                 video_mtu: int = 1500,
+                 video_async: bool = True,
+                 video_target_bitrate: float = 0.0,
+                 video_encode_budget_ms: float = 0.0,
+                 video_shm_path: Optional[str] = None,
+                 video_shm_format: str = "rgb",
+                 control_port: Optional[int] = None,
+                 control_host: Optional[str] = None,
+                 subscriber_timeout: float = 5.0,
+                 static_subscriber: bool = True,
+                 max_num_hands: int = MAX_NUM_HANDS,
+                 smoothing: Optional[str] = None,
+                 smoothing_window: int = 8,
+                 smoothing_alpha: float = 0.35,
+                 smoothing_hold: float = 0.25,
+                 smoothing_min_confidence: float = 0.5,
+                 send_on_change: bool = False,
+                 onnx_profile: str = "default",
+                 onnx_options: Optional[dict] = None,
+                 onnx_cache_dir: Optional[str] = None,
+                 onnx_warmup: int = 3,
+                 parallel_init: bool = True,
+                 overlay_fps: float = 0.0,
+                 capture_source: Optional[str] = None,
+                 capture_backend: str = "auto",
+                 capture_width: int = 640,
+                 capture_height: int = 480,
+                 capture_fps: float = 0.0,
+                 capture_fourcc: Optional[str] = None,
+                 capture_buffer: Optional[int] = None,
+                 capture_mode: str = "latest",
+                 sequence_model: Optional[str] = None,
+                 sequence_window: int = 30,
+                 sequence_stride: int = 1,
+                 sequence_min_confidence: float = 0.6):
         """
         Inicializa el tracker de manos.
         
@@ -84,7 +240,105 @@ class HandTracker:
             camera_id: ID de la cámara (0 = cámara predeterminada)
             mirror_mode: Si True, voltea la imagen horizontalmente
             show_window: Si True, muestra ventana de debug con OpenCV
+            pipelined: Si True, separa captura / inferencia / salida en hilos
+                distintos conectados por ranuras de "último frame"
+            stats_interval: Segundos entre reportes de estadísticas (throughput
+                en modo pipeline, datagrama de métricas) (0 desactiva)
+            wire_format: Formato de los datagramas de landmarks: "json" o
+                "binary" (ver wire_protocol.py)
+            record_path: Si se indica, graba landmarks + timestamps de cada
+                frame en este archivo .lmrec (ver landmark_recording.py)
+            replay_path: Si se indica, usa este .lmrec como fuente en lugar de
+                la cámara; no se inicializan cámara ni MediaPipe
+            replay_realtime: En replay, respetar los tiempos originales
+                (False = máxima velocidad)
+            replay_loop: En replay, volver a empezar al llegar al final
+            use_mediapipe: Si False no se inicializa MediaPipe (solo sirven
+                las etapas que reciben landmarks ya extraídos)
+            metrics: Si True, registra tiempos por etapa en un ring buffer
+                (ver metrics.py); se activa también al pedir un exportador
+            metrics_http_port: Puerto del endpoint local /metrics (Prometheus)
+            stats_port: Puerto UDP (en udp_ip) para el datagrama periódico de
+                estadísticas
+            adaptive: Si True, detecta sobre un ROI alrededor de la mano
+                anterior, reduce la resolución en reposo y salta MediaPipe /
+                ONNX cuando casi no hay movimiento (ver adaptive.py)
+            adaptive_motion_threshold: Diferencia media de gris bajo la cual
+                se salta MediaPipe (0 desactiva el salto)
+            adaptive_idle_scale: Escala del frame cuando no hay mano
+            prediction_cache_size: Entradas del LRU de predicciones por pose
+                cuantizada (0 desactiva, ver prediction_cache.py)
+            prediction_cache_grid: Tamaño de celda de la cuantización (en
+                unidades normalizadas por el tamaño de la mano)
+            video_transport: "single" (un datagrama por JPEG, máx. ~65 KB),
+                "fragmented" (fragmentos numerados del tamaño de la MTU) o
+                "shm" (frames sin comprimir en un ring en memoria compartida
+                para un consumidor local, ver shm_transport.py; si no se
+                puede crear se vuelve a "single")
+            video_mtu: MTU usada para dimensionar los fragmentos de video
+            video_async: Si True, el JPEG se codifica y envía en un hilo
+                aparte, siempre sobre el frame más reciente (ver video_encoder.py)
+            video_target_bitrate: Bytes por segundo objetivo del video; ajusta
+                calidad / ancho / FPS (0 desactiva, requiere video_async)
+            video_encode_budget_ms: Tiempo máximo promedio de codificación
+                por frame (0 desactiva, requiere video_async)
+            video_shm_path: Archivo del ring con video_transport "shm"
+                (default: shm_transport.default_path())
+            video_shm_format: Orden de canales en el ring: "rgb" o "bgr"
+            control_port: Si se indica, landmarks y video se reparten a los
+                suscriptores registrados en este puerto UDP de control (ver
+                subscriber_hub.py)
+            control_host: Dirección en la que escucha el puerto de control
+                (default: UDP_IP, solo esta máquina)
+            subscriber_timeout: Segundos sin heartbeat tras los cuales se da
+                de baja a un suscriptor
+            static_subscriber: Con control_port, mantener udp_ip:udp_port /
+                udp_video_port como suscriptor fijo (Unity sin protocolo de control)
+            max_num_hands: Manos a seguir; con más de una, todas se predicen
+                en un solo batch del modelo y se envían con ID estable y
+                lateralidad (ver multi_hand.py)
+            smoothing: Estabilización temporal de la letra: "ema", "mean" o
+                "vote" (None desactiva, ver smoothing.py)
+            smoothing_window: Frames de la ventana de "mean" / "vote"
+            smoothing_alpha: Peso del frame nuevo en "ema"
+            smoothing_hold: Segundos que una letra nueva debe sostenerse
+            smoothing_min_confidence: Puntaje mínimo para adoptar una letra
+            send_on_change: Si True, solo se envía a Unity cuando cambia la
+                letra estable o la presencia de mano (más un keepalive cada
+                SEND_KEEPALIVE segundos)
+            onnx_profile: Perfil de ejecución de ONNX Runtime (ver
+                ``onnx_model.PROFILES``)
+            onnx_options: Campos de ``onnx_model.SessionProfile`` que
+                reemplazan a los del perfil (p. ej. {"intra_op_threads": 2})
+            onnx_cache_dir: Directorio de caché del modelo optimizado (None
+                = optimizar el grafo en cada arranque)
+            onnx_warmup: Llamadas de warm-up con datos de prueba al cargar el
+                modelo (0 desactiva)
+            parallel_init: Si True, MediaPipe, el modelo ONNX y la cámara se
+                inicializan en hilos en paralelo
+            overlay_fps: Máximo de frames por segundo con overlay dibujado y
+                mostrado en la ventana, independiente de la detección (0 =
+                todos); los frames que toca streamear siempre llevan overlay
+            capture_source: Fuente de frames en lugar de ``camera_id``: ruta
+                de video, pipeline de GStreamer o "synthetic" (ver capture.py)
+            capture_backend: Backend de captura ("auto", "v4l2", "gstreamer",
+                "dshow", ...; ver ``capture.BACKENDS``)
+            capture_width, capture_height: Resolución pedida a la cámara
+            capture_fps: FPS pedidos a la cámara (0 = los del driver)
+            capture_fourcc: Formato de píxel pedido, p. ej. "MJPG" (None = el
+                del driver)
+            capture_buffer: Frames en el buffer del driver (None = el del driver)
+            capture_mode: "latest" (hilo de captura, siempre el frame más
+                reciente) o "direct"; con ``pipelined`` siempre es "direct"
+            sequence_model: Modelo ONNX de señas dinámicas sobre una ventana
+                de landmarks, fusionado con el estático (None desactiva, ver
+                sequence.py)
+            sequence_window: Frames de la ventana si el modelo no la fija
+            sequence_stride: Cada cuántos frames se corre el modelo de secuencias
+            sequence_min_confidence: Probabilidad mínima de una seña dinámica
+                para reemplazar a la estática
         """
+        self._init_started = time.perf_counter()
         self.model_path = model_path
         self.udp_ip = udp_ip
         self.udp_port = udp_port
@@ -93,63 +347,278 @@ class HandTracker:
         self.video_width = int(video_width)
         self.video_jpeg_quality = int(video_jpeg_quality)
         self.camera_id = camera_id
+        self.capture_source = capture_source
+        self.capture_backend = capture_backend
+        self.capture_width = int(capture_width)
+        self.capture_height = int(capture_height)
+        self.capture_fps = float(capture_fps)
+        self.capture_fourcc = capture_fourcc
+        self.capture_buffer = capture_buffer
+        # PipelinedRunner ya tiene su propio hilo de captura con el mismo descarte
+        self.capture_mode = "direct" if pipelined else capture_mode
         self.mirror_mode = mirror_mode
         self.show_window = show_window
+        self.pipelined = pipelined
+        self.stats_interval = float(stats_interval)
+        self.wire_format = wire_format
+        self.record_path = record_path
+        self.replay_path = replay_path
+        self.replay_realtime = replay_realtime
+        self.replay_loop = replay_loop
+        self.use_mediapipe = use_mediapipe
+        self.metrics_http_port = metrics_http_port
+        self.stats_port = stats_port
+        self.adaptive = adaptive
+        self.adaptive_motion_threshold = float(adaptive_motion_threshold)
+        self.adaptive_idle_scale = float(adaptive_idle_scale)
+        self.detector = None
+        self.prediction_cache = None
+        if prediction_cache_size > 0:
+            from prediction_cache import PredictionCache
+            self.prediction_cache = PredictionCache(prediction_cache_size, prediction_cache_grid)
         
         # Estado
         self.is_running = False
         self.current_letter = ""
         self.confidence = 0.0
         self.fps = 0.0
+        self._fps_prev_time = time.time()
+        self._fps_frame_count = 0
 
         # Video streaming state
         self._last_video_send_time = 0.0
+        self.video_transport = video_transport
+        self.video_mtu = int(video_mtu)
+        self._video_fragmenter = None
+        self.video_frames_dropped = 0
+        self.video_async = video_async
+        self.video_target_bitrate = float(video_target_bitrate)
+        self.video_encode_budget_ms = float(video_encode_budget_ms)
+        self.video_encoder = None
+        self.video_shm_path = video_shm_path
+        self.video_shm_format = video_shm_format
+        self._video_shm = None
+        self.control_port = control_port
+        self.control_host = control_host or UDP_IP
+        self.subscriber_timeout = float(subscriber_timeout)
+        self.static_subscriber = static_subscriber
+        self.hub = None
+        self.max_num_hands = max(1, int(max_num_hands))
+        self.supports_batch = False
+        self.hand_results = []
+        self._hand_ids = None
+        # La tecla 'm' se atiende en el hilo de salida pero reinicia estado de
+        # la inferencia: se encola y la aplica el hilo que llama a process_frame
+        self._mirror_toggle = threading.Event()
+        self.smoothing = smoothing
+        self._smoother_options = dict(method=smoothing, window=smoothing_window, alpha=smoothing_alpha,
+                                      hold_time=smoothing_hold, min_confidence=smoothing_min_confidence)
+        self.sequence_model = sequence_model
+        self._sequence_options = dict(window=sequence_window, stride=sequence_stride,
+                                      min_confidence=sequence_min_confidence)
+        self.sequence = None
+        # Clases que puede producir el tracker: CLASSES más las dinámicas del
+        # modelo de secuencias
+        self.classes = list(CLASSES)
+        self.smoother = self._create_smoother() if smoothing else None
+        self._hand_smoothers = {}
+        self.send_on_change = send_on_change
+        self._last_sent_state = None
+        self._last_sent_time = 0.0
+        self.messages_suppressed = 0
+        self.onnx_profile = onnx_profile
+        self.onnx_options = dict(onnx_options or {})
+        self.onnx_cache_dir = onnx_cache_dir
+        self.onnx_warmup = max(0, int(onnx_warmup))
+        self.parallel_init = parallel_init
+        self.overlay_fps = float(overlay_fps)
+        self.startup_seconds: Optional[float] = None
+        self.startup_breakdown: Dict[str, float] = {}
+        self.first_frame_ms: Optional[float] = None
+        if self.max_num_hands > 1:
+            from multi_hand import HandIdAssigner
+            self._hand_ids = HandIdAssigner()
+            if self.adaptive:
+                print("[WARN] --adaptive solo sigue una mano; se desactiva con --max-hands > 1")
+                self.adaptive = False
+
+        # Buffer de landmarks reutilizado en cada frame: entrada directa del
+        # modelo (1, 63) y vista (21, 3) para escribir punto por punto
+        self._landmark_buffer = np.zeros((1, 63), dtype=np.float32)
+        self._landmark_points = self._landmark_buffer.reshape(21, 3)
+        # Una fila por mano (batch N x 63 del modelo con varias manos)
+        self._hands_buffer = np.zeros((self.max_num_hands, 63), dtype=np.float32)
+        # Features de entrada del modelo (model.features.json, ver features.py);
+        # se crea al cargar el modelo
+        self.feature_spec = None
+        self.features = None
+        # Probabilidades por clase (orden de CLASSES) de la última inferencia;
+        # None / False si la letra salió de la caché
+        self._probability_reader = None
+        self._probability_buffer = np.zeros((self.max_num_hands, len(CLASSES)), dtype=np.float32)
+        self.last_probabilities: Optional[np.ndarray] = None
+        self._hand_probabilities_valid = [False] * self.max_num_hands
+        # Probabilidades fusionadas estático + secuencia (orden de self.classes);
+        # se dimensiona al cargar el modelo de secuencias
+        self._fused_buffer = None
+
+        # Codificador binario (buffer preasignado, se crea al primer uso)
+        self._binary_encoder = None
         
-        # Inicializar componentes
-        self._init_mediapipe()
-        self._init_onnx()
-        self._init_socket()
-        self._init_camera()
+        # Métricas por etapa (None = desactivadas, sin costo en el bucle)
+        self.metrics = None
+        self._metrics_exporters = []
+        if metrics or metrics_http_port is not None or stats_port is not None:
+            from metrics import StageMetrics, create_exporters
+            self.metrics = StageMetrics()
+            self._metrics_exporters = create_exporters(
+                self.metrics,
+                stats_address=(udp_ip, stats_port) if stats_port is not None else None,
+                http_port=metrics_http_port,
+                interval=self.stats_interval if self.stats_interval > 0 else 5.0)
+
+        # Fuente de landmarks grabada / grabador opcional
+        self.cap = None
+        self.hands = None
+        self.mp_hands = None
+        self.mp_drawing = None
+        self.mp_drawing_styles = None
+        self._landmark_style = None
+        self._connection_style = None
+        self._next_overlay_time = 0.0
+        self.overlays_skipped = 0
+        self.replay_source = None
+        self.recorder = None
         
+        # Inicializar componentes
+        if self.replay_path:
+            from landmark_recording import ReplaySource
+            self.replay_source = ReplaySource(self.replay_path, realtime=replay_realtime, loop=replay_loop)
+            print(f"[OK] Replay: {self.replay_path} ({len(self.replay_source)} registros)")
+            self._timed_init("onnx", self._init_onnx)
+            if self.sequence_model:
+                self._timed_init("sequence", self._init_sequence)
+            self._timed_init("socket", self._init_socket)
+            self._report_startup()
+            return
+
+        # MediaPipe, ONNX y cámara no dependen entre sí y pasan la mayor parte
+        # de su inicialización en código nativo: se solapan en hilos
+        steps = [("onnx", self._init_onnx), ("camera", self._init_camera)]
+        if self.use_mediapipe:
+            steps.insert(0, ("mediapipe", self._init_mediapipe))
+        if self.sequence_model:
+            steps.append(("sequence", self._init_sequence))
+        self._run_init_steps(steps)
+        if self.use_mediapipe and self.adaptive:
+            from adaptive import AdaptiveDetector
+            self.detector = AdaptiveDetector(self.hands,
+                                             idle_scale=self.adaptive_idle_scale,
+                                             motion_threshold=self.adaptive_motion_threshold)
+        self._timed_init("socket", self._init_socket)
+        self._timed_init("video", self._init_video_encoder)
+        if self.record_path:
+            from landmark_recording import LandmarkRecorder
+            self.recorder = LandmarkRecorder(self.record_path)
+            print(f"[OK] Grabando landmarks en: {self.record_path}")
+        self._report_startup()
+
+    def _timed_init(self, name: str, step):
+        t0 = time.perf_counter()
+        try:
+            step()
+        finally:
+            self.startup_breakdown[name] = time.perf_counter() - t0
+
+    def _run_init_steps(self, steps):
+        """Corre los pasos de inicialización (en paralelo si ``parallel_init``); propaga el primer error."""
+        if not self.parallel_init or len(steps) < 2:
+            for name, step in steps:
+                self._timed_init(name, step)
+            return
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="HandTracker-init") as pool:
+            futures = [pool.submit(self._timed_init, name, step) for name, step in steps]
+        for future in futures:
+            future.result()
+
+    def _report_startup(self):
+        self.startup_seconds = time.perf_counter() - self._init_started
+        parts = " | ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.startup_breakdown.items())
+        mode = "en paralelo" if self.parallel_init and not self.replay_path else "secuencial"
+        print(f"[OK] Tracker listo en {self.startup_seconds * 1000:.0f} ms ({parts}; {mode}) | "
+              f"{(time.perf_counter() - _PROCESS_START) * 1000:.0f} ms desde el inicio del proceso")
+
+    def _report_first_frame(self, seconds: float):
+        """Latencia del primer frame (captura -> salida), una sola vez por corrida."""
+        self.first_frame_ms = seconds * 1000.0
+        print(f"[INFO] Primer frame: {self.first_frame_ms:.1f} ms | primera predicción a los "
+              f"{(time.perf_counter() - _PROCESS_START) * 1000:.0f} ms del inicio del proceso")
+
     def _init_mediapipe(self):
         """Inicializa MediaPipe Hands."""
         print("[INFO] Inicializando MediaPipe Hands...")
+        import mediapipe as mp
         self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        if self.show_window:
+            self._load_drawing()
         
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
-            max_num_hands=MAX_NUM_HANDS,
+            max_num_hands=self.max_num_hands,
             min_detection_confidence=MIN_DETECTION_CONFIDENCE,
             min_tracking_confidence=MIN_TRACKING_CONFIDENCE
         )
         print("[OK] MediaPipe inicializado")
         
+    def _load_drawing(self):
+        """Utilidades de dibujo de MediaPipe (solo para la ventana / draw_overlay)."""
+        import mediapipe as mp
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.mp_drawing_styles = mp.solutions.drawing_styles
+        # Los estilos por defecto arman dicts nuevos en cada llamada: una sola vez
+        self._landmark_style = self.mp_drawing_styles.get_default_hand_landmarks_style()
+        self._connection_style = self.mp_drawing_styles.get_default_hand_connections_style()
+
     def _init_onnx(self):
         """Carga el modelo ONNX."""
         print(f"[INFO] Cargando modelo ONNX desde: {self.model_path}")
         try:
-            import onnxruntime as ort
-            
-            # Configurar opciones de sesión
-            sess_options = ort.SessionOptions()
-            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-            
-            # Crear sesión de inferencia
-            self.onnx_session = ort.InferenceSession(
-                self.model_path,
-                sess_options,
-                providers=['CPUExecutionProvider']
-            )
+            from features import FeatureExtractor, check_input_width, load_spec
+            from onnx_model import PROFILES, ProbabilityReader, create_session, describe_profile, warm_up
+
+            profile = PROFILES[self.onnx_profile]._replace(**self.onnx_options)
+            t0 = time.perf_counter()
+            # Sin ZipMap: probabilidades como tensor float32 en vez de un dict
+            # por frame. Con varias manos, además entrada N x 63 (una llamada
+            # por frame). Ambas reescrituras requieren el paquete onnx.
+            self.onnx_session, _, self.supports_batch = create_session(
+                self.model_path, batch=self.max_num_hands > 1, drop_zipmap=True,
+                profile=profile, cache_dir=self.onnx_cache_dir)
+            load_ms = (time.perf_counter() - t0) * 1000.0
             
             # Obtener información del modelo
             self.input_name = self.onnx_session.get_inputs()[0].name
             self.input_shape = self.onnx_session.get_inputs()[0].shape
+            self._probability_reader = ProbabilityReader(self.onnx_session, CLASSES)
+            self.feature_spec = load_spec(self.model_path)
+            check_input_width(self.feature_spec, self.onnx_session)
+            self.features = FeatureExtractor(self.feature_spec, max_rows=self.max_num_hands)
             
             print(f"[OK] Modelo cargado exitosamente")
             print(f"     Input: {self.input_name} - Shape: {self.input_shape}")
+            print(f"     Features: {self.feature_spec.describe()}")
             print(f"     Outputs: {[o.name for o in self.onnx_session.get_outputs()]}")
+            print(f"     Perfil: {self.onnx_profile} ({describe_profile(profile)}) | sesión {load_ms:.1f} ms")
+            if self.onnx_warmup:
+                durations = warm_up(self.onnx_session, self.input_name,
+                                    rows=self.max_num_hands if self.supports_batch else 1,
+                                    runs=self.onnx_warmup)
+                print(f"     Warm-up: {len(durations)} llamadas, primera {durations[0] * 1000:.2f} ms, "
+                      f"última {durations[-1] * 1000:.2f} ms")
+            if self._probability_reader.kind == "zipmap":
+                print("[WARN] Probabilidades vía ZipMap (dict por frame); instalar 'onnx' "
+                      "para leerlas como tensor")
             
         except FileNotFoundError:
             print(f"[ERROR] No se encontró el modelo: {self.model_path}")
@@ -162,165 +631,514 @@ class HandTracker:
         """Inicializa el socket UDP."""
         print(f"[INFO] Configurando UDP socket: {self.udp_ip}:{self.udp_port}")
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if self.video_transport == "fragmented" and self.udp_video_port is not None:
+            from video_transport import VideoFragmenter
+            self._video_fragmenter = VideoFragmenter(self.sock, (self.udp_ip, self.udp_video_port),
+                                                     mtu=self.video_mtu)
+            print(f"[OK] Video fragmentado: {self._video_fragmenter.payload_size} bytes por fragmento")
+        if self.control_port is not None:
+            from subscriber_hub import SubscriberHub
+            self.hub = SubscriberHub(host=self.control_host, port=self.control_port, timeout=self.subscriber_timeout).start()
+            if self.static_subscriber:
+                self.hub.add_static({
+                    "landmarks": (self.udp_ip, self.udp_port),
+                    "video": (self.udp_ip, self.udp_video_port) if self.udp_video_port is not None else None,
+                })
         print("[OK] Socket UDP configurado")
         
+    def _init_video_encoder(self):
+        """Arranca el hilo de codificación de video (y el control de bitrate si se pidió)."""
+        if self.udp_video_port is None or not self.video_async or self.video_transport == "shm":
+            return
+        from video_encoder import BitrateController, VideoEncoderWorker
+        controller = None
+        if self.video_target_bitrate > 0 or self.video_encode_budget_ms > 0:
+            controller = BitrateController(self.video_jpeg_quality, self.video_width, self.video_fps,
+                                           target_bitrate=self.video_target_bitrate,
+                                           encode_budget_ms=self.video_encode_budget_ms)
+            print(f"[OK] Control de video: objetivo {self.video_target_bitrate * 8 / 1000:.0f} kbit/s, "
+                  f"presupuesto {self.video_encode_budget_ms:g} ms")
+        self.video_encoder = VideoEncoderWorker(self, controller, stats_interval=self.stats_interval).start()
+
+    def _init_sequence(self):
+        """Carga el modelo de señas dinámicas (ver sequence.py)."""
+        from onnx_model import PROFILES
+        from sequence import SequenceRecognizer
+
+        print(f"[INFO] Cargando modelo de secuencias desde: {self.sequence_model}")
+        try:
+            profile = PROFILES[self.onnx_profile]._replace(**self.onnx_options)
+            self.sequence = SequenceRecognizer(self.sequence_model, profile=profile,
+                                               cache_dir=self.onnx_cache_dir, warmup=self.onnx_warmup,
+                                               **self._sequence_options)
+        except Exception as e:
+            print(f"[ERROR] No se pudo cargar el modelo de secuencias: {e}")
+            self.sequence = None
+            return
+        unknown = [label for label in self.sequence.dynamic_classes if label not in DYNAMIC_CLASSES]
+        if unknown:
+            print(f"[WARN] Clases del modelo de secuencias fuera de DYNAMIC_CLASSES: {', '.join(unknown)}")
+        self.classes = CLASSES + self.sequence.dynamic_classes
+        self._fused_buffer = np.zeros(len(self.classes), dtype=np.float32)
+        if self.smoothing:
+            self.smoother = self._create_smoother()
+        print(f"[OK] Modelo de secuencias: T={self.sequence.length} frames, "
+              f"clases {', '.join(self.sequence.labels)}")
+
     def _init_camera(self):
-        """Inicializa la cámara."""
-        print(f"[INFO] Abriendo cámara {self.camera_id}...")
-        self.cap = cv2.VideoCapture(self.camera_id)
+        """Inicializa la cámara (camera_id=None: sin cámara, p. ej. benchmarks)."""
+        _import_cv2()
+        source = self.capture_source if self.capture_source is not None else self.camera_id
+        if source is None:
+            return
+        from capture import open_source
+        print(f"[INFO] Abriendo cámara {source}...")
+        self.cap = open_source(source, self.capture_backend, self.capture_width, self.capture_height,
+                               fps=self.capture_fps, fourcc=self.capture_fourcc,
+                               buffer_size=self.capture_buffer, mode=self.capture_mode)
         
         if not self.cap.isOpened():
             print("[ERROR] No se pudo abrir la cámara")
             return
-            
-        # Configurar resolución (opcional)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
         
-        # Obtener resolución real
-        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        print(f"[OK] Cámara abierta: {width}x{height}")
+        # Lo que el driver aceptó realmente (backend, resolución, formato, FPS)
+        print(f"[OK] Cámara abierta: {self.cap.description} | lectura {self.cap.mode}")
         
-    def extract_landmarks(self, hand_landmarks) -> List[float]:
+    def extract_landmarks(self, hand_landmarks, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        Extrae los 21 landmarks de la mano como una lista plana.
+        Extrae los 21 landmarks de la mano en el buffer preasignado del tracker.
+        
+        No reserva memoria: escribe sobre ``self._landmark_points`` (vista
+        (21, 3) de ``self._landmark_buffer``), que se sobrescribe en el
+        siguiente frame. Copiar el resultado si se necesita conservarlo.
         
         Args:
             hand_landmarks: Landmarks de MediaPipe
+            out: Fila float32 de 63 valores donde escribir (default: el
+                buffer del tracker)
             
         Returns:
-            Lista de 63 valores (21 puntos x 3 coordenadas)
-        """
-        points = []
-        for landmark in hand_landmarks.landmark:
-            points.append(landmark.x)
-            points.append(landmark.y)
-            points.append(landmark.z)
-        return points
+            Vista float32 de 63 valores (21 puntos x 3 coordenadas)
+        """
+        if out is None:
+            out = self._landmark_buffer[0]
+        points = out.reshape(21, 3)
+        for i, landmark in enumerate(hand_landmarks.landmark):
+            row = points[i]
+            row[0] = landmark.x
+            row[1] = landmark.y
+            row[2] = landmark.z
+        return out
     
-    def landmarks_to_vectors(self, landmarks: List[float]) -> List[Tuple[float, float, float]]:
+    def landmarks_to_vectors(self, landmarks) -> np.ndarray:
         """
-        Convierte la lista plana de landmarks a una lista de vectores (x, y, z).
+        Convierte los landmarks planos a vectores (x, y, z).
         
         Args:
-            landmarks: Lista de 63 valores
+            landmarks: 63 valores (lista o array)
             
         Returns:
-            Lista de 21 tuplas (x, y, z)
+            Array (21, 3); es una vista (sin copia) si la entrada ya es float32
         """
-        vectors = []
-        for i in range(0, len(landmarks), 3):
-            vectors.append((landmarks[i], landmarks[i + 1], landmarks[i + 2]))
-        return vectors
+        return np.asarray(landmarks, dtype=np.float32).reshape(-1, 3)
     
-    def predict_letter(self, landmarks: List[float]) -> Tuple[str, float]:
+    def predict_letter(self, landmarks) -> Tuple[str, float]:
         """
         Ejecuta el modelo ONNX para predecir la letra.
         
         Args:
-            landmarks: Lista de 63 valores (21 puntos x 3 coordenadas)
+            landmarks: 63 valores (21 puntos x 3 coordenadas). Si es el array
+                float32 devuelto por extract_landmarks se usa directamente
+                como entrada del modelo, sin copias.
             
         Returns:
             Tupla (letra_predicha, confianza)
         """
+        self.last_probabilities = None
         if self.onnx_session is None:
             return ("?", 0.0)
+
+        cache = self.prediction_cache
+        if cache is None:
+            return self._run_model(landmarks)
+
+        # Pose sostenida: servir desde la caché sin pasar por ONNX
+        key = cache.key(landmarks)
+        cached, verify = cache.lookup(key)
+        if cached is not None and not verify:
+            return cached
+        result = self._run_model(landmarks)
+        if result[0] != "?":
+            cache.store(key, result, cached)
+        return result
+
+    def predict_letters(self, batch: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        Predice letra y confianza de varias manos con una sola llamada al modelo.
+        
+        Args:
+            batch: Array (N, 63) float32 contiguo (p. ej. ``_hands_buffer[:N]``)
             
+        Returns:
+            Lista de N tuplas (letra, confianza)
+        """
+        n = batch.shape[0]
+        valid = self._hand_probabilities_valid
+        if n == 1 or self.onnx_session is None:
+            results = []
+            for i, row in enumerate(batch):
+                results.append(self.predict_letter(row))
+                valid[i] = self.last_probabilities is not None
+                if valid[i]:
+                    self._probability_buffer[i] = self.last_probabilities
+            return results
+
+        # Con caché, solo las manos que no aciertan pasan por ONNX
+        cache = self.prediction_cache
+        results: List[Optional[Tuple[str, float]]] = [None] * n
+        keys: List[Optional[bytes]] = [None] * n
+        previous: List[Optional[Tuple[str, float]]] = [None] * n
+        pending = list(range(n))
+        if cache is not None:
+            pending = []
+            for i in range(n):
+                keys[i] = cache.key(batch[i])
+                cached, verify = cache.lookup(keys[i])
+                if cached is not None and not verify:
+                    results[i] = cached
+                else:
+                    previous[i] = cached
+                    pending.append(i)
+
+        for i in range(n):
+            valid[i] = False
+        if pending:
+            rows = batch if len(pending) == n else batch[pending]
+            predictions, probabilities = self._run_model_batch(rows)
+            for row, (i, result) in enumerate(zip(pending, predictions)):
+                results[i] = result
+                if probabilities is not None:
+                    self._probability_buffer[i] = probabilities[row]
+                    valid[i] = True
+                if cache is not None and result[0] != "?":
+                    cache.store(keys[i], result, previous[i])
+        return results
+
+    def _run_model_batch(self, rows: np.ndarray) -> Tuple[List[Tuple[str, float]], Optional[np.ndarray]]:
+        """
+        Corre el modelo ONNX sobre N filas en una sola llamada (si la sesión lo admite).
+
+        Returns:
+            Tupla (N tuplas (letra, confianza), probabilidades (N, clases) o None)
+        """
+        if not self.supports_batch:
+            predictions = []
+            probabilities = np.zeros((rows.shape[0], len(CLASSES)), dtype=np.float32)
+            for i, row in enumerate(rows):
+                predictions.append(self._run_model(row))
+                if self.last_probabilities is None:
+                    probabilities = None
+                elif probabilities is not None:
+                    probabilities[i] = self.last_probabilities
+            return predictions, probabilities
         try:
-            # Preparar entrada
-            input_data = np.array([landmarks], dtype=np.float32)
+            outputs = self.onnx_session.run(None, {self.input_name: self.features.transform(rows)})
+            probabilities = self._probability_reader.probabilities(outputs)
+            if probabilities is not None:
+                confidences = probabilities.max(axis=1)
+            else:
+                confidences = np.ones(len(outputs[0]), dtype=np.float32)
+            return [(str(label), float(conf)) for label, conf in zip(outputs[0], confidences)], probabilities
+        except Exception as e:
+            print(f"[ERROR] Error en predicción: {e}")
+            return [("?", 0.0)] * rows.shape[0], None
+
+    def predict_proba(self, landmarks) -> Optional[np.ndarray]:
+        """
+        Probabilidad de cada clase para una fila de landmarks (sin pasar por la caché).
+
+        Returns:
+            Array float32 (len(CLASSES),) en el orden de ``CLASSES`` (copia), o
+            None si no hay modelo o no expone probabilidades
+        """
+        if self.onnx_session is None:
+            return None
+        self._run_model(landmarks)
+        probabilities = self.last_probabilities
+        return None if probabilities is None else probabilities.copy()
+
+    def predict_top_k(self, landmarks, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Las ``k`` letras más probables para una fila de landmarks.
+
+        Returns:
+            Lista de tuplas (letra, probabilidad) de mayor a menor (vacía sin
+            probabilidades)
+        """
+        from onnx_model import top_k
+        probabilities = self.predict_proba(landmarks)
+        return [] if probabilities is None else top_k(probabilities, CLASSES, k)
+
+    def _create_smoother(self):
+        from smoothing import LetterStabilizer
+        return LetterStabilizer(self.classes, **self._smoother_options)
+
+    def _fuse_sequence(self, letter: str, confidence: float, landmarks,
+                       probabilities: Optional[np.ndarray], hand_id: int = 0
+                       ) -> Tuple[str, float, Optional[np.ndarray]]:
+        """
+        Agrega el frame a la ventana del modelo de secuencias y fusiona su
+        puntaje con la predicción estática (sin modelo de secuencias devuelve
+        la entrada tal cual).
+
+        Returns:
+            Tupla (letra, confianza, probabilidades en el orden de
+            ``self.classes`` o None)
+        """
+        if self.sequence is None:
+            return letter, confidence, probabilities
+        dynamic = self.sequence.update(landmarks, hand_id)
+        return self.sequence.fuse(letter, confidence, dynamic, probabilities,
+                                  out=self._fused_buffer if probabilities is not None else None)
+
+    def _stabilize(self, letter: str, confidence: float, hand_detected: bool,
+                   smoother=None, probabilities: Optional[np.ndarray] = None,
+                   now: Optional[float] = None) -> Tuple[str, float]:
+        """
+        Pasa la predicción cruda por el estabilizador temporal (si está activo),
+        con el vector de probabilidades del modelo si se tiene. ``now`` es el
+        instante del frame (default: reloj monotónico; en replay, el de la
+        grabación).
+
+        Returns:
+            Tupla (letra estable, confianza estable); sin suavizado devuelve
+            la entrada tal cual
+        """
+        smoother = smoother or self.smoother
+        if smoother is None:
+            return letter, confidence
+        event = smoother.update(letter, confidence, hand_detected, probabilities, now=now)
+        if event is not None and smoother is self.smoother:
+            print(f"[LETRA] {event.previous or '-'} -> {event.letter or '-'} ({event.confidence:.0%})")
+        return smoother.letter, smoother.confidence
+
+    def _run_model(self, landmarks) -> Tuple[str, float]:
+        """Corre el modelo ONNX sobre una fila de 63 landmarks."""
+        try:
+            # Preparar entrada (con features "raw", vista (1, 63) si ya es
+            # float32 contiguo)
+            input_data = self.features.transform(landmarks)
             
             # Ejecutar inferencia
             outputs = self.onnx_session.run(None, {self.input_name: input_data})
             
             # El modelo SVM devuelve:
             # outputs[0]: label (string)
-            # outputs[1]: probabilidades (dict)
+            # outputs[1]: probabilidades (tensor (1, clases) sin ZipMap, o dict)
             
             predicted_label = outputs[0][0]
             
             # Obtener probabilidades si están disponibles
-            if len(outputs) > 1 and outputs[1] is not None:
-                probabilities = outputs[1][0]
-                if isinstance(probabilities, dict):
-                    confidence = max(probabilities.values()) if probabilities else 0.0
-                else:
-                    confidence = 1.0
+            probabilities = self._probability_reader.probabilities(outputs, out=self._probability_buffer[:1])
+            if probabilities is not None:
+                self.last_probabilities = probabilities[0]
+                confidence = probabilities[0].max()
             else:
+                self.last_probabilities = None
                 confidence = 1.0
                 
             return (str(predicted_label), float(confidence))
             
         except Exception as e:
             print(f"[ERROR] Error en predicción: {e}")
+            self.last_probabilities = None
             return ("?", 0.0)
     
-    def send_to_unity(self, landmarks: List[float], letter: str, confidence: float, 
-                      hand_detected: bool):
+    def encode_message(self, landmarks, letter: str, confidence: float,
+                       hand_detected: bool, wire_format: Optional[str] = None,
+                       hands=None):
         """
-        Envía los datos a Unity vía UDP.
+        Serializa el mensaje de landmarks en el formato de cable.
         
         Args:
-            landmarks: Lista de 42 valores de landmarks
+            landmarks: 63 valores de landmarks (lista o array)
             letter: Letra predicha
             confidence: Confianza de la predicción
             hand_detected: Si se detectó una mano
+            wire_format: "json" o "binary" (default: self.wire_format)
+            hands: Lista de ``multi_hand.HandResult`` (con varias manos); los
+                campos anteriores son los de la mano principal
+            
+        Returns:
+            bytes (JSON) o memoryview sobre el buffer del codificador binario,
+            válido hasta la siguiente llamada
         """
+        if (wire_format or self.wire_format) == "binary":
+            if self._binary_encoder is None:
+                from wire_protocol import BinaryLandmarkEncoder
+                self._binary_encoder = BinaryLandmarkEncoder(CLASSES + DYNAMIC_CLASSES,
+                                                             max_hands=self.max_num_hands)
+            return self._binary_encoder.encode(landmarks, letter, confidence,
+                                               hand_detected, time.monotonic(), hands)
+
         # Crear mensaje JSON
         data = {
             "hand_detected": hand_detected,
-            "landmarks": landmarks if hand_detected else [],
+            "landmarks": (landmarks.tolist() if isinstance(landmarks, np.ndarray) else landmarks)
+                         if hand_detected else [],
             "letter": letter,
             "confidence": confidence,
             "timestamp": time.time()
         }
+        if hands:
+            data["hands"] = [hand.to_dict() for hand in hands]
+        return json.dumps(data).encode('utf-8')
+
+    def send_to_unity(self, landmarks: List[float], letter: str, confidence: float, 
+                      hand_detected: bool, hands=None):
+        """
+        Envía los datos a Unity vía UDP.
         
-        # Enviar por UDP
+        Args:
+            landmarks: 63 valores de landmarks (lista o array)
+            letter: Letra predicha
+            confidence: Confianza de la predicción
+            hand_detected: Si se detectó una mano
+            hands: Lista de ``multi_hand.HandResult`` (con varias manos)
+        """
+        if self.send_on_change:
+            # Solo cambios de letra / presencia de mano, más un keepalive
+            state = (letter, hand_detected, tuple((hand.id, hand.letter) for hand in hands or ()))
+            now = time.monotonic()
+            if state == self._last_sent_state and now - self._last_sent_time < SEND_KEEPALIVE:
+                self.messages_suppressed += 1
+                return
+            self._last_sent_state = state
+            self._last_sent_time = now
         try:
-            message = json.dumps(data)
-            self.sock.sendto(message.encode('utf-8'), (self.udp_ip, self.udp_port))
+            if self.hub is not None:
+                if self.hub.has_subscribers("landmarks"):
+                    # bytes(): el buffer binario se reutiliza en el próximo frame
+                    message = self.encode_message(landmarks, letter, confidence, hand_detected, hands=hands)
+                    self.hub.publish("landmarks", bytes(message))
+                return
+            message = self.encode_message(landmarks, letter, confidence, hand_detected, hands=hands)
+            self.sock.sendto(message, (self.udp_ip, self.udp_port))
         except Exception as e:
             print(f"[ERROR] Error enviando UDP: {e}")
 
+    def encode_video_frame(self, frame_bgr: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Reduce el frame a ``video_width`` y lo codifica como JPEG.
+        
+        Returns:
+            Buffer uint8 con el JPEG, o None si falló la codificación
+        """
+        frame = frame_bgr
+        if self.video_width > 0 and frame.shape[1] > self.video_width:
+            scale = self.video_width / float(frame.shape[1])
+            new_h = max(1, int(frame.shape[0] * scale))
+            frame = cv2.resize(frame, (self.video_width, new_h), interpolation=cv2.INTER_AREA)
+
+        encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(np.clip(self.video_jpeg_quality, 10, 95))]
+        ok, buf = cv2.imencode('.jpg', frame, encode_params)
+        return buf if ok else None
+
+    def _video_due(self, now: float) -> bool:
+        """True si toca mandar un frame de video (puerto configurado y límite de FPS cumplido)."""
+        if self.udp_video_port is None:
+            return False
+        return self.video_fps <= 0 or (now - self._last_video_send_time) >= (1.0 / self.video_fps)
+
     def _send_video_frame_to_unity(self, frame_bgr: np.ndarray):
         """Envía un frame JPEG (como bytes) vía UDP a Unity en un puerto separado.
 
         Nota: UDP tiene límite de tamaño por datagrama (~65KB). Por eso se manda
-        un frame reducido y con calidad moderada.
+        un frame reducido y con calidad moderada. Con video_transport
+        "fragmented" el JPEG se parte en fragmentos del tamaño de la MTU
+        (ver video_transport.py) y ese límite no aplica.
         """
-        if self.udp_video_port is None:
-            return
-
         now = time.time()
-        if self.video_fps > 0 and (now - self._last_video_send_time) < (1.0 / self.video_fps):
+        if not self._video_due(now):
             return
 
-        try:
-            frame = frame_bgr
-            if self.video_width > 0 and frame.shape[1] > self.video_width:
-                scale = self.video_width / float(frame.shape[1])
-                new_h = max(1, int(frame.shape[0] * scale))
-                frame = cv2.resize(frame, (self.video_width, new_h), interpolation=cv2.INTER_AREA)
-
-            encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(np.clip(self.video_jpeg_quality, 10, 95))]
-            ok, buf = cv2.imencode('.jpg', frame, encode_params)
-            if not ok:
-                return
+        if self.hub is not None and self.video_transport != "shm" and not self.hub.has_subscribers("video"):
+            return
 
-            payload = buf.tobytes()
-            # Avoid sending oversized UDP packets
-            if len(payload) > 65000:
-                return
+        if self.video_transport == "shm":
+            self._write_video_shm(frame_bgr)
+            self._last_video_send_time = now
+            return
 
-            self.sock.sendto(payload, (self.udp_ip, self.udp_video_port))
+        if self.video_encoder is not None:
+            # La codificación corre en su propio hilo (ver video_encoder.py)
+            self.video_encoder.submit(frame_bgr)
             self._last_video_send_time = now
+            return
+
+        try:
+            buf = self.encode_video_frame(frame_bgr)
+            if buf is not None and self.send_encoded_video(buf):
+                self._last_video_send_time = now
         except Exception:
             # Silencioso: si el video falla, no queremos romper la detección
             return
+
+    def _write_video_shm(self, frame_bgr: np.ndarray):
+        """Escribe el frame (reducido a ``video_width``) en el ring de memoria compartida."""
+        if self._video_shm is None:
+            from shm_transport import SharedFrameWriter, default_path
+            height, width = frame_bgr.shape[:2]
+            if 0 < self.video_width < width:
+                height = max(1, int(height * self.video_width / float(width)))
+                width = self.video_width
+            path = self.video_shm_path or default_path()
+            try:
+                self._video_shm = SharedFrameWriter(path, width, height, pixel_format=self.video_shm_format)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] No se pudo crear la memoria compartida ({e}); se usa UDP")
+                self.video_transport = "single"
+                self._init_video_encoder()
+                return
+            print(f"[OK] Video en memoria compartida: {path} ({width}x{height} {self.video_shm_format})")
+        self._video_shm.write(frame_bgr)
+
+    def send_encoded_video(self, buf: np.ndarray) -> bool:
+        """
+        Envía un JPEG ya codificado al puerto de video.
+
+        Returns:
+            True si se envió, False si se descartó por tamaño o error
+        """
+        try:
+            if self.hub is not None:
+                if self._video_fragmenter is not None:
+                    datagrams = self._video_fragmenter.fragments(buf)
+                elif buf.size <= 65000:
+                    datagrams = [buf.tobytes()]
+                else:
+                    datagrams = []
+                if not datagrams:
+                    self.video_frames_dropped += 1
+                    return False
+                self.hub.publish_many("video", datagrams)
+                return True
+            if self._video_fragmenter is not None:
+                if self._video_fragmenter.send(buf) == 0:
+                    self.video_frames_dropped += 1
+                    return False
+            else:
+                # Avoid sending oversized UDP packets
+                if buf.size > 65000:
+                    self.video_frames_dropped += 1
+                    return False
+                self.sock.sendto(buf, (self.udp_ip, self.udp_video_port))
+            return True
+        except Exception:
+            return False
     
     def draw_overlay(self, frame: np.ndarray, hand_landmarks, 
-                     letter: str, confidence: float) -> np.ndarray:
+                     letter: str, confidence: float, hands=None) -> np.ndarray:
         """
         Dibuja la información de debug sobre el frame.
         
@@ -329,26 +1147,44 @@ class HandTracker:
             hand_landmarks: Landmarks de MediaPipe (o None)
             letter: Letra predicha
             confidence: Confianza
+            hands: Lista de ``multi_hand.HandResult`` (con varias manos se
+                dibujan todas, con su ID y letra)
             
         Returns:
             Frame con overlay dibujado
         """
         h, w, _ = frame.shape
+        if self.mp_drawing is None and (hands or hand_landmarks):
+            self._load_drawing()
         
         # Dibujar landmarks de la mano
-        if hand_landmarks:
+        if hands:
+            for hand in hands:
+                self.mp_drawing.draw_landmarks(
+                    frame,
+                    hand.proto,
+                    self.mp_hands.HAND_CONNECTIONS,
+                    self._landmark_style,
+                    self._connection_style
+                )
+                wrist = hand.proto.landmark[0]
+                cv2.putText(frame, f"#{hand.id} {hand.handedness[:1]} {hand.letter}",
+                            (int(wrist.x * w), min(h - 5, int(wrist.y * h) + 20)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        elif hand_landmarks:
             self.mp_drawing.draw_landmarks(
                 frame,
                 hand_landmarks,
                 self.mp_hands.HAND_CONNECTIONS,
-                self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                self.mp_drawing_styles.get_default_hand_connections_style()
+                self._landmark_style,
+                self._connection_style
             )
         
-        # Fondo semi-transparente para el texto
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (250, 130), (0, 0, 0), -1)
-        frame = cv2.addWeighted(overlay, 0.6, frame, 0.4, 0)
+        # Fondo semi-transparente para el texto: se oscurece solo el panel, en
+        # el lugar (mismo resultado que addWeighted con un rectángulo negro al
+        # 60%, sin copiar ni recorrer el frame completo)
+        panel = frame[10:131, 10:251]
+        cv2.convertScaleAbs(panel, dst=panel, alpha=0.4)
         
         # Información del estado
         status_color = (0, 255, 0) if hand_landmarks else (0, 0, 255)
@@ -379,97 +1215,357 @@ class HandTracker:
         
         return frame
     
-    def run(self):
+    def process_frame(self, frame: np.ndarray):
         """
-        Bucle principal del tracker.
+        Ejecuta detección de landmarks y predicción sobre un frame BGR.
+
+        Args:
+            frame: Frame de video (BGR, ya volteado si aplica modo espejo)
+
+        Returns:
+            Tupla (hand_landmarks, landmarks, letra, confianza). hand_landmarks
+            es None si no se detectó ninguna mano.
         """
-        if not self.cap.isOpened():
-            print("[ERROR] La cámara no está disponible")
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start()
+
+        reuse_prediction = False
+        if self.detector is not None:
+            # ROI / reposo / salto por movimiento (incluye conversión y MediaPipe)
+            hand_landmarks, reuse_prediction = self.detector.detect(frame, metrics)
+        else:
+            # Convertir a RGB para MediaPipe
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if metrics is not None:
+                metrics.lap(STAGE_CONVERT)
+
+            # Procesar con MediaPipe
+            results = self.hands.process(rgb_frame)
+            if metrics is not None:
+                metrics.lap(STAGE_MEDIAPIPE)
+            if self.max_num_hands > 1:
+                return self._process_hands(results, metrics)
+            hand_landmarks = results.multi_hand_landmarks[0] if results.multi_hand_landmarks else None
+
+        if hand_landmarks is None:
+            if self.recorder is not None:
+                self.recorder.write(time.monotonic(), None, False)
+            self._stabilize("", 0.0, False)
+            if self.sequence is not None:
+                self.sequence.release()
+            return (None, [], "", 0.0)
+
+        # Extraer landmarks y predecir letra
+        landmarks = self.extract_landmarks(hand_landmarks)
+        if self.recorder is not None:
+            self.recorder.write(time.monotonic(), landmarks, True)
+        if reuse_prediction and self.current_letter:
+            # Mano quieta: vale el resultado ya estabilizado; sin predicción
+            # nueva no se alimenta al estabilizador ni a la ventana de secuencias
+            if self.smoother is not None:
+                self.smoother.keep_alive()
+            if metrics is not None:
+                metrics.lap(STAGE_INFERENCE)
+            return (hand_landmarks, landmarks, self.current_letter, self.confidence)
+
+        letter, confidence = self.predict_letter(landmarks)
+        letter, confidence, probabilities = self._fuse_sequence(letter, confidence, landmarks,
+                                                                self.last_probabilities)
+        if metrics is not None:
+            metrics.lap(STAGE_INFERENCE)
+        letter, confidence = self._stabilize(letter, confidence, True, probabilities=probabilities)
+
+        self.current_letter = letter
+        self.confidence = confidence
+        return (hand_landmarks, landmarks, letter, confidence)
+
+    def _process_hands(self, results, metrics):
+        """
+        Variante de process_frame para varias manos: un batch N x 63 al
+        modelo, IDs estables y lateralidad en ``self.hand_results``. Devuelve
+        la mano principal (la de menor ID) con la misma forma que process_frame.
+        """
+        from multi_hand import HandResult
+
+        protos = results.multi_hand_landmarks or []
+        n = min(len(protos), self.max_num_hands)
+        if n == 0:
+            self.hand_results = []
+            self._hand_ids.reset()
+            self._hand_smoothers.clear()
+            if self.sequence is not None:
+                self.sequence.release()
+            if self.recorder is not None:
+                self.recorder.write(time.monotonic(), None, False)
+            return (None, [], "", 0.0)
+
+        batch = self._hands_buffer[:n]
+        for i in range(n):
+            self.extract_landmarks(protos[i], out=batch[i])
+        sides = []
+        scores = []
+        for i in range(n):
+            if results.multi_handedness and i < len(results.multi_handedness):
+                classification = results.multi_handedness[i].classification[0]
+                sides.append(classification.label)
+                scores.append(float(classification.score))
+            else:
+                sides.append("")
+                scores.append(0.0)
+        ids = self._hand_ids.assign(batch, sides)
+        predictions = self.predict_letters(batch)
+        if metrics is not None:
+            metrics.lap(STAGE_INFERENCE)
+
+        hands = [HandResult(ids[i], sides[i], scores[i], batch[i], protos[i], *predictions[i]) for i in range(n)]
+        fused = [None] * n
+        if self.sequence is not None:
+            # Una ventana por ID de mano; el vector fusionado se copia porque
+            # el buffer es compartido
+            self.sequence.retain(ids)
+            for i, hand in enumerate(hands):
+                probabilities = self._probability_buffer[i] if self._hand_probabilities_valid[i] else None
+                hand.letter, hand.confidence, probabilities = self._fuse_sequence(
+                    hand.letter, hand.confidence, hand.landmarks, probabilities, hand.id)
+                fused[i] = None if probabilities is None else probabilities.copy()
+        if self.smoothing:
+            # Un estabilizador por ID de mano; se descartan los de manos que ya no están
+            smoothers = {}
+            for i, hand in enumerate(hands):
+                smoother = self._hand_smoothers.get(hand.id) or self._create_smoother()
+                if self.sequence is not None:
+                    probabilities = fused[i]
+                else:
+                    probabilities = self._probability_buffer[i] if self._hand_probabilities_valid[i] else None
+                hand.letter, hand.confidence = self._stabilize(hand.letter, hand.confidence, True, smoother,
+                                                               probabilities)
+                smoothers[hand.id] = smoother
+            self._hand_smoothers = smoothers
+        hands.sort(key=lambda hand: hand.id)
+        primary = hands[0]
+        landmarks = self._landmark_buffer[0]
+        np.copyto(landmarks, primary.landmarks)
+        if self.recorder is not None:
+            self.recorder.write(time.monotonic(), landmarks, True)
+
+        self.hand_results = hands
+        self.current_letter = primary.letter
+        self.confidence = primary.confidence
+        return (primary.proto, landmarks, primary.letter, primary.confidence)
+
+    def _update_fps(self):
+        """Actualiza el contador de FPS (una vez por frame procesado)."""
+        self._fps_frame_count += 1
+        current_time = time.time()
+        if current_time - self._fps_prev_time >= 1.0:
+            self.fps = self._fps_frame_count / (current_time - self._fps_prev_time)
+            self._fps_frame_count = 0
+            self._fps_prev_time = current_time
+
+    def handle_output(self, frame: np.ndarray, hand_landmarks,
+                      letter: str, confidence: float, hands=None) -> bool:
+        """
+        Muestra la ventana de debug, streamea el frame a Unity y atiende teclas.
+
+        ``hands`` es la lista de ``HandResult`` del mismo frame (varias manos).
+
+        Returns:
+            False si el usuario pidió salir, True en caso contrario.
+        """
+        if not self.show_window:
+            # Aún sin ventana, podemos streamear el frame crudo si se desea
+            self._send_video_frame_to_unity(frame)
+            return True
+
+        # Con --overlay-fps la ventana se refresca a su propio ritmo; el frame
+        # se dibuja igual si toca streamearlo (el video lleva el overlay)
+        if self.overlay_fps > 0:
+            now = time.perf_counter()
+            if now < self._next_overlay_time and not self._video_due(time.time()):
+                self.overlays_skipped += 1
+                return self._handle_keys()
+            self._next_overlay_time = max(self._next_overlay_time + 1.0 / self.overlay_fps, now)
+
+        display_frame = self.draw_overlay(frame, hand_landmarks, letter, confidence, hands)
+        cv2.imshow('Hand Tracker - Lenguaje de Senas', display_frame)
+
+        # Enviar frame a Unity (si está habilitado)
+        self._send_video_frame_to_unity(display_frame)
+        return self._handle_keys()
+
+    def _handle_keys(self) -> bool:
+        """Atiende las teclas de la ventana; False si el usuario pidió salir."""
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            print("[INFO] Saliendo...")
+            return False
+        elif key == ord('m'):
+            self._mirror_toggle.set()
+        return True
+
+    def apply_pending_toggles(self):
+        """
+        Aplica el cambio de modo espejo pedido con la tecla 'm'. Se llama
+        desde el hilo de inferencia antes de cada frame, así el reinicio del
+        detector y de los IDs de mano nunca corre en paralelo con ellos.
+        """
+        if not self._mirror_toggle.is_set():
             return
-            
+        self._mirror_toggle.clear()
+        self.mirror_mode = not self.mirror_mode
+        if self.detector is not None:
+            self.detector.reset()
+        if self._hand_ids is not None:
+            self._hand_ids.reset()
+        print(f"[INFO] Modo espejo: {'Activado' if self.mirror_mode else 'Desactivado'}")
+
+    def _print_banner(self):
         print("\n" + "="*50)
         print("  HAND TRACKER INICIADO")
         print("="*50)
-        print(f"  Enviando datos a: {self.udp_ip}:{self.udp_port}")
+        print(f"  Enviando datos a: {self.udp_ip}:{self.udp_port} ({self.wire_format})")
         print(f"  Modelo: {'Cargado' if self.onnx_session else 'NO DISPONIBLE'}")
         print(f"  Modo espejo: {'Sí' if self.mirror_mode else 'No'}")
+        print(f"  Pipeline: {'Multi-hilo' if self.pipelined else 'Secuencial'}")
         print("="*50 + "\n")
-        
+
+    def run_replay(self):
+        """
+        Bucle de replay: alimenta predict_letter / send_to_unity con los
+        landmarks grabados, sin cámara ni MediaPipe. Al terminar reporta el
+        throughput alcanzado.
+        """
+        print("\n" + "="*50)
+        print("  HAND TRACKER - REPLAY")
+        print("="*50)
+        print(f"  Archivo: {self.replay_path} ({len(self.replay_source)} registros)")
+        print(f"  Enviando datos a: {self.udp_ip}:{self.udp_port} ({self.wire_format})")
+        print(f"  Velocidad: {'Tiempo real' if self.replay_realtime else 'Máxima'}")
+        print("="*50 + "\n")
+
         self.is_running = True
-        prev_time = time.time()
-        frame_count = 0
+        self._fps_prev_time = time.time()
+        self._fps_frame_count = 0
+        frames = 0
+        t_start = time.perf_counter()
+
+        try:
+            metrics = self.metrics
+            # El estabilizador usa el reloj de la grabación: el resultado no
+            # depende de la velocidad del replay. Con --replay-loop el archivo
+            # vuelve a empezar pero el reloj sigue avanzando.
+            clock_offset = 0.0
+            now = None
+            for timestamp, recorded, hand_detected in self.replay_source:
+                if not self.is_running:
+                    break
+                if now is not None and timestamp + clock_offset < now:
+                    clock_offset = now - timestamp
+                now = timestamp + clock_offset
+                if metrics is not None:
+                    metrics.start()
+                letter, confidence, landmarks, probabilities = "", 0.0, [], None
+                if hand_detected:
+                    np.copyto(self._landmark_buffer[0], recorded)
+                    landmarks = self._landmark_buffer[0]
+                    letter, confidence = self.predict_letter(landmarks)
+                    letter, confidence, probabilities = self._fuse_sequence(letter, confidence, landmarks,
+                                                                            self.last_probabilities)
+                elif self.sequence is not None:
+                    self.sequence.release()
+                letter, confidence = self._stabilize(letter, confidence, hand_detected,
+                                                     probabilities=probabilities, now=now)
+                if metrics is not None:
+                    metrics.lap(STAGE_INFERENCE)
+                if hand_detected:
+                    self.current_letter = letter
+                    self.confidence = confidence
+                else:
+                    letter, confidence = "", 0.0
+                self.send_to_unity(landmarks, letter, confidence, hand_detected)
+                if metrics is not None:
+                    metrics.lap(STAGE_SEND)
+                self._update_fps()
+                frames += 1
+        except KeyboardInterrupt:
+            print("\n[INFO] Interrupción de teclado recibida")
+        finally:
+            elapsed = time.perf_counter() - t_start
+            print(f"[INFO] Replay: {frames} frames en {elapsed:.2f} s "
+                  f"({frames / max(elapsed, 1e-9):.1f} frames/s)")
+            self.cleanup()
+
+    def run(self):
+        """
+        Bucle principal del tracker.
+        """
+        if self.replay_source is not None:
+            self.run_replay()
+            return
+
+        if not self.cap.isOpened():
+            print("[ERROR] La cámara no está disponible")
+            return
+
+        self._print_banner()
+
+        if self.pipelined:
+            from pipeline import PipelinedRunner
+            PipelinedRunner(self, stats_interval=self.stats_interval).run()
+            return
+
+        self.is_running = True
+        self._fps_prev_time = time.time()
+        self._fps_frame_count = 0
         
         try:
+            metrics = self.metrics
             while self.is_running:
+                self.apply_pending_toggles()
+                if metrics is not None:
+                    metrics.start()
+                t_frame = time.perf_counter()
+
                 # Capturar frame
                 ret, frame = self.cap.read()
                 if not ret:
+                    if self.cap.finished:
+                        print("[INFO] Fin de la fuente de video")
+                        break
                     print("[WARN] No se pudo leer frame")
                     continue
                 
                 # Modo espejo
                 if self.mirror_mode:
                     frame = cv2.flip(frame, 1)
+                if metrics is not None:
+                    metrics.lap(STAGE_CAPTURE)
                 
-                # Convertir a RGB para MediaPipe
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                hand_landmarks, landmarks, letter, confidence = self.process_frame(frame)
                 
-                # Procesar con MediaPipe
-                results = self.hands.process(rgb_frame)
-                
-                # Variables para este frame
-                hand_detected = False
-                landmarks = []
-                letter = ""
-                confidence = 0.0
-                hand_landmarks_draw = None
-                
-                # Si se detectó una mano
-                if results.multi_hand_landmarks:
-                    hand_detected = True
-                    hand_landmarks = results.multi_hand_landmarks[0]
-                    hand_landmarks_draw = hand_landmarks
-                    
-                    # Extraer landmarks
-                    landmarks = self.extract_landmarks(hand_landmarks)
-                    
-                    # Predecir letra
-                    letter, confidence = self.predict_letter(landmarks)
-                    
-                    self.current_letter = letter
-                    self.confidence = confidence
+                latency = self.cap.mark_processed()
+                if metrics is not None:
+                    metrics.set_gauge("capture_latency_ms", latency * 1000.0)
+                    metrics.set_gauge("capture_dropped", self.cap.dropped)
                 
                 # Enviar datos a Unity
-                self.send_to_unity(landmarks, letter, confidence, hand_detected)
+                hands = self.hand_results
+                self.send_to_unity(landmarks, letter, confidence, hand_landmarks is not None, hands)
+                if metrics is not None:
+                    metrics.lap(STAGE_SEND)
                 
                 # Calcular FPS
-                frame_count += 1
-                current_time = time.time()
-                if current_time - prev_time >= 1.0:
-                    self.fps = frame_count / (current_time - prev_time)
-                    frame_count = 0
-                    prev_time = current_time
+                self._update_fps()
                 
-                # Mostrar ventana de debug
-                if self.show_window:
-                    display_frame = self.draw_overlay(frame, hand_landmarks_draw, 
-                                                       letter, confidence)
-                    cv2.imshow('Hand Tracker - Lenguaje de Senas', display_frame)
-
-                    # Enviar frame a Unity (si está habilitado)
-                    self._send_video_frame_to_unity(display_frame)
-                else:
-                    # Aún sin ventana, podemos streamear el frame crudo si se desea
-                    self._send_video_frame_to_unity(frame)
-                    
-                    # Manejar teclas
-                    key = cv2.waitKey(1) & 0xFF
-                    if key == ord('q'):
-                        print("[INFO] Saliendo...")
-                        break
-                    elif key == ord('m'):
-                        self.mirror_mode = not self.mirror_mode
-                        print(f"[INFO] Modo espejo: {'Activado' if self.mirror_mode else 'Desactivado'}")
+                # Mostrar ventana de debug / streamear video
+                keep_running = self.handle_output(frame, hand_landmarks, letter, confidence, hands)
+                if metrics is not None:
+                    metrics.lap(STAGE_OUTPUT)
+                if self.first_frame_ms is None:
+                    self._report_first_frame(time.perf_counter() - t_frame)
+                if not keep_running:
+                    break
                         
         except KeyboardInterrupt:
             print("\n[INFO] Interrupción de teclado recibida")
@@ -483,12 +1579,47 @@ class HandTracker:
         
         if self.cap:
             self.cap.release()
+            if self.cap.frames:
+                print(f"[INFO] Captura: {self.cap.summary()}")
         if self.hands:
             self.hands.close()
+        if self.video_encoder is not None:
+            self.video_encoder.close()
+            print(f"[INFO] Video: {self.video_encoder.summary()}")
+            self.video_encoder = None
+        if self._video_shm is not None:
+            self._video_shm.close()
+            print(f"[INFO] Video en memoria compartida: {self._video_shm.seq} frames")
+            self._video_shm = None
+        if self.hub is not None:
+            self.hub.close()
+            print(f"[INFO] Suscriptores: {self.hub.summary()}")
+            self.hub = None
         if self.sock:
             self.sock.close()
+        if self.detector is not None:
+            print(f"[INFO] Detección adaptativa: {self.detector.summary()}")
+        if self.video_frames_dropped:
+            print(f"[WARN] Frames de video descartados por tamaño: {self.video_frames_dropped}")
+        if self.sequence is not None:
+            print(f"[INFO] Secuencias: {self.sequence.summary()}")
+        if self.smoother is not None:
+            print(f"[INFO] Suavizado ({self.smoothing}): {self.smoother.events} cambios de letra")
+        if self.send_on_change:
+            print(f"[INFO] Mensajes omitidos sin cambios: {self.messages_suppressed}")
+        if self.overlay_fps > 0:
+            print(f"[INFO] Frames sin overlay (--overlay-fps): {self.overlays_skipped}")
+        if self.prediction_cache is not None:
+            print(f"[INFO] Caché de predicciones: {self.prediction_cache.summary()}")
+        for exporter in self._metrics_exporters:
+            exporter.close()
+        self._metrics_exporters = []
+        if self.recorder:
+            self.recorder.close()
+            print(f"[OK] {self.recorder.count} registros grabados en {self.record_path}")
             
-        cv2.destroyAllWindows()
+        if self.show_window and cv2 is not None:
+            cv2.destroyAllWindows()
         print("[OK] Recursos liberados")
 
 
@@ -496,10 +1627,28 @@ class HandTracker:
 # PUNTO DE ENTRADA
 # =============================================================================
 
-def main():
+# Subcomandos: primer argumento -> módulo con su propio main(argv)
+SUBCOMMANDS = {
+    'batch': 'batch_inference',
+    'extract': 'landmark_pool',
+    'benchmark': 'benchmark',
+    'shm-reader': 'shm_transport',
+    'subscribe': 'subscriber_hub',
+    'capture': 'capture',
+    'sequence': 'sequence',
+    'features': 'features',
+}
+
+
+def main(argv: Optional[List[str]] = None):
     """Función principal."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        return importlib.import_module(SUBCOMMANDS[argv[0]]).main(argv[1:])
+
     parser = argparse.ArgumentParser(
-        description='Hand Tracker para Lenguaje de Señas'
+        description='Hand Tracker para Lenguaje de Señas',
+        epilog=f"Subcomandos: {', '.join(SUBCOMMANDS)} (ver 'hand_tracker.py <subcomando> --help')"
     )
     parser.add_argument(
         '--camera', '-c', 
@@ -542,6 +1691,50 @@ def main():
         default=55,
         help='Calidad JPEG 10-95 (default: 55)'
     )
+    parser.add_argument(
+        '--video-inline',
+        action='store_true',
+        help='Codificar el video en el bucle principal en lugar de un hilo aparte'
+    )
+    parser.add_argument(
+        '--video-target-kbps',
+        type=float,
+        default=0.0,
+        help='Bitrate objetivo del video en kbit/s; ajusta calidad, ancho y FPS (default: 0 = sin control)'
+    )
+    parser.add_argument(
+        '--video-encode-budget',
+        type=float,
+        default=0.0,
+        help='Tiempo máximo promedio de codificación JPEG por frame en ms (default: 0 = sin límite)'
+    )
+    parser.add_argument(
+        '--video-transport',
+        choices=['single', 'fragmented', 'shm'],
+        default='single',
+        help='single: un datagrama por JPEG (máx. ~65 KB); fragmented: fragmentos numerados '
+             'del tamaño de la MTU, permite resoluciones mayores; shm: frames sin comprimir en '
+             'memoria compartida para un Unity local (default: single)'
+    )
+    parser.add_argument(
+        '--video-shm-path',
+        type=str,
+        default=None,
+        help='Archivo del ring de --video-transport shm (default: /dev/shm/hand_tracker_frames.shm '
+             'o el directorio temporal)'
+    )
+    parser.add_argument(
+        '--video-shm-format',
+        choices=['rgb', 'bgr'],
+        default='rgb',
+        help='Orden de canales en el ring de memoria compartida (default: rgb, el de Unity)'
+    )
+    parser.add_argument(
+        '--video-mtu',
+        type=int,
+        default=1500,
+        help='MTU para dimensionar los fragmentos de --video-transport fragmented (default: 1500)'
+    )
     parser.add_argument(
         '--ip', '-i', 
         type=str, 
@@ -554,6 +1747,201 @@ def main():
         default=MODEL_PATH,
         help=f'Ruta al modelo ONNX (default: {MODEL_PATH})'
     )
+    parser.add_argument(
+        '--control-port',
+        type=int,
+        default=None,
+        help='Puerto UDP de control para suscriptores dinámicos (varios Unity / registradores); '
+             'sin él se envía solo a --ip/--port'
+    )
+    parser.add_argument(
+        '--control-host',
+        type=str,
+        default=UDP_IP,
+        help=f'Dirección en la que escucha --control-port (default: {UDP_IP}; '
+             '0.0.0.0 acepta suscriptores de otras máquinas)'
+    )
+    parser.add_argument(
+        '--subscriber-timeout',
+        type=float,
+        default=5.0,
+        help='Segundos sin heartbeat antes de dar de baja a un suscriptor (default: 5)'
+    )
+    parser.add_argument(
+        '--no-static-subscriber',
+        action='store_true',
+        help='Con --control-port, no enviar a --ip/--port salvo que se suscriba'
+    )
+    parser.add_argument(
+        '--max-hands',
+        type=int,
+        default=MAX_NUM_HANDS,
+        help='Manos a seguir; con más de una se predicen en un solo batch y se envían '
+             f'con ID estable y lateralidad (default: {MAX_NUM_HANDS})'
+    )
+    parser.add_argument(
+        '--smoothing',
+        choices=['ema', 'mean', 'vote'],
+        default=None,
+        help='Estabilizar la letra en el tiempo: media exponencial, promedio o votación '
+             'de la ventana, con histéresis (default: sin suavizado)'
+    )
+    parser.add_argument(
+        '--smoothing-window',
+        type=int,
+        default=8,
+        help='Frames de la ventana de --smoothing mean/vote (default: 8)'
+    )
+    parser.add_argument(
+        '--smoothing-alpha',
+        type=float,
+        default=0.35,
+        help='Peso del frame nuevo en --smoothing ema (default: 0.35)'
+    )
+    parser.add_argument(
+        '--smoothing-hold',
+        type=float,
+        default=0.25,
+        help='Segundos que una letra nueva debe sostenerse antes de cambiar (default: 0.25)'
+    )
+    parser.add_argument(
+        '--smoothing-min-conf',
+        type=float,
+        default=0.5,
+        help='Puntaje mínimo suavizado para adoptar una letra (default: 0.5)'
+    )
+    parser.add_argument(
+        '--send-on-change',
+        action='store_true',
+        help='Enviar a Unity solo cuando cambia la letra o la presencia de mano '
+             f'(más un keepalive cada {SEND_KEEPALIVE:g} s)'
+    )
+    parser.add_argument(
+        '--onnx-profile',
+        choices=['default', 'latency', 'throughput', 'low-memory'],
+        default='default',
+        help='Perfil de ejecución de ONNX Runtime: hilos, modo de ejecución y memoria '
+             '(default: default = decide ONNX Runtime)'
+    )
+    parser.add_argument(
+        '--onnx-threads',
+        type=int,
+        default=None,
+        help='Hilos intra-operador (reemplaza al del perfil; 0 = automático)'
+    )
+    parser.add_argument(
+        '--onnx-inter-threads',
+        type=int,
+        default=None,
+        help='Hilos inter-operador (reemplaza al del perfil; 0 = automático)'
+    )
+    parser.add_argument(
+        '--onnx-execution',
+        choices=['sequential', 'parallel'],
+        default=None,
+        help='Ejecución secuencial o paralela del grafo (reemplaza a la del perfil)'
+    )
+    parser.add_argument(
+        '--onnx-no-arena',
+        action='store_true',
+        help='Desactivar la arena de memoria de CPU de ONNX Runtime'
+    )
+    parser.add_argument(
+        '--onnx-no-mem-pattern',
+        action='store_true',
+        help='Desactivar el memory pattern de ONNX Runtime'
+    )
+    parser.add_argument(
+        '--onnx-cache-dir',
+        type=str,
+        default=None,
+        help='Guardar el modelo optimizado en este directorio y reutilizarlo en los '
+             'siguientes arranques (default: optimizar en cada arranque)'
+    )
+    parser.add_argument(
+        '--onnx-warmup',
+        type=int,
+        default=3,
+        help='Llamadas de warm-up al modelo al arrancar (0 desactiva, default: 3)'
+    )
+    parser.add_argument(
+        '--overlay-fps',
+        type=float,
+        default=0.0,
+        help='Máximo de FPS de la ventana de depuración (overlay + imshow), '
+             'independiente de la detección (0 = todos los frames, default: 0)'
+    )
+    parser.add_argument(
+        '--sequence-model',
+        type=str,
+        default=None,
+        help='Modelo ONNX de señas dinámicas (J, Z) sobre una ventana de landmarks (ver sequence.py)'
+    )
+    parser.add_argument(
+        '--sequence-window',
+        type=int,
+        default=30,
+        help='Frames de la ventana si el modelo de secuencias no la fija (default: 30)'
+    )
+    parser.add_argument(
+        '--sequence-stride',
+        type=int,
+        default=1,
+        help='Correr el modelo de secuencias cada N frames (default: 1)'
+    )
+    parser.add_argument(
+        '--sequence-min-conf',
+        type=float,
+        default=0.6,
+        help='Probabilidad mínima de una seña dinámica para reemplazar a la estática (default: 0.6)'
+    )
+    parser.add_argument(
+        '--source',
+        type=str,
+        default=None,
+        help='Fuente en lugar de --camera: archivo de video, pipeline de GStreamer o "synthetic"'
+    )
+    parser.add_argument(
+        '--capture-backend',
+        choices=['auto', 'v4l2', 'gstreamer', 'ffmpeg', 'dshow', 'msmf', 'avfoundation'],
+        default='auto',
+        help='Backend de captura de OpenCV (default: auto)'
+    )
+    parser.add_argument(
+        '--capture-size',
+        type=str,
+        default='640x480',
+        help='Resolución pedida a la cámara, ANCHOxALTO (default: 640x480)'
+    )
+    parser.add_argument(
+        '--capture-fps',
+        type=float,
+        default=0.0,
+        help='FPS pedidos a la cámara (default: 0 = los del driver)'
+    )
+    parser.add_argument(
+        '--capture-fourcc',
+        type=str,
+        default=None,
+        help='Formato de píxel pedido a la cámara, p. ej. MJPG (default: el del driver)'
+    )
+    parser.add_argument(
+        '--capture-buffer',
+        type=int,
+        default=None,
+        help='Frames en el buffer del driver, p. ej. 1 (default: el del driver)'
+    )
+    parser.add_argument(
+        '--capture-mode',
+        choices=['latest', 'direct'],
+        default='latest',
+        help='latest: hilo de captura que entrega siempre el frame más reciente; direct: leer en el bucle (default: latest)'
+    )
+    parser.add_argument(
+        '--sequential-init',
+        action='store_true',
+        help='Inicializar MediaPipe, el modelo y la cámara uno tras otro (default: en paralelo)'
+    )
     parser.add_argument(
         '--no-mirror', 
         action='store_true',
@@ -564,8 +1952,112 @@ def main():
         action='store_true',
         help='No mostrar ventana de OpenCV'
     )
+    parser.add_argument(
+        '--wire-format',
+        choices=['json', 'binary'],
+        default='json',
+        help='Formato de los datagramas de landmarks (default: json). '
+             'binary usa el layout fijo de 272 bytes de wire_protocol.py'
+    )
+    parser.add_argument(
+        '--record',
+        type=str,
+        default=None,
+        metavar='ARCHIVO.lmrec',
+        help='Grabar landmarks y timestamps de cada frame en este archivo'
+    )
+    parser.add_argument(
+        '--replay',
+        type=str,
+        default=None,
+        metavar='ARCHIVO.lmrec',
+        help='Reproducir landmarks grabados en lugar de usar cámara y MediaPipe'
+    )
+    parser.add_argument(
+        '--replay-max-speed',
+        action='store_true',
+        help='En --replay, enviar a máxima velocidad en lugar de a tiempo real'
+    )
+    parser.add_argument(
+        '--replay-loop',
+        action='store_true',
+        help='En --replay, repetir el archivo indefinidamente'
+    )
+    parser.add_argument(
+        '--metrics',
+        action='store_true',
+        help='Registrar tiempos por etapa (ring buffer en memoria, ver metrics.py)'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=None,
+        help='Servir métricas por etapa en http://127.0.0.1:PUERTO/metrics (formato Prometheus)'
+    )
+    parser.add_argument(
+        '--stats-port',
+        type=int,
+        default=None,
+        help='Enviar un datagrama JSON de estadísticas a --ip:PUERTO cada --stats-interval segundos'
+    )
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Detección sobre ROI de la mano, resolución reducida en reposo y salto de '
+             'MediaPipe/ONNX con poco movimiento'
+    )
+    parser.add_argument(
+        '--adaptive-motion',
+        type=float,
+        default=2.0,
+        help='Diferencia media de gris (0-255) bajo la cual --adaptive salta MediaPipe (0 desactiva, default: 2)'
+    )
+    parser.add_argument(
+        '--adaptive-idle-scale',
+        type=float,
+        default=0.5,
+        help='Escala del frame para detectar sin mano en --adaptive (default: 0.5)'
+    )
+    parser.add_argument(
+        '--prediction-cache',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Cachear hasta N predicciones por pose normalizada y cuantizada (0 desactiva, default: 0)'
+    )
+    parser.add_argument(
+        '--cache-grid',
+        type=float,
+        default=0.1,
+        help='Tamaño de celda de la caché de predicciones (default: 0.1)'
+    )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Captura, inferencia y salida en hilos separados (siempre procesa el frame más reciente)'
+    )
+    parser.add_argument(
+        '--stats-interval',
+        type=float,
+        default=5.0,
+        help='Segundos entre reportes de estadísticas por etapa (--pipeline, --stats-port) (0 desactiva, default: 5)'
+    )
+    
+    args = parser.parse_args(argv)
+    capture_width, capture_height = (int(v) for v in args.capture_size.lower().split('x'))
     
-    args = parser.parse_args()
+    # Ajustes de ONNX Runtime que reemplazan a los del perfil
+    onnx_options = {}
+    if args.onnx_threads is not None:
+        onnx_options["intra_op_threads"] = args.onnx_threads
+    if args.onnx_inter_threads is not None:
+        onnx_options["inter_op_threads"] = args.onnx_inter_threads
+    if args.onnx_execution is not None:
+        onnx_options["execution_mode"] = args.onnx_execution
+    if args.onnx_no_arena:
+        onnx_options["cpu_mem_arena"] = False
+    if args.onnx_no_mem_pattern:
+        onnx_options["mem_pattern"] = False
     
     # Crear y ejecutar tracker
     tracker = HandTracker(
@@ -578,7 +2070,58 @@ def main():
         video_jpeg_quality=args.video_quality,
         camera_id=args.camera,
         mirror_mode=not args.no_mirror,
-        show_window=not args.no_window
+        show_window=not args.no_window,
+        pipelined=args.pipeline,
+        stats_interval=args.stats_interval,
+        wire_format=args.wire_format,
+        record_path=args.record,
+        replay_path=args.replay,
+        replay_realtime=not args.replay_max_speed,
+        replay_loop=args.replay_loop,
+        metrics=args.metrics,
+        metrics_http_port=args.metrics_port,
+        stats_port=args.stats_port,
+        adaptive=args.adaptive,
+        adaptive_motion_threshold=args.adaptive_motion,
+        adaptive_idle_scale=args.adaptive_idle_scale,
+        prediction_cache_size=args.prediction_cache,
+        prediction_cache_grid=args.cache_grid,
+        video_transport=args.video_transport,
+        video_mtu=args.video_mtu,
+        video_async=not args.video_inline,
+        video_target_bitrate=args.video_target_kbps * 1000.0 / 8.0,
+        video_encode_budget_ms=args.video_encode_budget,
+        video_shm_path=args.video_shm_path,
+        video_shm_format=args.video_shm_format,
+        control_port=args.control_port,
+        control_host=args.control_host,
+        subscriber_timeout=args.subscriber_timeout,
+        static_subscriber=not args.no_static_subscriber,
+        max_num_hands=args.max_hands,
+        smoothing=args.smoothing,
+        smoothing_window=args.smoothing_window,
+        smoothing_alpha=args.smoothing_alpha,
+        smoothing_hold=args.smoothing_hold,
+        smoothing_min_confidence=args.smoothing_min_conf,
+        send_on_change=args.send_on_change,
+        onnx_profile=args.onnx_profile,
+        onnx_options=onnx_options,
+        onnx_cache_dir=args.onnx_cache_dir,
+        onnx_warmup=args.onnx_warmup,
+        parallel_init=not args.sequential_init,
+        overlay_fps=args.overlay_fps,
+        capture_source=args.source,
+        capture_backend=args.capture_backend,
+        capture_width=capture_width,
+        capture_height=capture_height,
+        capture_fps=args.capture_fps,
+        capture_fourcc=args.capture_fourcc,
+        capture_buffer=args.capture_buffer,
+        capture_mode=args.capture_mode,
+        sequence_model=args.sequence_model,
+        sequence_window=args.sequence_window,
+        sequence_stride=args.sequence_stride,
+        sequence_min_confidence=args.sequence_min_conf
     )
     
     tracker.run()
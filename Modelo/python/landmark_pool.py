@@ -0,0 +1,159 @@
+"""
+Extracción paralela de landmarks con un pool de procesos
+=========================================================
+``Hands.process`` de MediaPipe es el costo dominante por frame y usa un solo
+núcleo. Para procesar datasets se reparte el trabajo entre procesos: cada
+worker crea su propia instancia de ``mp.solutions.hands.Hands`` una sola vez
+(en el initializer del pool) y recibe tramos de frames de un video o de una
+carpeta de imágenes. Los resultados vuelven en orden y se fusionan en un
+único archivo .npz (source, frame, hand_detected, landmarks), que luego se
+puede re-evaluar con ``hand_tracker.py batch``.
+
+Para entrenar, ``--features modelo.onnx`` agrega la columna ``features``
+calculada con la especificación de ese modelo (ver features.py) y guarda la
+especificación en el .npz (``feature_spec``, JSON).
+
+Uso:
+    python hand_tracker.py extract videos/*.mp4 capturas/ -o landmarks.npz --workers 8
+    python hand_tracker.py extract videos/ -o train.npz --features nuevo.onnx
+
+Nota: con ``--tracking`` (static_image_mode=False) cada tramo arranca sin el
+estado de tracking del tramo anterior; el modo por defecto (imagen estática)
+es determinista sin importar cómo se reparta el trabajo.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from batch_inference import count_frames, create_hands, extract_source_landmarks
+
+# Instancia de MediaPipe Hands propia de cada proceso worker
+_worker_hands = None
+_worker_mirror = False
+
+Chunk = Tuple[str, int, Optional[int], int]
+
+
+def _init_worker(static_image_mode: bool, mirror: bool):
+    global _worker_hands, _worker_mirror
+    _worker_hands = create_hands(static_image_mode=static_image_mode)
+    _worker_mirror = mirror
+
+
+def _process_chunk(chunk: Chunk) -> Tuple[str, Dict[str, np.ndarray]]:
+    path, start, stop, stride = chunk
+    columns = extract_source_landmarks(_worker_hands, path, stride=stride,
+                                       mirror=_worker_mirror, start=start, stop=stop)
+    return path, columns
+
+
+def plan_chunks(inputs: List[str], chunk_frames: int, stride: int = 1) -> List[Chunk]:
+    """
+    Divide cada fuente en tramos de ``chunk_frames`` frames alineados al stride.
+
+    Si un contenedor de video no reporta la cantidad de frames, la fuente se
+    procesa como un solo tramo.
+    """
+    stride = max(1, int(stride))
+    chunk_frames = max(stride, (max(1, int(chunk_frames)) // stride) * stride)
+    chunks: List[Chunk] = []
+    for path in inputs:
+        total = count_frames(path)
+        if total <= 0:
+            chunks.append((path, 0, None, stride))
+            continue
+        for start in range(0, total, chunk_frames):
+            stop = start + chunk_frames
+            # El último tramo de un video queda abierto por si el conteo es aproximado
+            if stop >= total and not os.path.isdir(path):
+                stop = None
+            chunks.append((path, start, stop, stride))
+    return chunks
+
+
+def iter_extracted(inputs: List[str], workers: Optional[int] = None, chunk_frames: int = 500,
+                   stride: int = 1, static_image_mode: bool = True,
+                   mirror: bool = False) -> Iterator[Tuple[str, Dict[str, np.ndarray]]]:
+    """
+    Extrae landmarks en paralelo; produce (fuente, columnas) por tramo, en orden.
+    """
+    chunks = plan_chunks(inputs, chunk_frames, stride)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, max(1, len(chunks))),
+                             initializer=_init_worker,
+                             initargs=(static_image_mode, mirror)) as pool:
+        yield from pool.map(_process_chunk, chunks)
+
+
+def extract_parallel(inputs: List[str], workers: Optional[int] = None, chunk_frames: int = 500,
+                     stride: int = 1, static_image_mode: bool = True,
+                     mirror: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Extrae y fusiona los landmarks de todas las fuentes.
+
+    Returns:
+        Dict con ``source``, ``frame``, ``hand_detected`` y ``landmarks`` (N, 63)
+    """
+    parts: List[Dict[str, np.ndarray]] = []
+    for path, columns in iter_extracted(inputs, workers, chunk_frames, stride,
+                                        static_image_mode, mirror):
+        columns["source"] = np.full(columns["frame"].shape[0], path)
+        parts.append(columns)
+
+    if not parts:
+        return {"source": np.zeros(0, dtype=str), "frame": np.zeros(0, dtype=np.int32),
+                "hand_detected": np.zeros(0, dtype=bool),
+                "landmarks": np.zeros((0, 63), dtype=np.float32)}
+    return {key: np.concatenate([p[key] for p in parts])
+            for key in ("source", "frame", "hand_detected", "landmarks")}
+
+
+def main(argv=None):
+    """Punto de entrada del subcomando ``extract``."""
+    parser = argparse.ArgumentParser(
+        prog='hand_tracker.py extract',
+        description='Extracción paralela de landmarks (un MediaPipe Hands por proceso)'
+    )
+    parser.add_argument('inputs', nargs='+', help='Videos o carpetas de imágenes')
+    parser.add_argument('--output', '-o', type=str, default='landmarks.npz',
+                        help='Archivo .npz de salida (default: landmarks.npz)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Procesos worker (default: núcleos disponibles)')
+    parser.add_argument('--chunk-frames', type=int, default=500,
+                        help='Frames por tramo enviado a un worker (default: 500)')
+    parser.add_argument('--stride', type=int, default=1,
+                        help='Procesar 1 de cada N frames (default: 1)')
+    parser.add_argument('--tracking', action='store_true',
+                        help='Usar static_image_mode=False (tracking entre frames de un tramo)')
+    parser.add_argument('--mirror', action='store_true',
+                        help='Voltear horizontalmente los frames (como el modo espejo en vivo)')
+    parser.add_argument('--features', type=str, default=None, metavar='MODELO',
+                        help='Agregar la columna features según la especificación de este modelo '
+                             '(modelo.features.json)')
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    columns = extract_parallel(args.inputs, workers=args.workers, chunk_frames=args.chunk_frames,
+                               stride=args.stride, static_image_mode=not args.tracking,
+                               mirror=args.mirror)
+    if args.features:
+        from features import FeatureExtractor, load_spec, spec_to_dict
+        spec = load_spec(args.features)
+        columns["features"] = FeatureExtractor(spec).transform(columns["landmarks"]).copy()
+        columns["feature_spec"] = np.array(json.dumps(spec_to_dict(spec)))
+        print(f"[INFO] Features: {spec.describe()}")
+    np.savez_compressed(args.output, **columns)
+    elapsed = time.perf_counter() - t0
+    n = columns["frame"].shape[0]
+    print(f"[OK] {n} frames ({int(columns['hand_detected'].sum())} con mano) en {elapsed:.1f} s "
+          f"({n / max(elapsed, 1e-9):.1f} frames/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Grabación y reproducción de landmarks
+=====================================
+Formato ``.lmrec``: archivo de solo-agregado con una cabecera de 16 bytes y
+registros binarios de tamaño fijo, que se lee con ``np.memmap`` sin cargarlo
+entero en memoria. Un registro truncado al final (p. ej. si el proceso se
+cortó) simplemente se ignora.
+
+    cabecera: b"LMREC\\0" + uint16 versión + uint32 tamaño de registro + 4 bytes reservados
+    registro: float64 timestamp (monotónico) | uint8 hand_detected | float32[63] landmarks
+
+``LandmarkRecorder`` escribe mientras corre el tracker en vivo y
+``ReplaySource`` re-inyecta los registros en ``predict_letter`` /
+``send_to_unity`` (a tiempo real o a máxima velocidad) sin cámara ni
+MediaPipe, como generador de carga reproducible para el receptor de Unity.
+"""
+
+import os
+import struct
+import time
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+RECORD_MAGIC = b"LMREC\0"
+RECORD_VERSION = 1
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("hand_detected", "u1"),
+    ("landmarks", "<f4", (63,)),
+])
+HEADER_STRUCT = struct.Struct("<6sHI4x")
+HEADER_SIZE = HEADER_STRUCT.size  # 16
+
+
+class LandmarkRecorder:
+    """Escribe un registro por frame en un archivo .lmrec."""
+
+    def __init__(self, path: str, flush_every: int = 120):
+        self.path = path
+        self.flush_every = max(1, int(flush_every))
+        self.count = 0
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._file = open(path, "wb")
+        self._file.write(HEADER_STRUCT.pack(RECORD_MAGIC, RECORD_VERSION, RECORD_DTYPE.itemsize))
+
+    def write(self, timestamp: float, landmarks, hand_detected: bool):
+        record = self._record[0]
+        record["timestamp"] = timestamp
+        record["hand_detected"] = hand_detected
+        if hand_detected:
+            record["landmarks"] = landmarks
+        else:
+            record["landmarks"] = 0.0
+        self._file.write(self._record.data)
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def open_recording(path: str) -> np.ndarray:
+    """
+    Abre un .lmrec como array estructurado de solo lectura (memory-mapped).
+
+    Raises:
+        ValueError: si la cabecera no corresponde al formato.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"Archivo de landmarks vacío o truncado: {path}")
+    magic, version, record_size = HEADER_STRUCT.unpack(header)
+    if magic != RECORD_MAGIC or version != RECORD_VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Formato .lmrec no soportado: {path}")
+
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def load_recording_columns(path: str) -> Dict[str, np.ndarray]:
+    """Columnas de un .lmrec en el formato de ``batch_inference`` (frame, hand_detected, landmarks)."""
+    records = open_recording(path)
+    return {
+        "frame": np.arange(records.shape[0], dtype=np.int32),
+        "hand_detected": records["hand_detected"].astype(bool),
+        "landmarks": np.array(records["landmarks"], dtype=np.float32),
+    }
+
+
+class ReplaySource:
+    """
+    Reproduce un .lmrec registro por registro.
+
+    Args:
+        path: Archivo .lmrec
+        realtime: Si True respeta los intervalos originales entre registros;
+            si False entrega a máxima velocidad
+        loop: Si True vuelve a empezar al llegar al final
+    """
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.records = open_recording(path)
+
+    def __len__(self) -> int:
+        return self.records.shape[0]
+
+    def __iter__(self) -> Iterator[Tuple[float, np.ndarray, bool]]:
+        """Produce (timestamp_original, landmarks (63,) float32, hand_detected)."""
+        records = self.records
+        if records.shape[0] == 0:
+            return
+        while True:
+            t_first = float(records[0]["timestamp"])
+            t_start = time.perf_counter()
+            for record in records:
+                if self.realtime:
+                    delay = (float(record["timestamp"]) - t_first) - (time.perf_counter() - t_start)
+                    if delay > 0:
+                        time.sleep(delay)
+                yield float(record["timestamp"]), record["landmarks"], bool(record["hand_detected"])
+            if not self.loop:
+                return
@@ -0,0 +1,226 @@
+"""
+Métricas por etapa del HandTracker
+==================================
+Tiempos monotónicos por etapa guardados en un ring buffer de tamaño fijo
+(un array NumPy preasignado, sin reservas por frame), con resúmenes
+p50/p95/p99, histogramas móviles y dos exportadores opcionales:
+
+    - ``StatsDatagramEmitter``: envía periódicamente un datagrama JSON
+      ``{"type": "stats", ...}`` por UDP
+    - ``MetricsHTTPServer``: endpoint local de texto estilo Prometheus
+      (``GET /metrics``)
+
+Cada hilo del tracker marca sus etapas con ``start()`` / ``lap(etapa)``;
+cada etapa tiene su propio cursor en el ring, así funciona igual en el
+bucle secuencial y en el modo ``--pipeline``. Además de las duraciones se
+pueden publicar valores puntuales (``set_gauge``, p. ej. el bitrate de video).
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Índices de etapa (usar estos en lugar de strings en el camino caliente)
+STAGE_CAPTURE = 0
+STAGE_CONVERT = 1
+STAGE_MEDIAPIPE = 2
+STAGE_INFERENCE = 3
+STAGE_SEND = 4
+STAGE_OUTPUT = 5
+STAGE_VIDEO_ENCODE = 6
+STAGES = ("capture", "convert", "mediapipe", "inference", "send", "output", "video_encode")
+
+# Bordes de histograma fijos (segundos), logarítmicos de 0.05 ms a 1 s
+HISTOGRAM_EDGES = np.concatenate([[0.0], np.logspace(np.log10(5e-5), 0.0, 16)])
+
+
+def summarize(samples: np.ndarray) -> Dict[str, float]:
+    """
+    Resume una muestra de duraciones (en segundos).
+
+    Returns:
+        Dict con count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms y
+        throughput_per_s (llamadas por segundo de tiempo ocupado)
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.size == 0:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0,
+                "p99_ms": 0.0, "max_ms": 0.0, "throughput_per_s": 0.0}
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99)) * 1000.0
+    total = float(samples.sum())
+    return {
+        "count": int(samples.size),
+        "mean_ms": float(samples.mean() * 1000.0),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(samples.max() * 1000.0),
+        "throughput_per_s": float(samples.size / total) if total > 0 else 0.0,
+    }
+
+
+class StageMetrics:
+    """
+    Ring buffer de duraciones por etapa.
+
+    Args:
+        capacity: Muestras conservadas por etapa (ventana móvil)
+        stages: Nombres de las etapas, en el orden de sus índices
+    """
+
+    def __init__(self, capacity: int = 1024, stages: Sequence[str] = STAGES):
+        self.capacity = int(capacity)
+        self.stages = tuple(stages)
+        self._samples = np.zeros((self.capacity, len(self.stages)), dtype=np.float64)
+        self._cursor = [0] * len(self.stages)
+        self._total = [0.0] * len(self.stages)
+        self._local = threading.local()
+        self._clock = time.perf_counter
+        self.gauges: Dict[str, float] = {}
+
+    def start(self):
+        """Marca el inicio de un tramo medido en el hilo actual."""
+        self._local.t = self._clock()
+
+    def lap(self, stage: int):
+        """Registra el tiempo desde el último start/lap del hilo actual en ``stage``."""
+        now = self._clock()
+        self.record(stage, now - getattr(self._local, "t", now))
+        self._local.t = now
+
+    def record(self, stage: int, seconds: float):
+        """Registra una duración explícita para ``stage``."""
+        cursor = self._cursor[stage]
+        self._samples[cursor % self.capacity, stage] = seconds
+        self._cursor[stage] = cursor + 1
+        self._total[stage] += seconds
+
+    def set_gauge(self, name: str, value: float):
+        """Publica un valor puntual (se exporta junto a las etapas)."""
+        self.gauges[name] = float(value)
+
+    def window(self, stage: int) -> np.ndarray:
+        """Copia de las muestras vigentes de una etapa (sin orden temporal)."""
+        n = min(self._cursor[stage], self.capacity)
+        return self._samples[:n, stage].copy()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Resumen p50/p95/p99 de la ventana móvil de cada etapa."""
+        return {name: summarize(self.window(i)) for i, name in enumerate(self.stages)}
+
+    def histograms(self, edges: np.ndarray = HISTOGRAM_EDGES) -> Dict[str, Dict[str, list]]:
+        """Histograma de la ventana móvil de cada etapa (bordes en segundos)."""
+        result = {}
+        for i, name in enumerate(self.stages):
+            counts, _ = np.histogram(self.window(i), bins=edges)
+            result[name] = {"edges_s": edges.tolist(), "counts": counts.tolist()}
+        return result
+
+    def prometheus_text(self, prefix: str = "hand_tracker") -> str:
+        """Exporta las métricas en el formato de texto de Prometheus (summary)."""
+        name = f"{prefix}_stage_seconds"
+        lines = [f"# HELP {name} Duración por etapa del pipeline (ventana móvil)",
+                 f"# TYPE {name} summary"]
+        for i, stage in enumerate(self.stages):
+            window = self.window(i)
+            if window.size:
+                for q, value in zip(("0.5", "0.95", "0.99"), np.percentile(window, (50, 95, 99))):
+                    lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {self._total[i]:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {self._cursor[i]}')
+        for gauge, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{gauge} gauge")
+            lines.append(f"{prefix}_{gauge} {value:.6g}")
+        return "\n".join(lines) + "\n"
+
+
+class StatsDatagramEmitter:
+    """Hilo que envía el resumen de métricas como datagrama JSON cada ``interval`` segundos."""
+
+    def __init__(self, metrics: StageMetrics, address, interval: float = 5.0):
+        self.metrics = metrics
+        self.address = address
+        self.interval = max(0.1, float(interval))
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="HandTracker-stats", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            message = {"type": "stats", "timestamp": time.time(), "stages": self.metrics.summary(),
+                       "gauges": dict(self.metrics.gauges)}
+            try:
+                self._sock.sendto(json.dumps(message).encode('utf-8'), self.address)
+            except OSError:
+                pass
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._sock.close()
+
+
+class MetricsHTTPServer:
+    """Endpoint HTTP local: ``/metrics`` (Prometheus) y ``/stats`` (JSON con histogramas)."""
+
+    def __init__(self, metrics: StageMetrics, port: int, host: str = "127.0.0.1"):
+        self.metrics = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.startswith("/metrics"):
+                    body = metrics.prometheus_text().encode('utf-8')
+                    content_type = "text/plain; version=0.0.4"
+                elif handler.path.startswith("/stats"):
+                    body = json.dumps({"stages": metrics.summary(),
+                                       "histograms": metrics.histograms(),
+                                       "gauges": dict(metrics.gauges)}).encode('utf-8')
+                    content_type = "application/json"
+                else:
+                    handler.send_error(404)
+                    return
+                handler.send_response(200)
+                handler.send_header("Content-Type", content_type)
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="HandTracker-metrics-http", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def create_exporters(metrics: StageMetrics, stats_address=None,
+                     http_port: Optional[int] = None, interval: float = 5.0) -> list:
+    """Arranca los exportadores pedidos y devuelve la lista (para cerrarlos en cleanup)."""
+    exporters = []
+    if stats_address is not None:
+        exporters.append(StatsDatagramEmitter(metrics, stats_address, interval).start())
+        print(f"[OK] Estadísticas por UDP a {stats_address[0]}:{stats_address[1]} cada {interval:g} s")
+    if http_port is not None:
+        server = MetricsHTTPServer(metrics, http_port).start()
+        exporters.append(server)
+        print(f"[OK] Métricas en http://127.0.0.1:{server.port}/metrics")
+    return exporters
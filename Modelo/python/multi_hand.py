@@ -0,0 +1,117 @@
+"""
+Seguimiento de varias manos
+===========================
+Con ``max_num_hands > 1`` el tracker apila los landmarks de todas las manos
+detectadas en un solo batch N x 63 (un único ``onnx_session.run``) y
+mantiene un ID estable por mano entre frames:
+
+    - cada mano nueva se empareja con la del frame anterior cuyo centro
+      (promedio de x, y de los 21 puntos) esté más cerca, penalizando si
+      cambió la lateralidad
+    - emparejamiento voraz por distancia creciente; las que quedan sin par
+      (o más lejos que ``max_distance``) reciben un ID nuevo
+
+MediaPipe reporta la lateralidad suponiendo una imagen espejada (selfie),
+que es el modo por defecto del tracker.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+HANDEDNESS_UNKNOWN = 255
+
+
+class HandResult:
+    """
+    Resultado de una mano en un frame.
+
+    ``landmarks`` es una vista del buffer del tracker (se sobrescribe en el
+    siguiente frame); ``proto`` es el NormalizedLandmarkList de MediaPipe.
+    ``score`` es la confianza de MediaPipe en la lateralidad (va en el JSON;
+    el formato binario no la lleva).
+    """
+
+    __slots__ = ("id", "handedness", "score", "landmarks", "proto", "letter", "confidence")
+
+    def __init__(self, hand_id: int, handedness: str, score: float, landmarks: np.ndarray,
+                 proto, letter: str = "", confidence: float = 0.0):
+        self.id = hand_id
+        self.handedness = handedness
+        self.score = score
+        self.landmarks = landmarks
+        self.proto = proto
+        self.letter = letter
+        self.confidence = confidence
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "handedness": self.handedness,
+            "score": self.score,
+            "landmarks": self.landmarks.tolist(),
+            "letter": self.letter,
+            "confidence": self.confidence,
+        }
+
+
+class HandIdAssigner:
+    """
+    Asigna IDs estables a las manos de frames consecutivos.
+
+    Args:
+        max_distance: Distancia máxima (coordenadas normalizadas) entre
+            centros para considerar que es la misma mano
+        handedness_penalty: Distancia que se suma si cambió la lateralidad
+    """
+
+    def __init__(self, max_distance: float = 0.2, handedness_penalty: float = 0.1):
+        self.max_distance = float(max_distance)
+        self.handedness_penalty = float(handedness_penalty)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._centers = np.empty((0, 2), dtype=np.float32)
+        self._handedness: List[str] = []
+        self._next_id = 0
+
+    def reset(self):
+        self._ids = np.empty(0, dtype=np.int64)
+        self._centers = np.empty((0, 2), dtype=np.float32)
+        self._handedness = []
+
+    def assign(self, landmarks: np.ndarray, handedness: Sequence[str]) -> List[int]:
+        """
+        Args:
+            landmarks: Array (N, 63) de las manos del frame
+            handedness: Lateralidad de cada mano ("Left" / "Right" / "")
+
+        Returns:
+            Lista de N IDs
+        """
+        n = landmarks.shape[0]
+        centers = landmarks.reshape(n, 21, 3)[:, :, :2].mean(axis=1)
+        ids = [-1] * n
+
+        if n and self._ids.size:
+            cost = np.linalg.norm(centers[:, None, :] - self._centers[None, :, :], axis=-1)
+            changed = np.array([[a != b for b in self._handedness] for a in handedness], dtype=bool)
+            cost += changed * self.handedness_penalty
+            used_prev = set()
+            for flat in np.argsort(cost, axis=None):
+                i, j = divmod(int(flat), cost.shape[1])
+                if cost[i, j] > self.max_distance:
+                    break
+                if ids[i] >= 0 or j in used_prev:
+                    continue
+                ids[i] = int(self._ids[j])
+                used_prev.add(j)
+
+        for i in range(n):
+            if ids[i] < 0:
+                ids[i] = self._next_id
+                self._next_id += 1
+
+        self._ids = np.asarray(ids, dtype=np.int64)
+        self._centers = centers.astype(np.float32)
+        self._handedness = list(handedness)
+        return ids
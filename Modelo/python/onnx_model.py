@@ -0,0 +1,392 @@
+"""
+Utilidades del modelo ONNX
+==========================
+Carga de sesiones de ONNX Runtime compartida por el tracker en vivo y los
+modos offline.
+
+El ``model.onnx`` exportado declara la entrada con forma fija ``[1, 63]``.
+Para inferencia por lotes (N x 63) se reescribe en memoria la primera
+dimensión de entradas y salidas como simbólica; esto requiere el paquete
+``onnx`` (opcional). Sin él, ``predict_batch`` cae a una llamada por fila.
+
+Salida de probabilidades: el SVM exportado por skl2onnx termina en
+``SVMClassifier -> Cast ("probabilities") -> ZipMap ("output_probability")``
+y ZipMap devuelve una lista de dicts por llamada. Con ``onnx`` instalado el
+grafo se reescribe en memoria para quitar el ZipMap y exponer directamente
+el tensor float32 (N, clases); ``ProbabilityReader`` entrega en ambos casos
+un array alineado con las clases pedidas.
+
+Perfiles de ejecución (``SessionProfile`` / ``PROFILES``): hilos intra/inter
+operador, ejecución secuencial o paralela, arena de memoria y memory
+pattern, y nivel de optimización del grafo. Con ``cache_dir`` el modelo ya
+optimizado se guarda en disco (una entrada por modelo, reescrituras,
+versión de ONNX Runtime y perfil) y en los arranques siguientes se carga
+sin volver a optimizarlo. ``warm_up`` corre el modelo con datos de prueba
+para que la primera inferencia real no pague la inicialización perezosa.
+"""
+
+import hashlib
+import importlib.util
+import os
+import platform
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SessionProfile(NamedTuple):
+    """
+    Opciones de ``onnxruntime.SessionOptions``.
+
+    intra_op_threads / inter_op_threads: 0 = lo que decida ONNX Runtime.
+    execution_mode: "sequential" o "parallel" (solo ayuda con ramas
+    independientes en el grafo). optimization: "disable", "basic",
+    "extended" o "all".
+    """
+    intra_op_threads: int = 0
+    inter_op_threads: int = 0
+    execution_mode: str = "sequential"
+    cpu_mem_arena: bool = True
+    mem_pattern: bool = True
+    optimization: str = "all"
+
+
+PROFILES: Dict[str, SessionProfile] = {
+    # Comportamiento histórico: todo en manos de ONNX Runtime
+    "default": SessionProfile(),
+    # Una fila por frame: un solo hilo evita despertar el pool en cada llamada
+    "latency": SessionProfile(intra_op_threads=1, inter_op_threads=1),
+    # Lotes grandes (modo batch): todos los núcleos
+    "throughput": SessionProfile(execution_mode="parallel"),
+    # Máquinas con poca RAM: sin arena ni memory pattern
+    "low-memory": SessionProfile(intra_op_threads=1, inter_op_threads=1,
+                                 cpu_mem_arena=False, mem_pattern=False),
+}
+
+def describe_profile(profile: SessionProfile) -> str:
+    """Resumen de un perfil para los logs."""
+    intra = profile.intra_op_threads or "auto"
+    inter = profile.inter_op_threads or "auto"
+    return (f"hilos {intra}/{inter}, {profile.execution_mode}, "
+            f"arena {'sí' if profile.cpu_mem_arena else 'no'}, "
+            f"mem pattern {'sí' if profile.mem_pattern else 'no'}, optimización {profile.optimization}")
+
+
+CLASS_LABELS_METADATA = "hand_tracker.classlabels"
+
+_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+
+
+def make_session_options(profile: SessionProfile):
+    """Arma ``onnxruntime.SessionOptions`` a partir de un perfil."""
+    import onnxruntime as ort
+
+    sess_options = ort.SessionOptions()
+    sess_options.graph_optimization_level = getattr(ort.GraphOptimizationLevel,
+                                                    _OPTIMIZATION_LEVELS[profile.optimization])
+    sess_options.intra_op_num_threads = int(profile.intra_op_threads)
+    sess_options.inter_op_num_threads = int(profile.inter_op_threads)
+    sess_options.execution_mode = (ort.ExecutionMode.ORT_PARALLEL if profile.execution_mode == "parallel"
+                                   else ort.ExecutionMode.ORT_SEQUENTIAL)
+    sess_options.enable_cpu_mem_arena = bool(profile.cpu_mem_arena)
+    sess_options.enable_mem_pattern = bool(profile.mem_pattern)
+    return sess_options
+
+
+def _make_batch_dynamic(model):
+    for value in list(model.graph.input) + list(model.graph.output):
+        if not value.type.HasField("tensor_type"):
+            continue
+        dims = value.type.tensor_type.shape.dim
+        if len(dims) > 0:
+            dims[0].ClearField("dim_value")
+            dims[0].dim_param = "N"
+
+
+def _drop_zipmap(model) -> bool:
+    """
+    Reemplaza cada salida producida por un ZipMap por el tensor que lo alimenta.
+
+    Returns:
+        True si se quitó algún ZipMap
+    """
+    from onnx import TensorProto, helper
+
+    zipmaps = [node for node in model.graph.node if node.op_type == "ZipMap"]
+    if not zipmaps:
+        return False
+    replaced = {node.output[0]: node.input[0] for node in zipmaps}
+    labels = _classifier_labels(model)
+    class_count = len(labels) if labels else 0
+    if labels:
+        # Las columnas del tensor siguen el orden del clasificador; se guarda
+        # en los metadatos para leerlo desde la sesión sin el paquete onnx
+        entry = model.metadata_props.add()
+        entry.key = CLASS_LABELS_METADATA
+        entry.value = ",".join(labels)
+    for node in zipmaps:
+        model.graph.node.remove(node)
+
+    outputs = list(model.graph.output)
+    del model.graph.output[:]
+    for value in outputs:
+        if value.name in replaced:
+            value = helper.make_tensor_value_info(replaced[value.name], TensorProto.FLOAT,
+                                                  ["N", class_count or "C"])
+        model.graph.output.append(value)
+    return True
+
+
+def _classifier_labels(model) -> Optional[List[str]]:
+    for node in model.graph.node:
+        if node.op_type.endswith("Classifier"):
+            for attr in node.attribute:
+                if attr.name == "classlabels_strings":
+                    return [label.decode() for label in attr.strings]
+                if attr.name == "classlabels_int64s":
+                    return [str(label) for label in attr.ints]
+    return None
+
+
+def load_model_bytes(model_path: str, batch: bool = False,
+                     drop_zipmap: bool = False) -> Optional[bytes]:
+    """
+    Devuelve el modelo serializado con las reescrituras pedidas, o None si el
+    paquete ``onnx`` no está instalado.
+
+    Args:
+        model_path: Ruta al archivo model.onnx
+        batch: Hacer dinámico el eje de batch
+        drop_zipmap: Quitar el ZipMap y exponer las probabilidades como tensor
+    """
+    try:
+        import onnx
+    except ImportError:
+        return None
+
+    model = onnx.load(model_path)
+    if drop_zipmap:
+        _drop_zipmap(model)
+    if batch:
+        _make_batch_dynamic(model)
+    return model.SerializeToString()
+
+
+def _cache_path(cache_dir: str, model_path: str, rewrites: str, profile: SessionProfile) -> str:
+    """Archivo de caché del modelo optimizado para este modelo / reescrituras / ORT / perfil."""
+    import onnxruntime as ort
+
+    with open(model_path, "rb") as f:
+        digest = hashlib.sha256(f.read())
+    digest.update(f"{rewrites}|{ort.__version__}|{platform.machine()}|{profile.optimization}".encode())
+    return os.path.join(cache_dir, f"model-{digest.hexdigest()[:16]}.onnx")
+
+
+def create_session(model_path: str, batch: bool = False, drop_zipmap: bool = False,
+                   profile: Optional[SessionProfile] = None,
+                   cache_dir: Optional[str] = None):
+    """
+    Crea una sesión de ONNX Runtime en CPU.
+
+    Args:
+        model_path: Ruta al archivo model.onnx
+        batch: Si True, intenta habilitar entradas de N filas
+        drop_zipmap: Si True, intenta exponer las probabilidades como tensor
+            float32 en lugar de la lista de dicts de ZipMap
+        profile: Perfil de ejecución (default: ``PROFILES["default"]``)
+        cache_dir: Directorio donde guardar / buscar el modelo ya optimizado
+            (None = optimizar en cada arranque)
+
+    Returns:
+        Tupla (sesión, nombre_de_entrada, soporta_batch)
+    """
+    import onnxruntime as ort
+
+    profile = profile or PROFILES["default"]
+    sess_options = make_session_options(profile)
+
+    cached = None
+    if cache_dir and profile.optimization != "disable":
+        # Las reescrituras solo ocurren con el paquete onnx: entran en la clave
+        rewrites = f"batch={batch},drop_zipmap={drop_zipmap}" if importlib.util.find_spec("onnx") else "none"
+        cached = _cache_path(cache_dir, model_path, rewrites, profile)
+        if os.path.exists(cached):
+            # Ya reescrito y optimizado en un arranque anterior: cargar sin re-optimizar
+            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            session = ort.InferenceSession(cached, sess_options, providers=['CPUExecutionProvider'])
+            supports_batch = batch and not isinstance(session.get_inputs()[0].shape[0], int)
+            return session, session.get_inputs()[0].name, supports_batch
+        os.makedirs(cache_dir, exist_ok=True)
+        sess_options.optimized_model_filepath = cached
+
+    model = load_model_bytes(model_path, batch, drop_zipmap) if (batch or drop_zipmap) else None
+    supports_batch = batch and model is not None
+    session = ort.InferenceSession(
+        model if model is not None else model_path,
+        sess_options,
+        providers=['CPUExecutionProvider']
+    )
+    return session, session.get_inputs()[0].name, supports_batch
+
+
+def warm_up(session, input_name: str, rows: int = 1, runs: int = 3) -> List[float]:
+    """
+    Corre el modelo con landmarks de prueba para inicializar buffers y kernels.
+
+    Args:
+        rows: Filas por llamada (la cantidad de manos que se van a usar)
+        runs: Llamadas a ``session.run``
+
+    Returns:
+        Duración de cada llamada en segundos (la primera suele ser la más cara)
+    """
+    width = session.get_inputs()[0].shape[-1]
+    dummy = np.random.default_rng(0).random((rows, width if isinstance(width, int) else 63), dtype=np.float32)
+    durations = []
+    for _ in range(max(1, int(runs))):
+        t0 = time.perf_counter()
+        session.run(None, {input_name: dummy})
+        durations.append(time.perf_counter() - t0)
+    return durations
+
+
+class ProbabilityReader:
+    """
+    Lee etiquetas y probabilidades de las salidas de una sesión.
+
+    Detecta al construirse si la salida de probabilidades es un tensor
+    (modelo sin ZipMap) o una secuencia de dicts (ZipMap) y en ambos casos
+    entrega un array float32 (N, len(classes)) en el orden de ``classes``.
+
+    Args:
+        session: Sesión de ONNX Runtime
+        classes: Orden de clases deseado (p. ej. ``CLASSES`` del tracker)
+        model_classes: Orden de clases del clasificador; por defecto se lee
+            de los metadatos que deja ``_drop_zipmap`` (si no están, se asume
+            el mismo orden que ``classes``)
+    """
+
+    def __init__(self, session, classes: Sequence[str],
+                 model_classes: Optional[Sequence[str]] = None):
+        self.classes = list(classes)
+        outputs = session.get_outputs()
+        self.label_index = 0
+        self.probability_index: Optional[int] = 1 if len(outputs) > 1 else None
+        self.tensor = (self.probability_index is not None
+                       and outputs[self.probability_index].type.startswith("tensor"))
+        self.order: Optional[np.ndarray] = None
+        if self.tensor and model_classes is None:
+            labels = session.get_modelmeta().custom_metadata_map.get(CLASS_LABELS_METADATA)
+            model_classes = labels.split(",") if labels else None
+        if self.tensor and model_classes is not None:
+            model_classes = list(model_classes)
+            if model_classes != self.classes:
+                index = {label: i for i, label in enumerate(model_classes)}
+                self.order = np.array([index[label] for label in self.classes], dtype=np.int64)
+
+    @property
+    def kind(self) -> str:
+        """"tensor", "zipmap" o "none" (modelo sin salida de probabilidades)."""
+        if self.probability_index is None:
+            return "none"
+        return "tensor" if self.tensor else "zipmap"
+
+    def probabilities(self, outputs, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Args:
+            outputs: Resultado de ``session.run(None, ...)``
+            out: Array (N, clases) float32 donde escribir (opcional)
+
+        Returns:
+            Array (N, clases) float32, o None si el modelo no tiene probabilidades
+        """
+        if self.probability_index is None or outputs[self.probability_index] is None:
+            return None
+        raw = outputs[self.probability_index]
+        if self.tensor:
+            if self.order is not None:
+                raw = raw[:, self.order]
+            if out is None:
+                return np.asarray(raw, dtype=np.float32)
+            np.copyto(out, raw)
+            return out
+        n = len(raw)
+        k = len(self.classes)
+        if out is None:
+            out = np.empty((n, k), dtype=np.float32)
+        for i, p in enumerate(raw):
+            out[i] = [p.get(label, 0.0) for label in self.classes]
+        return out
+
+
+def model_classes(model_path: str) -> Optional[List[str]]:
+    """Clases en el orden del clasificador del modelo, o None sin el paquete ``onnx``."""
+    try:
+        import onnx
+    except ImportError:
+        return None
+    return _classifier_labels(onnx.load(model_path))
+
+
+def top_k(probabilities: np.ndarray, classes: Sequence[str], k: int = 3) -> List[Tuple[str, float]]:
+    """
+    Las ``k`` clases más probables de un vector de probabilidades.
+
+    Returns:
+        Lista de tuplas (letra, probabilidad) de mayor a menor
+    """
+    k = max(1, min(int(k), probabilities.shape[0]))
+    best = np.argpartition(probabilities, -k)[-k:]
+    best = best[np.argsort(probabilities[best])[::-1]]
+    return [(classes[i], float(probabilities[i])) for i in best]
+
+
+def _confidences_from_output(probabilities) -> np.ndarray:
+    """Confianza máxima por fila, de un tensor (N, clases) o de la lista de dicts de ZipMap."""
+    if isinstance(probabilities, np.ndarray):
+        return probabilities.max(axis=1).astype(np.float32, copy=False)
+    return np.fromiter((max(p.values()) if p else 0.0 for p in probabilities),
+                       dtype=np.float32, count=len(probabilities))
+
+
+def predict_batch(session, input_name: str, landmarks: np.ndarray,
+                  supports_batch: bool = True,
+                  batch_size: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Predice letra y confianza para N filas de landmarks.
+
+    Args:
+        session: Sesión de ONNX Runtime
+        input_name: Nombre de la entrada del modelo
+        landmarks: Array (N, 63), o (N, features) ya transformado (ver features.py)
+        supports_batch: Si la sesión acepta más de una fila por llamada
+        batch_size: Filas por llamada a ``session.run``
+
+    Returns:
+        Tupla (letras (N,) str, confianzas (N,) float32)
+    """
+    landmarks = np.ascontiguousarray(landmarks, dtype=np.float32)
+    if landmarks.ndim == 1:
+        landmarks = landmarks.reshape(1, -1)
+    n = landmarks.shape[0]
+    letters = np.empty(n, dtype=object)
+    confidences = np.zeros(n, dtype=np.float32)
+    step = batch_size if supports_batch else 1
+
+    for start in range(0, n, step):
+        chunk = landmarks[start:start + step]
+        outputs = session.run(None, {input_name: chunk})
+        end = start + chunk.shape[0]
+        letters[start:end] = outputs[0]
+        if len(outputs) > 1 and outputs[1] is not None:
+            confidences[start:end] = _confidences_from_output(outputs[1])
+        else:
+            confidences[start:end] = 1.0
+
+    return letters.astype(str), confidences
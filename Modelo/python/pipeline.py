@@ -0,0 +1,223 @@
+"""
+Pipeline multi-hilo para HandTracker
+====================================
+Separa el bucle de ``HandTracker.run`` en tres etapas que corren en paralelo:
+
+    captura (hilo) -> inferencia (hilo) -> salida (hilo principal)
+
+Las etapas se conectan con ranuras de "último frame" (``LatestSlot``): el
+productor siempre sobrescribe el elemento pendiente, así el consumidor procesa
+el frame más reciente y los frames viejos se descartan en lugar de acumularse
+en una cola. La latencia queda acotada por la etapa más lenta y no por la suma
+de todas.
+
+La salida (ventana de OpenCV, overlay y envío de video) se queda en el hilo
+principal porque ``cv2.imshow`` / ``cv2.waitKey`` no son seguros fuera de él en
+varias plataformas.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import cv2
+
+from metrics import STAGE_CAPTURE, STAGE_OUTPUT, STAGE_SEND
+
+
+class LatestSlot:
+    """
+    Ranura de un solo elemento entre dos hilos.
+
+    ``put`` reemplaza el elemento pendiente (contándolo como descartado) y
+    ``get`` bloquea hasta que haya uno nuevo o se cierre la ranura.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item: Any):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Devuelve el elemento más reciente, o None si se cerró / venció el timeout."""
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            item = self._item
+            self._item = None
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class StageStats:
+    """Contadores de throughput y tiempo ocupado por etapa (seguros entre hilos)."""
+
+    def __init__(self, stages):
+        self._lock = threading.Lock()
+        self._count: Dict[str, int] = {name: 0 for name in stages}
+        self._busy: Dict[str, float] = {name: 0.0 for name in stages}
+        self._since = time.perf_counter()
+
+    def add(self, stage: str, busy_seconds: float):
+        with self._lock:
+            self._count[stage] += 1
+            self._busy[stage] += busy_seconds
+
+    def snapshot_and_reset(self) -> Dict[str, Dict[str, float]]:
+        """Devuelve {etapa: {fps, ms}} desde el último reporte y reinicia los contadores."""
+        with self._lock:
+            now = time.perf_counter()
+            elapsed = max(now - self._since, 1e-9)
+            report = {}
+            for name, count in self._count.items():
+                report[name] = {
+                    "fps": count / elapsed,
+                    "ms": (self._busy[name] / count * 1000.0) if count else 0.0,
+                }
+                self._count[name] = 0
+                self._busy[name] = 0.0
+            self._since = now
+            return report
+
+
+class PipelinedRunner:
+    """
+    Ejecuta un ``HandTracker`` con captura, inferencia y salida en hilos separados.
+
+    Reutiliza ``tracker.process_frame``, ``tracker.send_to_unity`` y
+    ``tracker.handle_output``, por lo que el comportamiento por frame es el
+    mismo que el del bucle secuencial.
+    """
+
+    STAGES = ("capture", "inference", "output")
+
+    def __init__(self, tracker, stats_interval: float = 5.0):
+        self.tracker = tracker
+        self.stats_interval = float(stats_interval)
+        self.stats = StageStats(self.STAGES)
+        self._capture_slot = LatestSlot()
+        self._output_slot = LatestSlot()
+        self._stop = threading.Event()
+        self._latency_sum = 0.0
+        self._latency_count = 0
+
+    def _capture_loop(self):
+        tracker = self.tracker
+        metrics = tracker.metrics
+        frame_id = 0
+        while not self._stop.is_set():
+            if metrics is not None:
+                metrics.start()
+            t0 = time.perf_counter()
+            ret, frame = tracker.cap.read()
+            if not ret:
+                if tracker.cap.finished:
+                    print("[INFO] Fin de la fuente de video")
+                    tracker.is_running = False
+                    return
+                print("[WARN] No se pudo leer frame")
+                time.sleep(0.01)
+                continue
+            mirrored = tracker.mirror_mode
+            if mirrored:
+                frame = cv2.flip(frame, 1)
+            if metrics is not None:
+                metrics.lap(STAGE_CAPTURE)
+            frame_id += 1
+            self._capture_slot.put((frame_id, t0, mirrored, frame))
+            self.stats.add("capture", time.perf_counter() - t0)
+
+    def _inference_loop(self):
+        tracker = self.tracker
+        while not self._stop.is_set():
+            item = self._capture_slot.get(timeout=0.1)
+            # El cambio de espejo (tecla 'm' en el hilo de salida) se aplica
+            # acá, entre frames, para no reiniciar el detector en plena inferencia
+            tracker.apply_pending_toggles()
+            if item is None:
+                continue
+            frame_id, t_capture, mirrored, frame = item
+            if mirrored != tracker.mirror_mode:
+                # Capturado antes del cambio de espejo: no mezclarlo con el estado reiniciado
+                continue
+
+            t0 = time.perf_counter()
+            hand_landmarks, landmarks, letter, confidence = tracker.process_frame(frame)
+            hands = tracker.hand_results
+            tracker.send_to_unity(landmarks, letter, confidence, hand_landmarks is not None, hands)
+            if tracker.metrics is not None:
+                tracker.metrics.lap(STAGE_SEND)
+            self.stats.add("inference", time.perf_counter() - t0)
+
+            self._output_slot.put((frame_id, t_capture, frame, hand_landmarks, letter, confidence, hands))
+
+    def _report(self):
+        report = self.stats.snapshot_and_reset()
+        latency_ms = (self._latency_sum / self._latency_count * 1000.0) if self._latency_count else 0.0
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        parts = [f"{name} {r['fps']:.1f} fps/{r['ms']:.1f} ms" for name, r in report.items()]
+        print(f"[STATS] {' | '.join(parts)} | latencia {latency_ms:.1f} ms | "
+              f"descartados captura={self._capture_slot.dropped} salida={self._output_slot.dropped}")
+
+    def run(self):
+        tracker = self.tracker
+        tracker.is_running = True
+        tracker._fps_prev_time = time.time()
+        tracker._fps_frame_count = 0
+
+        workers = [
+            threading.Thread(target=self._capture_loop, name="HandTracker-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="HandTracker-inference", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        last_report = time.perf_counter()
+        try:
+            while tracker.is_running:
+                item = self._output_slot.get(timeout=0.1)
+                if item is not None:
+                    _, t_capture, frame, hand_landmarks, letter, confidence, hands = item
+                    t0 = time.perf_counter()
+                    tracker._update_fps()
+                    keep_running = tracker.handle_output(frame, hand_landmarks, letter, confidence, hands)
+                    done = time.perf_counter()
+                    if tracker.metrics is not None:
+                        tracker.metrics.record(STAGE_OUTPUT, done - t0)
+                    self.stats.add("output", done - t0)
+                    self._latency_sum += done - t_capture
+                    self._latency_count += 1
+                    if tracker.first_frame_ms is None:
+                        tracker._report_first_frame(done - t_capture)
+                    if not keep_running:
+                        break
+                elif tracker.show_window:
+                    # Mantener la ventana respondiendo aunque no lleguen frames
+                    cv2.waitKey(1)
+
+                if self.stats_interval > 0 and (time.perf_counter() - last_report) >= self.stats_interval:
+                    self._report()
+                    last_report = time.perf_counter()
+
+        except KeyboardInterrupt:
+            print("\n[INFO] Interrupción de teclado recibida")
+        finally:
+            self._stop.set()
+            self._capture_slot.close()
+            self._output_slot.close()
+            for worker in workers:
+                worker.join(timeout=1.0)
+            tracker.cleanup()
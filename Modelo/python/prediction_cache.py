@@ -0,0 +1,109 @@
+"""
+Caché de predicciones por pose cuantizada
+=========================================
+Mientras se sostiene una letra, poses consecutivas son casi idénticas. La
+caché normaliza los landmarks (relativos a la muñeca y escalados por el
+tamaño de la mano), los cuantiza a una grilla configurable y usa esos bytes
+como clave de un LRU acotado, así una pose sostenida no vuelve a pasar por
+ONNX.
+
+Un acierto de caché es, por definición, un resultado "viejo" (calculado para
+otra pose de la misma celda). Para medir cuánto difiere del modelo, cada
+``verify_every`` aciertos se corre el modelo igual y se cuenta si la letra
+cacheada era distinta (``stale_mismatches``).
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from features import normalize_landmarks
+
+
+class PredictionCache:
+    """
+    LRU de (letra, confianza) indexado por pose normalizada y cuantizada.
+
+    Args:
+        capacity: Entradas máximas
+        grid: Tamaño de celda en unidades normalizadas (más grande = más aciertos
+            y resultados más aproximados)
+        verify_every: Cada cuántos aciertos se verifica contra el modelo
+            (0 desactiva la verificación)
+    """
+
+    def __init__(self, capacity: int = 256, grid: float = 0.1, verify_every: int = 50):
+        self.capacity = max(1, int(capacity))
+        self.grid = float(grid)
+        self.verify_every = int(verify_every)
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self._normalized = np.empty((21, 3), dtype=np.float32)
+        self._quantized = np.empty((21, 3), dtype=np.int8)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.verifications = 0
+        self.stale_mismatches = 0
+
+    def key(self, landmarks) -> bytes:
+        normalized = normalize_landmarks(landmarks, out=self._normalized)
+        np.multiply(normalized, 1.0 / self.grid, out=normalized)
+        np.rint(normalized, out=normalized)
+        np.clip(normalized, -127, 127, out=normalized)
+        self._quantized[...] = normalized
+        return self._quantized.tobytes()
+
+    def lookup(self, key: bytes) -> Tuple[Optional[Tuple[str, float]], bool]:
+        """
+        Returns:
+            Tupla (resultado cacheado o None, verificar). Si ``verificar`` es
+            True el llamador debe correr el modelo y llamar a ``store``
+            pasando el valor cacheado.
+        """
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None, False
+        self._entries.move_to_end(key)
+        self.hits += 1
+        verify = self.verify_every > 0 and self.hits % self.verify_every == 0
+        return cached, verify
+
+    def store(self, key: bytes, result: Tuple[str, float],
+              cached: Optional[Tuple[str, float]] = None):
+        """Guarda un resultado del modelo (y registra la verificación si hubo acierto)."""
+        if cached is not None:
+            self.verifications += 1
+            if cached[0] != result[0]:
+                self.stale_mismatches += 1
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "verifications": self.verifications,
+            "stale_mismatches": self.stale_mismatches,
+            "stale_mismatch_rate": (self.stale_mismatches / self.verifications
+                                    if self.verifications else 0.0),
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"{s['hits']} aciertos / {s['misses']} fallos ({s['hit_rate']:.0%} servidos desde caché) | "
+                f"{s['evictions']} desalojos | {s['size']}/{s['capacity']} entradas | "
+                f"verificados {s['verifications']}, letra distinta {s['stale_mismatches']} "
+                f"({s['stale_mismatch_rate']:.0%})")
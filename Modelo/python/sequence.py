@@ -0,0 +1,277 @@
+"""
+Señas dinámicas (J, Z)
+======================
+El clasificador estático ve un solo frame, así que no puede distinguir las
+letras que se hacen con movimiento. ``SequenceRecognizer`` guarda los
+últimos T frames de landmarks normalizados (relativos a la muñeca, escala 1,
+ver ``features.normalize_landmarks``) y los puntúa con un segundo
+modelo ONNX cuyas probabilidades se fusionan con las del estático.
+
+Ventana sin copias: ``SequenceWindow`` es un ring buffer preasignado de
+2T filas en el que cada frame se escribe dos veces (posición ``i`` e
+``i + T``). Así los últimos T frames son siempre una vista contigua
+``buffer[i + 1:i + 1 + T]`` que se pasa directo al modelo: por frame solo se
+escribe una fila nueva, nunca se rearma la ventana.
+
+Contrato del modelo de secuencias:
+    - entrada float32 (N, T, 63) o (N, T * 63); T se toma de la forma del
+      modelo (o de ``window`` si el eje es dinámico)
+    - la última salida son las probabilidades (N, C), como tensor o ZipMap
+    - las C etiquetas van en el metadato ``hand_tracker.classlabels``
+      (separadas por coma) o en el clasificador ONNX-ML del grafo; la
+      etiqueta ``BACKGROUND`` ("_") es "ninguna seña dinámica"
+
+Fusión: con ``p`` la suma de las probabilidades de las señas dinámicas y
+``s`` el vector del clasificador estático, el vector fusionado sobre
+``CLASSES + dinámicas`` es ``[s * (1 - p), dinámicas]``. Si ninguna seña
+dinámica llega a ``min_confidence`` el estático pasa sin cambios.
+
+El modelo corre cada ``stride`` frames (entre medio se reutiliza el último
+puntaje); ``summary`` reporta su costo medio por llamada para compararlo
+con el presupuesto del frame.
+
+Uso (sobre una grabación, sin cámara):
+    python hand_tracker.py sequence secuencias.onnx sesion.lmrec [--stride 2]
+"""
+
+import argparse
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from features import normalize_landmarks
+
+BACKGROUND = "_"
+NUM_FEATURES = 63
+
+
+class SequenceWindow:
+    """
+    Últimos ``length`` frames de landmarks normalizados.
+
+    Args:
+        length: Frames de la ventana (T)
+        features: Valores por frame
+    """
+
+    def __init__(self, length: int, features: int = NUM_FEATURES):
+        self.length = max(1, int(length))
+        self._buffer = np.zeros((2 * self.length, features), dtype=np.float32)
+        self._last = self.length - 1
+        self.count = 0
+
+    def reset(self):
+        self.count = 0
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.length
+
+    def push(self, landmarks):
+        """Normaliza y agrega un frame (una fila de 63 valores)."""
+        i = (self._last + 1) % self.length
+        row = self._buffer[i]
+        normalize_landmarks(landmarks, out=row.reshape(21, 3))
+        self._buffer[i + self.length] = row
+        self._last = i
+        self.count += 1
+
+    def view(self) -> np.ndarray:
+        """Vista contigua (T, features) del más viejo al más nuevo; válida hasta el próximo ``push``."""
+        start = self._last + 1
+        return self._buffer[start:start + self.length]
+
+
+class SequenceRecognizer:
+    """
+    Modelo de secuencias en streaming, con una ventana por mano.
+
+    Args:
+        model_path: Ruta al modelo ONNX de secuencias
+        window: Frames de la ventana si el modelo no fija T
+        stride: Cada cuántos frames se corre el modelo
+        min_confidence: Probabilidad mínima de una seña dinámica para
+            intervenir en la fusión
+        profile: ``onnx_model.SessionProfile`` (default: el perfil "default")
+        cache_dir: Directorio de caché del modelo optimizado
+        warmup: Llamadas de warm-up al cargar (0 desactiva)
+    """
+
+    def __init__(self, model_path: str, window: int = 30, stride: int = 1,
+                 min_confidence: float = 0.6, profile=None,
+                 cache_dir: Optional[str] = None, warmup: int = 3):
+        from onnx_model import CLASS_LABELS_METADATA, ProbabilityReader, create_session, model_classes
+
+        self.model_path = model_path
+        self.stride = max(1, int(stride))
+        self.min_confidence = float(min_confidence)
+        self.session, self.input_name, _ = create_session(model_path, drop_zipmap=True,
+                                                          profile=profile, cache_dir=cache_dir)
+
+        shape = self.session.get_inputs()[0].shape
+        self._flat = len(shape) == 2
+        if self._flat:
+            length = shape[1] // NUM_FEATURES if isinstance(shape[1], int) else window
+        else:
+            length = shape[1] if isinstance(shape[1], int) else window
+        self.length = int(length)
+
+        labels = self.session.get_modelmeta().custom_metadata_map.get(CLASS_LABELS_METADATA)
+        labels = labels.split(",") if labels else model_classes(model_path)
+        if not labels:
+            raise ValueError(f"El modelo de secuencias no declara sus clases ({CLASS_LABELS_METADATA})")
+        self.labels: List[str] = list(labels)
+        self.dynamic_classes: List[str] = [label for label in self.labels if label != BACKGROUND]
+        self._dynamic_columns = np.array([self.labels.index(label) for label in self.dynamic_classes],
+                                         dtype=np.int64)
+        outputs = self.session.get_outputs()
+        self._reader = ProbabilityReader(self.session, self.labels, self.labels) if len(outputs) > 1 else None
+
+        self._windows: Dict[int, SequenceWindow] = {}
+        self._scores: Dict[int, np.ndarray] = {}
+        self._since_run: Dict[int, int] = {}
+        self.runs = 0
+        self.run_seconds = 0.0
+        self.detections = 0
+
+        if warmup:
+            dummy = SequenceWindow(self.length)
+            for _ in range(self.length):
+                dummy.push(np.random.default_rng(0).random(NUM_FEATURES, dtype=np.float32))
+            for _ in range(max(1, int(warmup))):
+                self._score(dummy)
+
+    def _score(self, window: SequenceWindow) -> np.ndarray:
+        view = window.view()
+        batch = view.reshape(1, -1) if self._flat else view[None]
+        outputs = self.session.run(None, {self.input_name: batch})
+        if self._reader is not None:
+            probabilities = self._reader.probabilities(outputs)
+        else:
+            probabilities = np.asarray(outputs[-1], dtype=np.float32)
+        return probabilities[0, self._dynamic_columns]
+
+    def update(self, landmarks, hand_id: int = 0) -> Optional[np.ndarray]:
+        """
+        Agrega el frame de una mano y, si toca, vuelve a puntuar su ventana.
+
+        Returns:
+            Probabilidades de ``dynamic_classes`` (último puntaje de esa
+            mano), o None mientras la ventana no esté llena
+        """
+        window = self._windows.get(hand_id)
+        if window is None:
+            window = self._windows[hand_id] = SequenceWindow(self.length)
+        window.push(landmarks)
+        if not window.full:
+            return None
+        since = self._since_run.get(hand_id, self.stride)
+        if since >= self.stride or hand_id not in self._scores:
+            t0 = time.perf_counter()
+            self._scores[hand_id] = self._score(window)
+            self.run_seconds += time.perf_counter() - t0
+            self.runs += 1
+            since = 0
+        self._since_run[hand_id] = since + 1
+        return self._scores[hand_id]
+
+    def release(self, hand_id: Optional[int] = None):
+        """Sin mano: vacía la ventana de ``hand_id`` (None = todas)."""
+        ids = list(self._windows) if hand_id is None else [hand_id]
+        for i in ids:
+            if i in self._windows:
+                self._windows[i].reset()
+            self._scores.pop(i, None)
+            self._since_run.pop(i, None)
+
+    def retain(self, hand_ids: Iterable[int]):
+        """Descarta las ventanas de las manos que ya no están."""
+        keep = set(hand_ids)
+        for i in [i for i in self._windows if i not in keep]:
+            del self._windows[i]
+            self._scores.pop(i, None)
+            self._since_run.pop(i, None)
+
+    def fuse(self, letter: str, confidence: float, dynamic: Optional[np.ndarray],
+             static: Optional[np.ndarray] = None,
+             out: Optional[np.ndarray] = None) -> Tuple[str, float, Optional[np.ndarray]]:
+        """
+        Combina la predicción estática con el puntaje de secuencia.
+
+        Args:
+            letter, confidence: Predicción del clasificador estático
+            dynamic: Resultado de ``update`` (o None)
+            static: Probabilidades del estático en el orden de ``CLASSES`` (opcional)
+            out: Array (len(CLASSES) + len(dynamic_classes),) donde escribir
+
+        Returns:
+            Tupla (letra, confianza, probabilidades fusionadas o None si no
+            había vector estático)
+        """
+        fused = None
+        if static is not None:
+            k = static.shape[0]
+            fused = np.empty(k + len(self.dynamic_classes), dtype=np.float32) if out is None else out
+            fused[:k] = static
+            fused[k:] = 0.0
+        if dynamic is None or dynamic.size == 0:
+            return letter, confidence, fused
+
+        best = int(np.argmax(dynamic))
+        best_score = float(dynamic[best])
+        if best_score < self.min_confidence:
+            return letter, confidence, fused
+
+        background = max(0.0, 1.0 - float(dynamic.sum()))
+        if fused is not None:
+            fused[:k] *= background
+            fused[k:] = dynamic
+        if best_score >= confidence * background:
+            self.detections += 1
+            return self.dynamic_classes[best], best_score, fused
+        return letter, confidence * background, fused
+
+    def summary(self) -> str:
+        mean_ms = self.run_seconds / self.runs * 1000.0 if self.runs else 0.0
+        return (f"{self.runs} llamadas al modelo de secuencias, {mean_ms:.2f} ms promedio "
+                f"(T={self.length}, cada {self.stride} frames) | {self.detections} frames con seña dinámica")
+
+
+def main(argv=None):
+    """Punto de entrada del subcomando ``sequence``: corre el modelo sobre una grabación."""
+    parser = argparse.ArgumentParser(
+        prog='hand_tracker.py sequence',
+        description='Corre el modelo de señas dinámicas sobre una grabación de landmarks (.lmrec)'
+    )
+    parser.add_argument('model', help='Modelo ONNX de secuencias')
+    parser.add_argument('recording', help='Grabación de landmarks (--record)')
+    parser.add_argument('--window', type=int, default=30,
+                        help='Frames de la ventana si el modelo no fija T (default: 30)')
+    parser.add_argument('--stride', type=int, default=1, help='Correr el modelo cada N frames (default: 1)')
+    parser.add_argument('--min-conf', type=float, default=0.6,
+                        help='Probabilidad mínima de una seña dinámica (default: 0.6)')
+    args = parser.parse_args(argv)
+
+    from landmark_recording import ReplaySource
+
+    recognizer = SequenceRecognizer(args.model, window=args.window, stride=args.stride,
+                                    min_confidence=args.min_conf)
+    print(f"[OK] Modelo de secuencias: T={recognizer.length}, clases {', '.join(recognizer.labels)}")
+
+    current = ""
+    frames = 0
+    t_start = time.perf_counter()
+    for timestamp, landmarks, hand_detected in ReplaySource(args.recording, realtime=False):
+        frames += 1
+        if not hand_detected:
+            recognizer.release()
+            continue
+        letter, confidence, _ = recognizer.fuse("", 0.0, recognizer.update(landmarks))
+        if letter != current:
+            if letter:
+                print(f"[LETRA] {timestamp:.2f} s: {letter} ({confidence:.0%})")
+            current = letter
+    elapsed = time.perf_counter() - t_start
+    print(f"[STATS] {frames} frames en {elapsed:.2f} s ({frames / max(elapsed, 1e-9):.0f} frames/s) | "
+          f"{recognizer.summary()}")
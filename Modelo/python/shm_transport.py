@@ -0,0 +1,279 @@
+"""
+Transporte de frames por memoria compartida
+===========================================
+Cuando Unity corre en la misma máquina no hace falta codificar el preview
+como JPEG, mandarlo por loopback y decodificarlo de nuevo: el tracker
+escribe el frame (reducido a ``video_width``) tal cual en un ring de slots
+dentro de un archivo mapeado en memoria y el consumidor lee el último.
+
+Formato del archivo (little-endian):
+
+    cabecera (64 bytes)
+    offset  tipo    campo
+    ------  ------  -----------------------------------------------
+    0       4s      magia b"HTFB"
+    4       uint16  versión (= 1)
+    6       uint16  cantidad de slots
+    8       uint32  ancho
+    12      uint32  alto
+    16      uint16  canales (= 3)
+    18      uint16  formato de píxel (0 = BGR, 1 = RGB)
+    20      uint32  bytes por slot (cabecera + píxeles, múltiplo de 64)
+    24      uint32  offset del primer slot (= 64)
+    32      uint64  secuencia del último frame completo (0 = ninguno)
+
+    slot i (en 64 + i * bytes_por_slot)
+    0       uint64  secuencia del frame (0 = escribiéndose)
+    8       float64 timestamp (time.time() al escribir)
+    16      uint32  ancho
+    20      uint32  alto
+    32      ...     píxeles alto x ancho x canales, filas de arriba hacia abajo
+
+El frame ``n`` va al slot ``n % slots``. El escritor marca el slot con
+secuencia 0, copia los píxeles, escribe la secuencia y por último actualiza
+la secuencia global. El lector toma la secuencia global, lee ese slot y
+comprueba que su secuencia no haya cambiado; con ``copy=False`` devuelve
+una vista sin copia que sigue siendo válida mientras ``is_current(seq)``
+sea True (el escritor tarda ``slots - 1`` frames en volver a ese slot).
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+SHM_MAGIC = b"HTFB"
+SHM_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHIIHHII")
+FILE_HEADER_SIZE = 64
+LATEST_SEQ = struct.Struct("<Q")
+LATEST_SEQ_OFFSET = 32
+SLOT_HEADER = struct.Struct("<QdII")
+SLOT_HEADER_SIZE = 32
+
+PIXEL_FORMATS = {"bgr": 0, "rgb": 1}
+
+
+def default_path() -> str:
+    """``/dev/shm`` si existe (RAM), si no el directorio temporal del sistema."""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "hand_tracker_frames.shm")
+
+
+class SharedFrameWriter:
+    """
+    Escribe frames BGR en el ring mapeado en memoria.
+
+    Args:
+        path: Archivo del ring (se crea o se sobrescribe)
+        width, height: Tamaño de los frames en el ring; los frames de otro
+            tamaño se reducen al escribir
+        slots: Cantidad de slots del ring (mínimo 2)
+        pixel_format: "bgr" o "rgb"
+    """
+
+    def __init__(self, path: str, width: int, height: int, slots: int = 3,
+                 pixel_format: str = "bgr"):
+        self.path = path
+        self.width = int(width)
+        self.height = int(height)
+        self.channels = 3
+        self.slots = max(2, int(slots))
+        self.pixel_format = pixel_format
+        self._format_code = PIXEL_FORMATS[pixel_format]
+        frame_bytes = self.width * self.height * self.channels
+        self.slot_stride = -(-(SLOT_HEADER_SIZE + frame_bytes) // 64) * 64
+        size = FILE_HEADER_SIZE + self.slots * self.slot_stride
+
+        self._file = open(path, "w+b")
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        FILE_HEADER.pack_into(self._mm, 0, SHM_MAGIC, SHM_VERSION, self.slots, self.width,
+                              self.height, self.channels, self._format_code,
+                              self.slot_stride, FILE_HEADER_SIZE)
+        LATEST_SEQ.pack_into(self._mm, LATEST_SEQ_OFFSET, 0)
+        self._views = [
+            np.ndarray((self.height, self.width, self.channels), dtype=np.uint8, buffer=self._mm,
+                       offset=self._slot_offset(i) + SLOT_HEADER_SIZE)
+            for i in range(self.slots)
+        ]
+        self._resized = None
+        self.seq = 0
+
+    def _slot_offset(self, slot: int) -> int:
+        return FILE_HEADER_SIZE + slot * self.slot_stride
+
+    def write(self, frame_bgr: np.ndarray) -> int:
+        """
+        Escribe un frame (reduciéndolo / convirtiéndolo directo sobre el slot).
+
+        Returns:
+            Secuencia asignada al frame
+        """
+        seq = self.seq + 1
+        slot = seq % self.slots
+        offset = self._slot_offset(slot)
+        view = self._views[slot]
+        SLOT_HEADER.pack_into(self._mm, offset, 0, 0.0, self.width, self.height)
+
+        source = frame_bgr
+        same_size = frame_bgr.shape[0] == self.height and frame_bgr.shape[1] == self.width
+        if self._format_code == PIXEL_FORMATS["bgr"]:
+            if same_size:
+                np.copyto(view, frame_bgr)
+            else:
+                cv2.resize(frame_bgr, (self.width, self.height), dst=view, interpolation=cv2.INTER_AREA)
+        else:
+            if not same_size:
+                if self._resized is None:
+                    self._resized = np.empty_like(view)
+                cv2.resize(frame_bgr, (self.width, self.height), dst=self._resized,
+                           interpolation=cv2.INTER_AREA)
+                source = self._resized
+            cv2.cvtColor(source, cv2.COLOR_BGR2RGB, dst=view)
+
+        SLOT_HEADER.pack_into(self._mm, offset, seq, time.time(), self.width, self.height)
+        LATEST_SEQ.pack_into(self._mm, LATEST_SEQ_OFFSET, seq)
+        self.seq = seq
+        return seq
+
+    def close(self, unlink: bool = False):
+        self._views = []
+        self._resized = None
+        try:
+            self._mm.close()
+        except BufferError:
+            # Quedan vistas vivas fuera del escritor; el mapeo se libera con ellas
+            pass
+        self._file.close()
+        if unlink:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class SharedFrameReader:
+    """
+    Lector de referencia del ring (para pruebas y consumidores en Python).
+
+    Args:
+        path: Archivo creado por ``SharedFrameWriter``
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.slots, self.width, self.height, self.channels,
+         format_code, self.slot_stride, first_slot) = FILE_HEADER.unpack_from(self._mm, 0)
+        if magic != SHM_MAGIC or version != SHM_VERSION:
+            self.close()
+            raise ValueError(f"No es un ring de frames válido: {path}")
+        self.pixel_format = "rgb" if format_code == PIXEL_FORMATS["rgb"] else "bgr"
+        self._first_slot = first_slot
+        self._views = [
+            np.ndarray((self.height, self.width, self.channels), dtype=np.uint8, buffer=self._mm,
+                       offset=first_slot + i * self.slot_stride + SLOT_HEADER_SIZE)
+            for i in range(self.slots)
+        ]
+        self.torn_reads = 0
+
+    def latest_seq(self) -> int:
+        return LATEST_SEQ.unpack_from(self._mm, LATEST_SEQ_OFFSET)[0]
+
+    def _slot_seq(self, seq: int) -> int:
+        return LATEST_SEQ.unpack_from(self._mm, self._first_slot + (seq % self.slots) * self.slot_stride)[0]
+
+    def is_current(self, seq: int) -> bool:
+        """True si el slot del frame ``seq`` todavía no fue reescrito."""
+        return self._slot_seq(seq) == seq
+
+    def read_latest(self, copy: bool = False) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Returns:
+            Tupla (secuencia, timestamp, frame) del último frame completo, o
+            None si todavía no hay ninguno o se leyó a mitad de escritura
+        """
+        seq = self.latest_seq()
+        if seq == 0:
+            return None
+        offset = self._first_slot + (seq % self.slots) * self.slot_stride
+        slot_seq, timestamp, _, _ = SLOT_HEADER.unpack_from(self._mm, offset)
+        if slot_seq != seq:
+            self.torn_reads += 1
+            return None
+        frame = self._views[seq % self.slots]
+        if copy:
+            frame = frame.copy()
+            if not self.is_current(seq):
+                self.torn_reads += 1
+                return None
+        return seq, timestamp, frame
+
+    def close(self):
+        self._views = []
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+
+def main(argv=None):
+    """Punto de entrada del subcomando ``shm-reader``: lee el ring y reporta FPS / latencia."""
+    parser = argparse.ArgumentParser(
+        prog='hand_tracker.py shm-reader',
+        description='Lector de prueba del transporte de frames por memoria compartida'
+    )
+    parser.add_argument('path', nargs='?', default=default_path(),
+                        help=f'Archivo del ring (default: {default_path()})')
+    parser.add_argument('--show', action='store_true', help='Mostrar los frames en una ventana')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='Segundos entre reportes (default: 2)')
+    args = parser.parse_args(argv)
+
+    reader = SharedFrameReader(args.path)
+    print(f"[OK] Ring {args.path}: {reader.width}x{reader.height} {reader.pixel_format}, "
+          f"{reader.slots} slots")
+    last_seq = 0
+    frames = 0
+    latency_sum = 0.0
+    last_report = time.perf_counter()
+    try:
+        while True:
+            item = reader.read_latest(copy=args.show)
+            if item is not None and item[0] != last_seq:
+                seq, timestamp, frame = item
+                frames += 1
+                latency_sum += time.time() - timestamp
+                last_seq = seq
+                if args.show:
+                    if reader.pixel_format == "rgb":
+                        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                    cv2.imshow('Hand Tracker - memoria compartida', frame)
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+            else:
+                time.sleep(0.001)
+
+            now = time.perf_counter()
+            if now - last_report >= args.interval:
+                latency_ms = latency_sum / frames * 1000.0 if frames else 0.0
+                print(f"[STATS] {frames / (now - last_report):.1f} fps | latencia {latency_ms:.2f} ms | "
+                      f"secuencia {last_seq} | lecturas a mitad de escritura {reader.torn_reads}")
+                frames = 0
+                latency_sum = 0.0
+                last_report = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+        if args.show:
+            cv2.destroyAllWindows()
@@ -0,0 +1,196 @@
+"""
+Estabilización temporal de la letra predicha
+============================================
+``predict_letter`` clasifica cada frame por separado, así que la letra salta
+entre clases vecinas y Unity reacciona al ruido. ``LetterStabilizer`` guarda
+los últimos vectores de probabilidad (uno por clase de ``CLASSES``) en un
+ring buffer NumPy de tamaño fijo y decide una letra estable:
+
+    - puntaje por clase, según ``method``:
+        "ema"   media móvil exponencial (``alpha`` = peso del frame nuevo)
+        "mean"  promedio de la ventana
+        "vote"  fracción de frames de la ventana en que cada clase ganó
+    - histéresis: una letra nueva necesita puntaje >= ``min_confidence`` y
+      sostenerse ``hold_time`` segundos; la letra actual se conserva
+      mientras su puntaje siga >= ``exit_confidence`` y la mejor no la
+      supere por más de ``margin``
+    - sin mano durante ``release_time`` segundos la letra se libera ("")
+
+Cada cambio de letra estable genera un ``LetterEvent``. Si solo se conoce
+(letra, confianza), el vector se arma con la confianza en la clase predicha
+y el resto repartido entre las demás.
+"""
+
+import time
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+METHODS = ("ema", "mean", "vote")
+
+
+class LetterEvent(NamedTuple):
+    """Cambio de la letra estable."""
+    letter: str
+    previous: str
+    confidence: float
+    timestamp: float
+
+
+class LetterStabilizer:
+    """
+    Post-procesador en streaming de las predicciones de un tracker (o de una mano).
+
+    Args:
+        classes: Clases del modelo, en orden
+        method: "ema", "mean" o "vote"
+        window: Frames que guarda el ring buffer ("mean" / "vote")
+        alpha: Peso del frame nuevo en "ema"
+        hold_time: Segundos que una letra nueva debe sostenerse
+        min_confidence: Puntaje mínimo para adoptar una letra
+        exit_confidence: Puntaje bajo el cual se abandona la letra actual
+        margin: Ventaja que necesita otra letra para desplazar a la actual
+        release_time: Segundos sin mano tras los cuales se libera la letra
+    """
+
+    def __init__(self, classes: Sequence[str], method: str = "ema", window: int = 8,
+                 alpha: float = 0.35, hold_time: float = 0.25, min_confidence: float = 0.5,
+                 exit_confidence: float = 0.35, margin: float = 0.1, release_time: float = 0.3):
+        if method not in METHODS:
+            raise ValueError(f"Método de suavizado desconocido: {method} (opciones: {', '.join(METHODS)})")
+        self.classes = list(classes)
+        self._index = {label: i for i, label in enumerate(self.classes)}
+        self.method = method
+        self.window = max(1, int(window))
+        self.alpha = float(alpha)
+        self.hold_time = float(hold_time)
+        self.min_confidence = float(min_confidence)
+        self.exit_confidence = float(exit_confidence)
+        self.margin = float(margin)
+        self.release_time = float(release_time)
+
+        k = len(self.classes)
+        self._probabilities = np.zeros((self.window, k), dtype=np.float32)
+        self._winners = np.full(self.window, -1, dtype=np.int64)
+        self._ema = np.zeros(k, dtype=np.float32)
+        self._scores = np.zeros(k, dtype=np.float32)
+        self._vector = np.zeros(k, dtype=np.float32)
+        self._cursor = 0
+        self._count = 0
+
+        self.letter = ""
+        self.confidence = 0.0
+        self._candidate: Optional[str] = None
+        self._candidate_since = 0.0
+        self._last_hand = 0.0
+        self.events = 0
+
+    def reset(self):
+        self._cursor = 0
+        self._count = 0
+        self._winners.fill(-1)
+        self._candidate = None
+        self.letter = ""
+        self.confidence = 0.0
+
+    def keep_alive(self, now: Optional[float] = None):
+        """
+        Hay mano pero no una predicción nueva (frame reutilizado): no suma
+        evidencia ni avanza ``hold_time``, solo posterga la liberación.
+        """
+        self._last_hand = time.monotonic() if now is None else now
+
+    def _as_probabilities(self, letter: str, confidence: float) -> Optional[np.ndarray]:
+        index = self._index.get(letter)
+        if index is None:
+            return None
+        vector = self._vector
+        k = vector.shape[0]
+        vector.fill((1.0 - confidence) / (k - 1) if k > 1 else 0.0)
+        vector[index] = confidence
+        return vector
+
+    def _update_scores(self, probabilities: np.ndarray) -> np.ndarray:
+        row = self._cursor
+        self._probabilities[row] = probabilities
+        self._winners[row] = int(np.argmax(probabilities))
+        self._cursor = (row + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+
+        if self.method == "ema":
+            if self._count == 1:
+                self._ema[:] = probabilities
+            else:
+                self._ema *= 1.0 - self.alpha
+                self._ema += self.alpha * probabilities
+            return self._ema
+        if self.method == "mean":
+            np.mean(self._probabilities[:self._count], axis=0, out=self._scores)
+            return self._scores
+        winners = self._winners[self._winners >= 0]
+        self._scores[:] = np.bincount(winners, minlength=self._scores.shape[0]) / float(winners.size)
+        return self._scores
+
+    def update(self, letter: str, confidence: float, hand_detected: bool = True,
+               probabilities: Optional[np.ndarray] = None,
+               now: Optional[float] = None) -> Optional[LetterEvent]:
+        """
+        Incorpora la predicción de un frame.
+
+        Args:
+            letter, confidence: Predicción cruda del frame
+            hand_detected: False si no hubo mano en este frame
+            probabilities: Vector alineado con ``classes`` (opcional)
+            now: Timestamp monotónico (default: time.monotonic())
+
+        Returns:
+            ``LetterEvent`` si cambió la letra estable, o None. La letra y
+            confianza estables quedan en ``self.letter`` / ``self.confidence``.
+        """
+        now = time.monotonic() if now is None else now
+        if not hand_detected:
+            if self.letter and now - self._last_hand >= self.release_time:
+                return self._switch("", 0.0, now, clear=True)
+            return None
+        self._last_hand = now
+
+        if probabilities is None:
+            probabilities = self._as_probabilities(letter, confidence)
+            if probabilities is None:
+                # "?" (error del modelo): no aporta evidencia
+                return None
+
+        scores = self._update_scores(probabilities)
+        best = int(np.argmax(scores))
+        best_score = float(scores[best])
+        candidate = self.classes[best] if best_score >= self.min_confidence else ""
+
+        current = self._index.get(self.letter)
+        if current is not None and candidate != self.letter:
+            current_score = float(scores[current])
+            if current_score >= self.exit_confidence and best_score - current_score < self.margin:
+                candidate = self.letter
+
+        if candidate == self.letter:
+            if current is not None:
+                self._candidate = None
+                self.confidence = float(scores[current])
+            # Sin letra estable, un frame bajo el umbral no reinicia al candidato pendiente
+            return None
+
+        if candidate != self._candidate:
+            self._candidate = candidate
+            self._candidate_since = now
+        if now - self._candidate_since < self.hold_time:
+            return None
+        return self._switch(candidate, best_score if candidate else 0.0, now)
+
+    def _switch(self, letter: str, confidence: float, now: float, clear: bool = False) -> LetterEvent:
+        event = LetterEvent(letter, self.letter, confidence, now)
+        if clear:
+            self.reset()
+        self.letter = letter
+        self.confidence = confidence
+        self._candidate = None
+        self.events += 1
+        return event
@@ -0,0 +1,384 @@
+"""
+Distribución a múltiples suscriptores (asyncio)
+===============================================
+Un solo tracker (una cámara) alimenta a varios clientes: varias instancias
+de Unity, un registrador, etc. ``SubscriberHub`` corre un event loop de
+asyncio en un hilo propio con un endpoint UDP de control; el bucle de
+captura solo llama a ``publish`` (encola el envío en el loop con
+``call_soon_threadsafe`` y vuelve enseguida), nunca espera a la red.
+
+Datagramas de control (JSON, al puerto de control):
+
+    {"type": "subscribe", "channels": ["landmarks", "video"],
+     "rate": 30, "rates": {"video": 10}, "ports": {"video": 5006}}
+        Registra (o actualiza) al remitente. ``rate`` / ``rates`` son el
+        máximo de mensajes por segundo (global / por canal, 0 = sin límite).
+        Los datos van a la dirección de origen del datagrama salvo que
+        ``ports`` indique otro puerto para un canal.
+    {"type": "heartbeat"}
+        Mantiene viva la suscripción; sin heartbeats durante ``timeout``
+        segundos el suscriptor se da de baja.
+    {"type": "unsubscribe"}
+
+El puerto de control escucha solo en loopback salvo que se pida otra
+dirección (``--control-host``), ya que cualquiera que lo alcance puede
+suscribirse y recibir el video.
+
+El hub responde a cada uno con ``{"type": "ack", ...}`` (incluye
+``timeout`` para que el cliente sepa cada cuánto mandar heartbeats).
+
+Canales: ``landmarks`` (los mismos datagramas JSON / binarios que recibe
+Unity) y ``video`` (JPEG o sus fragmentos). Cuando un suscriptor supera su
+límite, el mensaje se descarta para él (gana siempre el más nuevo); si el
+buffer de envío del socket crece demasiado, se descartan mensajes en lugar
+de acumular latencia.
+
+Uso como cliente registrador:
+    python hand_tracker.py subscribe --channels landmarks --rate 5 -o sesion.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+# Solo local por defecto: escuchar en todas las interfaces expone el tracker
+# a cualquiera en la red (usar --control-host 0.0.0.0 a propósito)
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 5007
+CHANNELS = ("landmarks", "video")
+
+
+class Subscriber:
+    """Estado de un suscriptor: destinos por canal, límites y contadores."""
+
+    __slots__ = ("address", "destinations", "min_interval", "last_sent", "last_seen",
+                 "permanent", "sent", "rate_limited")
+
+    def __init__(self, address: Tuple[str, int], permanent: bool = False):
+        self.address = address
+        self.destinations: Dict[str, Tuple[str, int]] = {}
+        self.min_interval: Dict[str, float] = {}
+        self.last_sent: Dict[str, float] = {}
+        self.last_seen = 0.0
+        self.permanent = permanent
+        self.sent = 0
+        self.rate_limited = 0
+
+    def configure(self, channels: Iterable[str], rate: float = 0.0,
+                  rates: Optional[Dict[str, float]] = None,
+                  ports: Optional[Dict[str, int]] = None):
+        rates = rates or {}
+        ports = ports or {}
+        self.destinations = {}
+        self.min_interval = {}
+        for channel in channels:
+            if channel not in CHANNELS:
+                continue
+            port = ports.get(channel)
+            self.destinations[channel] = (self.address[0], int(port)) if port else self.address
+            limit = float(rates.get(channel, rate) or 0.0)
+            self.min_interval[channel] = 1.0 / limit if limit > 0 else 0.0
+
+
+class _ControlProtocol(asyncio.DatagramProtocol):
+    def __init__(self, hub: "SubscriberHub"):
+        self.hub = hub
+
+    def datagram_received(self, data: bytes, addr):
+        self.hub._handle_control(data, addr)
+
+    def error_received(self, exc):
+        # ICMP "port unreachable" de un suscriptor que se fue: lo limpia el timeout
+        pass
+
+
+class SubscriberHub:
+    """
+    Endpoint UDP que reparte los mensajes del tracker entre suscriptores.
+
+    Args:
+        host: Dirección local del puerto de control (default: solo loopback)
+        port: Puerto de control (los datos salen desde este mismo socket)
+        timeout: Segundos sin heartbeat tras los cuales se da de baja
+        max_buffer: Bytes pendientes en el socket a partir de los cuales se
+            descartan mensajes
+    """
+
+    def __init__(self, host: str = CONTROL_HOST, port: int = CONTROL_PORT,
+                 timeout: float = 5.0, max_buffer: int = 1 << 20):
+        self.host = host
+        self.port = int(port)
+        self.timeout = float(timeout)
+        self.max_buffer = int(max_buffer)
+        self._subscribers: Dict[Tuple[str, int], Subscriber] = {}
+        self._channel_counts: Dict[str, int] = {channel: 0 for channel in CHANNELS}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._thread = threading.Thread(target=self._run, name="HandTracker-subscribers", daemon=True)
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+        self.published = 0
+        self.sent = 0
+        self.rate_limited = 0
+        self.backpressure_drops = 0
+        self.expired = 0
+
+    # ------------------------------------------------------------------
+    # Hilo del event loop
+    # ------------------------------------------------------------------
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        print(f"[OK] Suscriptores: control UDP en {self.host}:{self.port}")
+        return self
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            self._transport, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+                lambda: _ControlProtocol(self), local_addr=(self.host, self.port)))
+            self.port = self._transport.get_extra_info("sockname")[1]
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+        sweeper = loop.create_task(self._sweep())
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            sweeper.cancel()
+            self._transport.close()
+            loop.run_until_complete(asyncio.gather(sweeper, return_exceptions=True))
+            loop.close()
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(max(0.1, self.timeout / 2.0))
+            now = self._loop.time()
+            for address, sub in list(self._subscribers.items()):
+                if not sub.permanent and now - sub.last_seen > self.timeout:
+                    self._remove(address)
+                    self.expired += 1
+                    print(f"[INFO] Suscriptor {address[0]}:{address[1]} sin heartbeat, dado de baja")
+
+    # ------------------------------------------------------------------
+    # Suscripciones (solo desde el hilo del loop)
+    # ------------------------------------------------------------------
+
+    def _add(self, sub: Subscriber, channels: Iterable[str], **limits):
+        self._remove(sub.address)
+        sub.configure(channels, **limits)
+        sub.last_seen = self._loop.time()
+        self._subscribers[sub.address] = sub
+        for channel in sub.destinations:
+            self._channel_counts[channel] += 1
+
+    def _remove(self, address) -> bool:
+        sub = self._subscribers.pop(address, None)
+        if sub is None:
+            return False
+        for channel in sub.destinations:
+            self._channel_counts[channel] -= 1
+        return True
+
+    def _reply(self, addr, **fields):
+        try:
+            self._transport.sendto(json.dumps({"type": "ack", **fields}).encode('utf-8'), addr)
+        except OSError:
+            pass
+
+    def _handle_control(self, data: bytes, addr):
+        try:
+            message = json.loads(data.decode('utf-8'))
+            kind = message.get("type")
+        except (ValueError, UnicodeDecodeError, AttributeError):
+            return
+        addr = (addr[0], addr[1])
+
+        if kind == "subscribe":
+            channels = message.get("channels") or list(CHANNELS)
+            try:
+                self._add(Subscriber(addr), channels,
+                          rate=float(message.get("rate", 0.0) or 0.0),
+                          rates={k: float(v) for k, v in (message.get("rates") or {}).items()},
+                          ports={k: int(v) for k, v in (message.get("ports") or {}).items()})
+            except (TypeError, ValueError):
+                return
+            sub = self._subscribers[addr]
+            print(f"[INFO] Nuevo suscriptor {addr[0]}:{addr[1]} -> {', '.join(sub.destinations)}")
+            self._reply(addr, of="subscribe", channels=list(sub.destinations), timeout=self.timeout)
+        elif kind == "heartbeat":
+            sub = self._subscribers.get(addr)
+            if sub is not None:
+                sub.last_seen = self._loop.time()
+            self._reply(addr, of="heartbeat", subscribed=sub is not None, timeout=self.timeout)
+        elif kind == "unsubscribe":
+            removed = self._remove(addr)
+            if removed:
+                print(f"[INFO] Suscriptor {addr[0]}:{addr[1]} dado de baja")
+            self._reply(addr, of="unsubscribe", subscribed=False)
+
+    def add_static(self, destinations: Dict[str, Tuple[str, int]]):
+        """
+        Registra un suscriptor fijo (sin heartbeat), p. ej. el ``--ip/--port``
+        de siempre, para que un Unity que no habla el protocolo de control
+        siga recibiendo datos.
+        """
+        destinations = {channel: dest for channel, dest in destinations.items() if dest is not None}
+        if not destinations:
+            return
+
+        def add():
+            sub = Subscriber(next(iter(destinations.values())), permanent=True)
+            self._add(sub, destinations, ports={channel: dest[1] for channel, dest in destinations.items()})
+
+        self._loop.call_soon_threadsafe(add)
+
+    # ------------------------------------------------------------------
+    # Publicación (desde cualquier hilo)
+    # ------------------------------------------------------------------
+
+    def has_subscribers(self, channel: str) -> bool:
+        return self._channel_counts.get(channel, 0) > 0
+
+    def publish(self, channel: str, payload: bytes):
+        """Encola un datagrama para todos los suscriptores del canal (no bloquea)."""
+        self.publish_many(channel, (payload,))
+
+    def publish_many(self, channel: str, datagrams: Sequence[bytes]):
+        """Como ``publish`` pero con varios datagramas que se envían juntos (fragmentos)."""
+        if self._channel_counts.get(channel, 0) <= 0 or self._loop is None:
+            return
+        self.published += 1
+        try:
+            self._loop.call_soon_threadsafe(self._fanout, channel, datagrams)
+        except RuntimeError:
+            # Loop ya cerrado (cleanup en curso)
+            pass
+
+    def _fanout(self, channel: str, datagrams: Sequence[bytes]):
+        transport = self._transport
+        if transport is None or transport.is_closing():
+            return
+        now = self._loop.time()
+        for sub in self._subscribers.values():
+            dest = sub.destinations.get(channel)
+            if dest is None:
+                continue
+            interval = sub.min_interval.get(channel, 0.0)
+            if interval and now - sub.last_sent.get(channel, -1e9) < interval:
+                sub.rate_limited += 1
+                self.rate_limited += 1
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                self.backpressure_drops += 1
+                continue
+            for datagram in datagrams:
+                transport.sendto(datagram, dest)
+            sub.last_sent[channel] = now
+            sub.sent += 1
+            self.sent += 1
+
+    def summary(self) -> str:
+        return (f"{len(self._subscribers)} suscriptores | {self.published} mensajes publicados | "
+                f"{self.sent} enviados | {self.rate_limited} descartados por límite | "
+                f"{self.backpressure_drops} por buffer lleno | {self.expired} vencidos")
+
+    def close(self):
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=1.0)
+
+
+# ----------------------------------------------------------------------
+# Cliente de ejemplo / registrador
+# ----------------------------------------------------------------------
+
+def main(argv=None):
+    """Punto de entrada del subcomando ``subscribe``: cliente registrador de landmarks."""
+    parser = argparse.ArgumentParser(
+        prog='hand_tracker.py subscribe',
+        description='Se suscribe a un tracker en marcha y registra los mensajes recibidos'
+    )
+    parser.add_argument('--ip', '-i', type=str, default='127.0.0.1',
+                        help='Dirección del tracker (default: 127.0.0.1)')
+    parser.add_argument('--control-port', type=int, default=CONTROL_PORT,
+                        help=f'Puerto de control del tracker (default: {CONTROL_PORT})')
+    parser.add_argument('--channels', nargs='+', choices=CHANNELS, default=['landmarks'],
+                        help='Canales a recibir (default: landmarks)')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='Máximo de mensajes por segundo por canal (default: 0 = sin límite)')
+    parser.add_argument('--output', '-o', type=str, default=None,
+                        help='Archivo JSONL donde registrar los landmarks (default: stdout)')
+    parser.add_argument('--duration', type=float, default=0.0,
+                        help='Segundos a registrar (default: 0 = hasta Ctrl+C)')
+    args = parser.parse_args(argv)
+
+    from hand_tracker import CLASSES, DYNAMIC_CLASSES
+    from wire_protocol import WIRE_VERSION, decode_landmark_datagram
+
+    server = (args.ip, args.control_port)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.5)
+    subscribe = json.dumps({"type": "subscribe", "channels": args.channels,
+                            "rate": args.rate}).encode('utf-8')
+    heartbeat = json.dumps({"type": "heartbeat"}).encode('utf-8')
+    sock.sendto(subscribe, server)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    heartbeat_interval = 1.0
+    last_heartbeat = time.monotonic()
+    start = last_heartbeat
+    counts = {"landmarks": 0, "video": 0}
+    try:
+        while not args.duration or time.monotonic() - start < args.duration:
+            now = time.monotonic()
+            if now - last_heartbeat >= heartbeat_interval:
+                sock.sendto(heartbeat, server)
+                last_heartbeat = now
+            try:
+                data, addr = sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            if data[:1] == b'{':
+                message = json.loads(data.decode('utf-8'))
+                if message.get("type") == "ack":
+                    heartbeat_interval = max(0.2, float(message.get("timeout", 5.0)) / 3.0)
+                    if message.get("subscribed") is False and message.get("of") == "heartbeat":
+                        sock.sendto(subscribe, server)
+                    continue
+                counts["landmarks"] += 1
+            elif data[:1] == bytes([WIRE_VERSION]):
+                message = decode_landmark_datagram(data, CLASSES + DYNAMIC_CLASSES)
+                message["landmarks"] = [float(v) for v in message["landmarks"]]
+                counts["landmarks"] += 1
+            else:
+                counts["video"] += 1
+                continue
+            message["received"] = time.time()
+            out.write(json.dumps(message) + "\n")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            sock.sendto(json.dumps({"type": "unsubscribe"}).encode('utf-8'), server)
+        except OSError:
+            pass
+        sock.close()
+        if out is not sys.stdout:
+            out.close()
+        print(f"[INFO] Recibidos: {counts['landmarks']} landmarks, {counts['video']} datagramas de video",
+              file=sys.stderr)
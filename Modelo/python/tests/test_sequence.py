@@ -0,0 +1,84 @@
+"""
+Fusión del modelo de secuencias con el clasificador estático, con modelos
+de secuencias que no declaran exactamente DYNAMIC_CLASSES.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from onnx import TensorProto, helper, numpy_helper  # noqa: E402
+
+import hand_tracker  # noqa: E402
+from hand_tracker import CLASSES, HandTracker  # noqa: E402
+from onnx_model import CLASS_LABELS_METADATA  # noqa: E402
+
+WINDOW = 4
+
+
+def _constant_sequence_model(path, labels, logits):
+    """Modelo (N, T, 63) -> softmax(logits) constante, con las etiquetas en los metadatos."""
+    k = len(labels)
+    nodes = [
+        helper.make_node("Reshape", ["x", "shape"], ["flat"]),
+        helper.make_node("MatMul", ["flat", "weights"], ["scores"]),
+        helper.make_node("Add", ["scores", "bias"], ["logits"]),
+        helper.make_node("Softmax", ["logits"], ["probs"], axis=-1),
+    ]
+    initializers = [
+        numpy_helper.from_array(np.array([0, -1], dtype=np.int64), "shape"),
+        numpy_helper.from_array(np.zeros((WINDOW * 63, k), dtype=np.float32), "weights"),
+        numpy_helper.from_array(np.asarray(logits, dtype=np.float32), "bias"),
+    ]
+    graph = helper.make_graph(
+        nodes, "sequence", [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["N", WINDOW, 63])],
+        [helper.make_tensor_value_info("probs", TensorProto.FLOAT, ["N", k])], initializers)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    entry = model.metadata_props.add()
+    entry.key = CLASS_LABELS_METADATA
+    entry.value = ",".join(labels)
+    onnx.save(model, str(path))
+    return str(path)
+
+
+def _tracker(sequence_model):
+    return HandTracker(camera_id=None, show_window=False, use_mediapipe=False, udp_video_port=None,
+                       smoothing="ema", sequence_model=sequence_model, onnx_warmup=0)
+
+
+@pytest.fixture(autouse=True)
+def _no_mediapipe(monkeypatch):
+    monkeypatch.setattr(hand_tracker.HandTracker, "_init_mediapipe", lambda self: None)
+
+
+@pytest.mark.parametrize("labels, logits, expected", [
+    (["_", "J"], [0.0, 5.0], "J"),
+    (["Z", "_", "J"], [5.0, 0.0, 0.0], "Z"),
+])
+def test_fused_vector_matches_classes(tmp_path, labels, logits, expected):
+    tracker = _tracker(_constant_sequence_model(tmp_path / "sequence.onnx", labels, logits))
+    try:
+        dynamic = [label for label in labels if label != "_"]
+        assert tracker.classes == CLASSES + dynamic
+        assert tracker.smoother.classes == tracker.classes
+        assert tracker._fused_buffer.shape == (len(tracker.classes),)
+
+        landmarks = np.random.default_rng(0).random(63, dtype=np.float32)
+        static = np.full(len(CLASSES), 1.0 / len(CLASSES), dtype=np.float32)
+        for _ in range(WINDOW):
+            letter, confidence, fused = tracker._fuse_sequence("A", float(static[0]), landmarks, static)
+
+        assert letter == expected
+        assert fused.shape == (len(tracker.classes),)
+        assert tracker.classes[int(np.argmax(fused))] == expected
+        assert fused.sum() == pytest.approx(1.0, abs=1e-5)
+    finally:
+        tracker.cleanup()
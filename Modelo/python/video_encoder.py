@@ -0,0 +1,242 @@
+"""
+Codificación de video fuera del bucle principal
+===============================================
+El resize + ``cv2.imencode`` del frame de preview cuesta varios ms y, hecho
+en el bucle de captura, frena la detección cada vez que toca mandar video.
+``VideoEncoderWorker`` lo mueve a un hilo propio: el bucle solo deja el
+frame en una ``LatestSlot`` (sin copiarlo; el llamador no debe modificarlo
+después) y el hilo codifica siempre el más reciente, descartando los que
+no alcanzó a procesar.
+
+``BitrateController`` ajusta ``video_jpeg_quality``, ``video_width`` y
+``video_fps`` del tracker una vez por ventana para acercarse a un bitrate
+objetivo (bytes/s) sin pasarse de un presupuesto de tiempo de codificación:
+
+    - codificación lenta: baja el ancho y, en el mínimo, los FPS
+    - bitrate alto: baja la calidad, después el ancho y después los FPS; si
+      se pasa por más de 1.5x baja primero el ancho en proporción (los bytes
+      crecen aprox. con el área)
+    - con margen en ambos: sube en orden inverso (FPS, ancho, calidad)
+      hasta los valores configurados al arrancar
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from metrics import STAGE_VIDEO_ENCODE
+from pipeline import LatestSlot
+
+
+class BitrateController:
+    """
+    Controlador escalonado de calidad / ancho / FPS del video.
+
+    Args:
+        quality, width, fps: Valores iniciales, que son también los máximos
+        target_bitrate: Bytes por segundo objetivo (0 = sin objetivo)
+        encode_budget_ms: Tiempo máximo promedio de codificación por frame
+            (0 = sin presupuesto)
+        min_quality, min_width, min_fps: Límites inferiores
+        window: Segundos entre ajustes
+    """
+
+    QUALITY_STEP = 5
+    WIDTH_STEP = 0.85
+    FPS_STEP = 0.8
+
+    def __init__(self, quality: int, width: int, fps: float,
+                 target_bitrate: float = 0.0, encode_budget_ms: float = 0.0,
+                 min_quality: int = 20, min_width: int = 160, min_fps: float = 2.0,
+                 window: float = 1.0):
+        self.max_quality = int(quality)
+        self.max_width = int(width)
+        self.max_fps = float(fps)
+        self.quality = self.max_quality
+        self.width = self.max_width
+        self.fps = self.max_fps
+        self.target_bitrate = float(target_bitrate)
+        self.encode_budget_ms = float(encode_budget_ms)
+        self.min_quality = min(int(min_quality), self.max_quality)
+        self.min_width = min(int(min_width), self.max_width)
+        self.min_fps = min(float(min_fps), self.max_fps) if self.max_fps > 0 else 0.0
+        self.window = float(window)
+        self.adjustments = 0
+
+    def _scale_width(self, factor: float) -> bool:
+        width = int(self.width * factor) // 16 * 16
+        width = max(self.min_width, min(self.max_width, width))
+        if factor > 1.0 and width <= self.width:
+            width = min(self.max_width, self.width + 16)
+        changed = width != self.width
+        self.width = width
+        return changed
+
+    def _scale_fps(self, factor: float) -> bool:
+        if self.max_fps <= 0:
+            return False
+        fps = max(self.min_fps, min(self.max_fps, self.fps * factor))
+        changed = abs(fps - self.fps) > 1e-6
+        self.fps = fps
+        return changed
+
+    def _step_quality(self, delta: int) -> bool:
+        quality = max(self.min_quality, min(self.max_quality, self.quality + delta))
+        changed = quality != self.quality
+        self.quality = quality
+        return changed
+
+    def update(self, bitrate: float, encode_ms: float) -> bool:
+        """
+        Ajusta los parámetros a partir de la última ventana.
+
+        Args:
+            bitrate: Bytes por segundo enviados en la ventana
+            encode_ms: Tiempo promedio de codificación por frame
+
+        Returns:
+            True si cambió algún parámetro
+        """
+        slow = self.encode_budget_ms > 0 and encode_ms > self.encode_budget_ms
+        heavy = self.target_bitrate > 0 and bitrate > self.target_bitrate * 1.05
+
+        changed = False
+        if slow:
+            changed = self._scale_width(self.WIDTH_STEP) or self._scale_fps(self.FPS_STEP)
+        elif heavy:
+            ratio = bitrate / self.target_bitrate
+            if ratio > 1.5:
+                factor = max(0.5, min(self.WIDTH_STEP, (1.0 / ratio) ** 0.5))
+                changed = (self._scale_width(factor) or self._step_quality(-self.QUALITY_STEP)
+                           or self._scale_fps(self.FPS_STEP))
+            else:
+                changed = (self._step_quality(-self.QUALITY_STEP) or self._scale_width(self.WIDTH_STEP)
+                           or self._scale_fps(self.FPS_STEP))
+        else:
+            rate_room = self.target_bitrate <= 0 or bitrate < self.target_bitrate * 0.75
+            time_room = self.encode_budget_ms <= 0 or encode_ms < self.encode_budget_ms * 0.6
+            if rate_room and time_room:
+                changed = (self._scale_fps(1.0 / self.FPS_STEP) or self._scale_width(1.0 / self.WIDTH_STEP)
+                           or self._step_quality(self.QUALITY_STEP))
+        if changed:
+            self.adjustments += 1
+        return changed
+
+
+class VideoEncoderWorker:
+    """
+    Hilo que codifica y envía el frame de video más reciente del tracker.
+
+    Usa ``tracker.encode_video_frame`` y ``tracker.send_encoded_video``, así
+    el formato en el cable (datagrama único o fragmentado) no cambia.
+
+    Args:
+        tracker: ``HandTracker`` ya inicializado
+        controller: ``BitrateController`` opcional
+        stats_interval: Segundos entre reportes ``[VIDEO]`` (0 desactiva)
+    """
+
+    def __init__(self, tracker, controller: Optional[BitrateController] = None,
+                 stats_interval: float = 5.0):
+        self.tracker = tracker
+        self.controller = controller
+        self.stats_interval = float(stats_interval)
+        self._slot = LatestSlot()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="HandTracker-video", daemon=True)
+
+        self.frames_encoded = 0
+        self.bytes_sent = 0
+        self.bitrate = 0.0
+        self.encode_ms = 0.0
+        self._window_bytes = 0
+        self._window_encode = 0.0
+        self._window_frames = 0
+        self._window_start = time.perf_counter()
+        self._last_report = self._window_start
+
+    @property
+    def dropped(self) -> int:
+        """Frames que llegaron mientras el hilo seguía codificando el anterior."""
+        return self._slot.dropped
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def submit(self, frame):
+        """Deja el frame para codificar (reemplaza al pendiente, si lo hay)."""
+        self._slot.put(frame)
+
+    def _loop(self):
+        tracker = self.tracker
+        clock = time.perf_counter
+        while not self._stop.is_set():
+            frame = self._slot.get(timeout=0.1)
+            if frame is not None:
+                t0 = clock()
+                try:
+                    buf = tracker.encode_video_frame(frame)
+                except Exception:
+                    buf = None
+                encode_seconds = clock() - t0
+                if buf is not None and tracker.send_encoded_video(buf):
+                    self.frames_encoded += 1
+                    self.bytes_sent += buf.size
+                    self._window_bytes += buf.size
+                    self._window_encode += encode_seconds
+                    self._window_frames += 1
+                    if tracker.metrics is not None:
+                        tracker.metrics.record(STAGE_VIDEO_ENCODE, encode_seconds)
+            self._end_window(clock())
+
+    def _end_window(self, now: float):
+        elapsed = now - self._window_start
+        window = self.controller.window if self.controller is not None else 1.0
+        if elapsed < window:
+            return
+        self.bitrate = self._window_bytes / elapsed
+        self.encode_ms = (self._window_encode / self._window_frames * 1000.0) if self._window_frames else 0.0
+        if self.controller is not None and self._window_frames:
+            if self.controller.update(self.bitrate, self.encode_ms):
+                self.tracker.video_jpeg_quality = self.controller.quality
+                self.tracker.video_width = self.controller.width
+                self.tracker.video_fps = self.controller.fps
+        self._window_bytes = 0
+        self._window_encode = 0.0
+        self._window_frames = 0
+        self._window_start = now
+
+        metrics = self.tracker.metrics
+        if metrics is not None:
+            for name, value in self.stats().items():
+                metrics.set_gauge(f"video_{name}", value)
+        if self.stats_interval > 0 and now - self._last_report >= self.stats_interval:
+            print(f"[VIDEO] {self.summary()}")
+            self._last_report = now
+
+    def stats(self) -> Dict[str, float]:
+        tracker = self.tracker
+        return {
+            "bitrate_bytes_per_s": self.bitrate,
+            "encode_ms": self.encode_ms,
+            "quality": tracker.video_jpeg_quality,
+            "width": tracker.video_width,
+            "fps_limit": tracker.video_fps,
+            "frames": self.frames_encoded,
+            "dropped": self.dropped,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        text = (f"{s['bitrate_bytes_per_s'] * 8 / 1000:.0f} kbit/s | codificación {s['encode_ms']:.1f} ms | "
+                f"calidad {s['quality']} | ancho {s['width']} | máx {s['fps_limit']:.1f} fps | "
+                f"{s['frames']} frames, {s['dropped']} descartados")
+        if self.controller is not None:
+            text += f" | {self.controller.adjustments} ajustes"
+        return text
+
+    def close(self):
+        self._stop.set()
+        self._slot.close()
+        self._thread.join(timeout=1.0)
@@ -0,0 +1,208 @@
+"""
+Transporte de video fragmentado
+===============================
+Con un solo datagrama por frame, cualquier JPEG mayor a ~65 KB se descarta y
+los datagramas grandes terminan fragmentados a nivel IP (si se pierde un
+fragmento se pierde todo). Este transporte parte cada JPEG en fragmentos del
+tamaño de la MTU, cada uno con una cabecera de 16 bytes (little-endian):
+
+    offset  tipo    campo
+    ------  ------  -----------------------------------------------
+    0       2s      magia b"VF" (un JPEG empieza con 0xFF 0xD8)
+    2       uint8   versión (= 1)
+    3       uint8   flags (reservado, 0)
+    4       uint32  id de frame (incrementa por frame)
+    8       uint16  índice de fragmento
+    10      uint16  cantidad de fragmentos
+    12      uint32  tamaño total del JPEG en bytes
+
+``VideoFragmenter.send`` envía los fragmentos con ``sendmsg`` (scatter/gather:
+cabecera + vista del buffer codificado, sin copiar el JPEG);
+``VideoFragmenter.fragments`` arma copias de los datagramas solo para el
+reparto a varios suscriptores (ver subscriber_hub.py). ``FrameReassembler`` es el
+receptor de referencia; ``OpenCVFrameReceiver`` en Unity implementa lo mismo.
+Un frame incompleto se descarta en cuanto llega un frame más nuevo o vence
+``timeout``.
+"""
+
+import socket
+import struct
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+FRAGMENT_MAGIC = b"VF"
+FRAGMENT_VERSION = 1
+FRAGMENT_HEADER = struct.Struct("<2sBBIHHI")
+FRAGMENT_HEADER_SIZE = FRAGMENT_HEADER.size  # 16
+
+# Cabeceras IPv4 (20) + UDP (8)
+IP_UDP_OVERHEAD = 28
+DEFAULT_MTU = 1500
+
+
+def max_payload(mtu: int = DEFAULT_MTU) -> int:
+    """Bytes de JPEG por fragmento para que el datagrama entre en la MTU."""
+    return max(64, int(mtu) - IP_UDP_OVERHEAD - FRAGMENT_HEADER_SIZE)
+
+
+class VideoFragmenter:
+    """
+    Envía frames codificados como fragmentos numerados.
+
+    Args:
+        sock: Socket UDP ya creado
+        address: Tupla (ip, puerto) destino
+        mtu: MTU del enlace (default: 1500)
+    """
+
+    def __init__(self, sock: socket.socket, address, mtu: int = DEFAULT_MTU):
+        self.sock = sock
+        self.address = address
+        self.payload_size = max_payload(mtu)
+        self.frame_id = 0
+        self._header = bytearray(FRAGMENT_HEADER_SIZE)
+        self._use_sendmsg = hasattr(sock, "sendmsg")
+        self.frames_sent = 0
+        self.fragments_sent = 0
+
+    def _next_frame(self, encoded):
+        """Vista del buffer, id de frame, cantidad de fragmentos y tamaño (None si no entra)."""
+        view = memoryview(np.ascontiguousarray(encoded).reshape(-1)) \
+            if isinstance(encoded, np.ndarray) else memoryview(encoded)
+        total = view.nbytes
+        count = -(-total // self.payload_size)
+        if count == 0 or count > 0xFFFF:
+            return None
+        frame_id = self.frame_id
+        self.frame_id = (frame_id + 1) & 0xFFFFFFFF
+        return view, frame_id, count, total
+
+    def fragments(self, encoded) -> List[bytes]:
+        """
+        Arma los datagramas de un frame sin enviarlos, para repartirlos a
+        varios destinos (``SubscriberHub.publish_many``). Cada datagrama es
+        una copia; para un solo destino usar ``send``.
+
+        Returns:
+            Lista de datagramas (vacía si el frame es demasiado grande)
+        """
+        frame = self._next_frame(encoded)
+        if frame is None:
+            return []
+        view, frame_id, count, total = frame
+        datagrams = []
+        for index in range(count):
+            start = index * self.payload_size
+            header = FRAGMENT_HEADER.pack(FRAGMENT_MAGIC, FRAGMENT_VERSION, 0, frame_id, index, count, total)
+            # Una sola copia por datagrama (cabecera + vista del fragmento)
+            datagrams.append(b"".join((header, view[start:start + self.payload_size])))
+        self.frames_sent += 1
+        self.fragments_sent += count
+        return datagrams
+
+    def send(self, encoded) -> int:
+        """
+        Envía un buffer codificado (array uint8 de ``cv2.imencode`` o bytes)
+        directamente desde el array: cabecera y vista del fragmento van
+        juntas en ``sendmsg``, sin copiar el JPEG.
+
+        Returns:
+            Cantidad de fragmentos enviados (0 si el frame es demasiado grande)
+        """
+        frame = self._next_frame(encoded)
+        if frame is None:
+            return 0
+        view, frame_id, count, total = frame
+        header = self._header
+        for index in range(count):
+            start = index * self.payload_size
+            chunk = view[start:start + self.payload_size]
+            FRAGMENT_HEADER.pack_into(header, 0, FRAGMENT_MAGIC, FRAGMENT_VERSION, 0,
+                                      frame_id, index, count, total)
+            if self._use_sendmsg:
+                self.sock.sendmsg([header, chunk], [], 0, self.address)
+            else:
+                self.sock.sendto(bytes(header) + chunk.tobytes(), self.address)
+        self.frames_sent += 1
+        self.fragments_sent += count
+        return count
+
+
+class FrameReassembler:
+    """
+    Receptor de referencia: arma frames a partir de fragmentos.
+
+    Args:
+        timeout: Segundos tras los cuales se descarta un frame incompleto
+    """
+
+    def __init__(self, timeout: float = 0.5):
+        self.timeout = float(timeout)
+        self._pending: Dict[int, dict] = {}
+        self._latest_completed = -1
+        self.completed = 0
+        self.dropped_incomplete = 0
+        self.invalid = 0
+
+    def _drop(self, frame_id: int):
+        self._pending.pop(frame_id, None)
+        self.dropped_incomplete += 1
+
+    def push(self, datagram: bytes, now: Optional[float] = None) -> Optional[bytes]:
+        """
+        Procesa un datagrama.
+
+        Returns:
+            El JPEG completo cuando llega su último fragmento, o None
+        """
+        now = time.monotonic() if now is None else now
+        if len(datagram) < FRAGMENT_HEADER_SIZE:
+            self.invalid += 1
+            return None
+        magic, version, _, frame_id, index, count, total = FRAGMENT_HEADER.unpack_from(datagram, 0)
+        if magic != FRAGMENT_MAGIC or version != FRAGMENT_VERSION or index >= count:
+            self.invalid += 1
+            return None
+
+        # Fragmento de un frame ya entregado o más viejo (duplicado / reordenado)
+        if self._latest_completed >= 0:
+            delta = (frame_id - self._latest_completed) & 0xFFFFFFFF
+            if delta == 0 or delta > 0x7FFFFFFF:
+                return None
+
+        for pending_id in [fid for fid, p in self._pending.items() if now - p["t"] > self.timeout]:
+            self._drop(pending_id)
+
+        entry = self._pending.get(frame_id)
+        if entry is None:
+            entry = {"t": now, "buffer": bytearray(total), "received": bytearray(count),
+                     "remaining": count, "count": count, "total": total}
+            self._pending[frame_id] = entry
+        elif entry["count"] != count or entry["total"] != total:
+            self.invalid += 1
+            return None
+
+        if entry["received"][index]:
+            return None
+        # Todos los fragmentos salvo el último tienen el mismo tamaño
+        payload = memoryview(datagram)[FRAGMENT_HEADER_SIZE:]
+        start = total - len(payload) if index == count - 1 else index * len(payload)
+        if start < 0 or start + len(payload) > total:
+            self.invalid += 1
+            return None
+        entry["buffer"][start:start + len(payload)] = payload
+        entry["received"][index] = 1
+        entry["remaining"] -= 1
+        if entry["remaining"]:
+            return None
+
+        # Completo: descartar los frames incompletos anteriores
+        del self._pending[frame_id]
+        for pending_id in [fid for fid in self._pending
+                           if ((frame_id - fid) & 0xFFFFFFFF) < 0x80000000]:
+            self._drop(pending_id)
+        self._latest_completed = frame_id
+        self.completed += 1
+        return bytes(entry["buffer"])
@@ -0,0 +1,179 @@
+"""
+Protocolo binario de landmarks (alternativa a JSON)
+===================================================
+Datagrama de tamaño fijo, little-endian, que ``send_to_unity`` arma sobre un
+buffer preasignado (sin dict ni string por frame).
+
+Especificación (versión 1, 272 bytes):
+
+    offset  tipo      campo
+    ------  --------  ----------------------------------------------------
+    0       uint8     version (= 1). JSON siempre empieza con '{' (0x7B),
+                      así el receptor distingue ambos formatos por el 1er byte
+    1       uint8     flags: bit 0 = mano detectada, bit 1 = sigue sección
+                      de manos
+    2       int16     índice en CLASSES + DYNAMIC_CLASSES (-1 = sin predicción / '?')
+    4       uint32    número de secuencia (incrementa en cada datagrama)
+    8       float64   timestamp monotónico del emisor (segundos)
+    16      float32   confianza [0, 1]
+    20      float32[63]  landmarks x0, y0, z0, ..., x20, y20, z20
+                      (ceros si no hay mano)
+
+Con varias manos (``max_num_hands > 1``) los campos anteriores son los de
+la mano principal y, con el bit 1 de flags, sigue una sección opcional:
+
+    272     uint8     cantidad de manos K
+    273     3 bytes   relleno
+    276     K bloques de 264 bytes:
+            uint16    ID estable de la mano
+            uint8     lateralidad (0 = izquierda, 1 = derecha, 255 = ?)
+            uint8     relleno
+            int16     índice de la clase
+            2 bytes   relleno
+            float32   confianza
+            float32[63]  landmarks
+
+Un receptor que solo lee los primeros 272 bytes sigue funcionando igual.
+
+El lado Unity (``OpenCVConnector.TryApplyPacket``) implementa el mismo
+formato con ``BitConverter``.
+"""
+
+import struct
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+WIRE_VERSION = 1
+FLAG_HAND_DETECTED = 0x01
+FLAG_HANDS_SECTION = 0x02
+
+NUM_LANDMARK_VALUES = 63
+
+HEADER_STRUCT = struct.Struct("<BBhIdf")
+HEADER_SIZE = HEADER_STRUCT.size  # 20
+DATAGRAM_SIZE = HEADER_SIZE + NUM_LANDMARK_VALUES * 4  # 272
+
+HANDS_HEADER_STRUCT = struct.Struct("<B3x")
+HAND_STRUCT = struct.Struct("<HBxhxxf")
+HAND_BLOCK_SIZE = HAND_STRUCT.size + NUM_LANDMARK_VALUES * 4  # 264
+HANDEDNESS_UNKNOWN = 255
+
+
+class BinaryLandmarkEncoder:
+    """
+    Codificador reutilizable: un solo buffer para todos los frames.
+
+    ``encode`` devuelve un ``memoryview`` sobre el buffer interno, válido hasta
+    la siguiente llamada (se puede pasar directo a ``socket.sendto``).
+
+    Args:
+        classes: Clases del modelo, en orden
+        max_hands: Manos que caben en la sección de manos (1 = sin sección)
+    """
+
+    def __init__(self, classes: Sequence[str], max_hands: int = 1):
+        self._class_index = {label: i for i, label in enumerate(classes)}
+        self.max_hands = max(1, int(max_hands))
+        size = DATAGRAM_SIZE
+        if self.max_hands > 1:
+            size += HANDS_HEADER_STRUCT.size + self.max_hands * HAND_BLOCK_SIZE
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._base_view = self._view[:DATAGRAM_SIZE]
+        self._landmarks = np.frombuffer(self._buffer, dtype="<f4",
+                                        count=NUM_LANDMARK_VALUES, offset=HEADER_SIZE)
+        self.sequence = 0
+
+    def encode(self, landmarks, letter: str, confidence: float,
+               hand_detected: bool, timestamp: float, hands=None) -> memoryview:
+        """
+        Args:
+            hands: Lista opcional de ``multi_hand.HandResult`` para la
+                sección de manos (se ignora con ``max_hands == 1``)
+        """
+        flags = FLAG_HAND_DETECTED if hand_detected else 0
+        with_hands = bool(hands) and self.max_hands > 1
+        if with_hands:
+            flags |= FLAG_HANDS_SECTION
+        class_index = self._class_index.get(letter, -1)
+        HEADER_STRUCT.pack_into(self._buffer, 0, WIRE_VERSION, flags, class_index,
+                                self.sequence, timestamp, confidence)
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+
+        if hand_detected and len(landmarks) == NUM_LANDMARK_VALUES:
+            self._landmarks[:] = landmarks
+        else:
+            self._landmarks.fill(0.0)
+        if not with_hands:
+            return self._base_view
+
+        from multi_hand import HANDEDNESS_CODES
+        count = min(len(hands), self.max_hands)
+        offset = DATAGRAM_SIZE
+        HANDS_HEADER_STRUCT.pack_into(self._buffer, offset, count)
+        offset += HANDS_HEADER_STRUCT.size
+        for hand in hands[:count]:
+            HAND_STRUCT.pack_into(self._buffer, offset, hand.id & 0xFFFF,
+                                  HANDEDNESS_CODES.get(hand.handedness, HANDEDNESS_UNKNOWN),
+                                  self._class_index.get(hand.letter, -1), hand.confidence)
+            block = np.frombuffer(self._buffer, dtype="<f4", count=NUM_LANDMARK_VALUES,
+                                  offset=offset + HAND_STRUCT.size)
+            block[:] = hand.landmarks
+            offset += HAND_BLOCK_SIZE
+        return self._view[:offset]
+
+
+def decode_landmark_datagram(data: bytes, classes: Optional[Sequence[str]] = None) -> dict:
+    """
+    Decodifica un datagrama binario al mismo dict que produce el formato JSON
+    (más ``sequence`` y ``class_index``). Pensado para pruebas y herramientas.
+
+    Raises:
+        ValueError: si el tamaño o la versión no corresponden.
+    """
+    if len(data) < DATAGRAM_SIZE:
+        raise ValueError(f"Datagrama demasiado corto: {len(data)} bytes")
+    version, flags, class_index, sequence, timestamp, confidence = HEADER_STRUCT.unpack_from(data, 0)
+    if version != WIRE_VERSION:
+        raise ValueError(f"Versión de protocolo no soportada: {version}")
+
+    hand_detected = bool(flags & FLAG_HAND_DETECTED)
+    landmarks: List[float] = []
+    if hand_detected:
+        landmarks = np.frombuffer(data, dtype="<f4", count=NUM_LANDMARK_VALUES,
+                                  offset=HEADER_SIZE).tolist()
+
+    letter = ""
+    if class_index >= 0 and classes is not None and class_index < len(classes):
+        letter = classes[class_index]
+
+    message = {
+        "hand_detected": hand_detected,
+        "landmarks": landmarks,
+        "letter": letter,
+        "confidence": confidence,
+        "timestamp": timestamp,
+        "sequence": sequence,
+        "class_index": class_index,
+    }
+
+    if flags & FLAG_HANDS_SECTION and len(data) >= DATAGRAM_SIZE + HANDS_HEADER_STRUCT.size:
+        (count,) = HANDS_HEADER_STRUCT.unpack_from(data, DATAGRAM_SIZE)
+        offset = DATAGRAM_SIZE + HANDS_HEADER_STRUCT.size
+        if len(data) < offset + count * HAND_BLOCK_SIZE:
+            raise ValueError(f"Sección de manos incompleta: {len(data)} bytes para {count} manos")
+        hands = []
+        for _ in range(count):
+            hand_id, side, index, hand_confidence = HAND_STRUCT.unpack_from(data, offset)
+            hands.append({
+                "id": hand_id,
+                "handedness": {0: "Left", 1: "Right"}.get(side, ""),
+                "landmarks": np.frombuffer(data, dtype="<f4", count=NUM_LANDMARK_VALUES,
+                                           offset=offset + HAND_STRUCT.size).tolist(),
+                "letter": classes[index] if classes is not None and 0 <= index < len(classes) else "",
+                "confidence": hand_confidence,
+            })
+            offset += HAND_BLOCK_SIZE
+        message["hands"] = hands
+    return message
@@ -1,6 +1,8 @@
 using UnityEngine;
 using System;
 using System.Collections.Concurrent;
+using System.IO;
+using System.IO.MemoryMappedFiles;
 using System.Net;
 using System.Net.Sockets;
 using System.Threading;
@@ -14,6 +16,13 @@ public class OpenCVFrameReceiver : MonoBehaviour
     [Tooltip("Local address to bind. Use 0.0.0.0 to listen on all interfaces")]
     public string listenAddress = "0.0.0.0";
 
+    [Header("Shared Memory (same machine)")]
+    [Tooltip("Read raw frames from the ring written by hand_tracker.py --video-transport shm instead of UDP JPEGs")]
+    public bool useSharedMemory = false;
+
+    [Tooltip("Ring file written by Python (--video-shm-path)")]
+    public string sharedMemoryPath = "/dev/shm/hand_tracker_frames.shm";
+
     [Header("Runtime")]
     public Texture2D currentTexture;
 
@@ -22,14 +31,120 @@ public class OpenCVFrameReceiver : MonoBehaviour
     private volatile bool _isReceiving;
     private readonly ConcurrentQueue<byte[]> _pendingFrames = new ConcurrentQueue<byte[]>();
 
+    // Fragmented transport (see Modelo/python/video_transport.py):
+    // 16-byte header "VF" | version u8 | flags u8 | frame_id u32 | index u16 | count u16 | total u32
+    private const int FragmentHeaderSize = 16;
+    private const byte FragmentVersion = 1;
+    private const int FragmentTimeoutMs = 500;
+
+    private uint _fragFrameId;
+    private bool _fragActive;
+    private byte[] _fragBuffer;
+    private bool[] _fragReceived;
+    private int _fragRemaining;
+    private int _fragStartTick;
+    private long _lastCompletedFrameId = -1;
+
+    // Shared-memory ring (see Modelo/python/shm_transport.py)
+    private const int ShmHeaderSize = 64;
+    private const int ShmSlotHeaderSize = 32;
+    private const long ShmLatestSeqOffset = 32;
+    private MemoryMappedFile _shmFile;
+    private MemoryMappedViewAccessor _shmView;
+    private int _shmSlots, _shmWidth, _shmHeight, _shmStride, _shmFirstSlot;
+    private ulong _shmLastSeq;
+    private float _shmNextOpenAttempt;
+    private byte[] _shmRaw;
+    private byte[] _shmFlipped;
+
     private void OnEnable()
     {
-        StartUdp();
+        if (!useSharedMemory)
+            StartUdp();
     }
 
     private void OnDisable()
     {
         StopUdp();
+        CloseSharedMemory();
+    }
+
+    private bool TryOpenSharedMemory()
+    {
+        if (_shmView != null) return true;
+        if (Time.unscaledTime < _shmNextOpenAttempt) return false;
+        _shmNextOpenAttempt = Time.unscaledTime + 1f;
+        if (!File.Exists(sharedMemoryPath)) return false;
+
+        try
+        {
+            var stream = new FileStream(sharedMemoryPath, FileMode.Open, FileAccess.Read, FileShare.ReadWrite);
+            _shmFile = MemoryMappedFile.CreateFromFile(stream, null, 0, MemoryMappedFileAccess.Read,
+                HandleInheritability.None, false);
+            _shmView = _shmFile.CreateViewAccessor(0, 0, MemoryMappedFileAccess.Read);
+
+            var magic = new byte[4];
+            _shmView.ReadArray(0, magic, 0, 4);
+            ushort version = _shmView.ReadUInt16(4);
+            ushort format = _shmView.ReadUInt16(18);
+            if (magic[0] != 'H' || magic[1] != 'T' || magic[2] != 'F' || magic[3] != 'B' || version != 1 || format != 1)
+            {
+                Debug.LogWarning("[OpenCVFrameReceiver] Shared memory ring is not a v1 RGB ring (use --video-shm-format rgb)");
+                CloseSharedMemory();
+                return false;
+            }
+            _shmSlots = _shmView.ReadUInt16(6);
+            _shmWidth = (int)_shmView.ReadUInt32(8);
+            _shmHeight = (int)_shmView.ReadUInt32(12);
+            _shmStride = (int)_shmView.ReadUInt32(20);
+            _shmFirstSlot = (int)_shmView.ReadUInt32(24);
+            _shmRaw = new byte[_shmWidth * _shmHeight * 3];
+            _shmFlipped = new byte[_shmRaw.Length];
+            _shmLastSeq = 0;
+            return true;
+        }
+        catch (Exception ex)
+        {
+            Debug.LogWarning($"[OpenCVFrameReceiver] Failed to open shared memory {sharedMemoryPath} - {ex.Message}");
+            CloseSharedMemory();
+            return false;
+        }
+    }
+
+    private void CloseSharedMemory()
+    {
+        try { _shmView?.Dispose(); } catch { }
+        try { _shmFile?.Dispose(); } catch { }
+        _shmView = null;
+        _shmFile = null;
+    }
+
+    // Copies the latest complete frame out of the ring; false if none is new or it was overwritten mid-read.
+    private bool ReadSharedMemoryFrame()
+    {
+        if (!TryOpenSharedMemory()) return false;
+
+        ulong seq = _shmView.ReadUInt64(ShmLatestSeqOffset);
+        if (seq == 0 || seq == _shmLastSeq) return false;
+        if (seq < _shmLastSeq)
+        {
+            // Python restarted and recreated the ring: reopen to pick up the new size
+            CloseSharedMemory();
+            _shmNextOpenAttempt = 0f;
+            return false;
+        }
+
+        long slot = _shmFirstSlot + (long)(seq % (ulong)_shmSlots) * _shmStride;
+        if (_shmView.ReadUInt64(slot) != seq) return false;
+        _shmView.ReadArray(slot + ShmSlotHeaderSize, _shmRaw, 0, _shmRaw.Length);
+        if (_shmView.ReadUInt64(slot) != seq) return false;
+        _shmLastSeq = seq;
+
+        // Rows come top-down; Unity textures are bottom-up
+        int rowBytes = _shmWidth * 3;
+        for (int y = 0; y < _shmHeight; y++)
+            Buffer.BlockCopy(_shmRaw, y * rowBytes, _shmFlipped, (_shmHeight - 1 - y) * rowBytes, rowBytes);
+        return true;
     }
 
     private void StartUdp()
@@ -85,8 +200,20 @@ public class OpenCVFrameReceiver : MonoBehaviour
             try
             {
                 byte[] data = _udp.Receive(ref remote);
-                if (data != null && data.Length > 0)
+                if (data == null || data.Length == 0)
+                    continue;
+
+                if (IsFragment(data))
+                {
+                    byte[] frame = PushFragment(data);
+                    if (frame != null)
+                        _pendingFrames.Enqueue(frame);
+                }
+                else
+                {
+                    // Single-datagram JPEG (starts with 0xFF 0xD8)
                     _pendingFrames.Enqueue(data);
+                }
             }
             catch (SocketException)
             {
@@ -103,8 +230,70 @@ public class OpenCVFrameReceiver : MonoBehaviour
         }
     }
 
+    private static bool IsFragment(byte[] data)
+    {
+        return data.Length > FragmentHeaderSize && data[0] == (byte)'V' && data[1] == (byte)'F'
+               && data[2] == FragmentVersion;
+    }
+
+    // Returns the complete JPEG when its last fragment arrives, otherwise null.
+    // An incomplete frame is dropped as soon as a newer frame starts or it times out.
+    private byte[] PushFragment(byte[] data)
+    {
+        uint frameId = BitConverter.ToUInt32(data, 4);
+        int index = BitConverter.ToUInt16(data, 8);
+        int count = BitConverter.ToUInt16(data, 10);
+        int total = (int)BitConverter.ToUInt32(data, 12);
+        int payload = data.Length - FragmentHeaderSize;
+        if (index >= count || total <= 0) return null;
+
+        // Fragment of a frame older than the last one delivered
+        if (_lastCompletedFrameId >= 0 && (int)(frameId - (uint)_lastCompletedFrameId) <= 0)
+            return null;
+
+        bool expired = _fragActive && unchecked(Environment.TickCount - _fragStartTick) > FragmentTimeoutMs;
+        if (!_fragActive || frameId != _fragFrameId || expired)
+        {
+            if (_fragActive && frameId != _fragFrameId && (int)(frameId - _fragFrameId) < 0)
+                return null;
+            _fragFrameId = frameId;
+            _fragActive = true;
+            _fragBuffer = new byte[total];
+            _fragReceived = new bool[count];
+            _fragRemaining = count;
+            _fragStartTick = Environment.TickCount;
+        }
+        if (_fragReceived.Length != count || _fragBuffer.Length != total || _fragReceived[index])
+            return null;
+
+        // Every fragment except the last has the same payload size
+        int start = index == count - 1 ? total - payload : index * payload;
+        if (start < 0 || start + payload > total) return null;
+
+        Buffer.BlockCopy(data, FragmentHeaderSize, _fragBuffer, start, payload);
+        _fragReceived[index] = true;
+        if (--_fragRemaining > 0) return null;
+
+        _fragActive = false;
+        _lastCompletedFrameId = frameId;
+        byte[] frame = _fragBuffer;
+        _fragBuffer = null;
+        _fragReceived = null;
+        return frame;
+    }
+
     private void Update()
     {
+        if (useSharedMemory)
+        {
+            if (!ReadSharedMemoryFrame()) return;
+            if (currentTexture == null || currentTexture.width != _shmWidth || currentTexture.height != _shmHeight)
+                currentTexture = new Texture2D(_shmWidth, _shmHeight, TextureFormat.RGB24, false);
+            currentTexture.LoadRawTextureData(_shmFlipped);
+            currentTexture.Apply(false);
+            return;
+        }
+
         // Apply only the latest frame available this tick
         byte[] latest = null;
         while (_pendingFrames.TryDequeue(out var frame))
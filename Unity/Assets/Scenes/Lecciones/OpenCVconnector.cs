@@ -161,26 +161,69 @@ public class OpenCVConnector : MonoBehaviour
         }
     }
 
-    private void TryApplyPacket(byte[] packet)
+    // Binary wire format (Python --wire-format binary, see wire_protocol.py).
+    // Little-endian: u8 version, u8 flags, i16 class index, u32 sequence,
+    // f64 timestamp, f32 confidence, f32[63] landmarks = 272 bytes.
+    private const byte BinaryWireVersion = 1;
+    private const int BinaryHeaderSize = 20;
+    private const int BinaryLandmarkCount = 63;
+    private const int BinaryDatagramSize = BinaryHeaderSize + BinaryLandmarkCount * 4;
+
+    // Must match CLASSES + DYNAMIC_CLASSES in hand_tracker.py
+    private static readonly string[] BinaryClasses =
     {
-        string json;
-        try
-        {
-            json = Encoding.UTF8.GetString(packet);
-        }
-        catch
+        "A", "B", "C", "D", "E", "F", "G", "H", "I", "K",
+        "L", "M", "N", "O", "P", "Q", "R", "T", "U", "V",
+        "W", "X", "Y", "J", "Z"
+    };
+
+    private static HandTrackerMessage ParseBinaryPacket(byte[] packet)
+    {
+        if (packet.Length < BinaryDatagramSize || packet[0] != BinaryWireVersion || !BitConverter.IsLittleEndian)
+            return null;
+
+        var msg = new HandTrackerMessage();
+        msg.hand_detected = (packet[1] & 0x01) != 0;
+        short classIndex = BitConverter.ToInt16(packet, 2);
+        msg.letter = (classIndex >= 0 && classIndex < BinaryClasses.Length) ? BinaryClasses[classIndex] : "";
+        msg.timestamp = BitConverter.ToDouble(packet, 8);
+        msg.confidence = BitConverter.ToSingle(packet, 16);
+
+        if (msg.hand_detected)
         {
-            return;
+            msg.landmarks = new float[BinaryLandmarkCount];
+            Buffer.BlockCopy(packet, BinaryHeaderSize, msg.landmarks, 0, BinaryLandmarkCount * 4);
         }
+        return msg;
+    }
 
+    private void TryApplyPacket(byte[] packet)
+    {
         HandTrackerMessage msg;
-        try
+        if (packet.Length > 0 && packet[0] == BinaryWireVersion)
         {
-            msg = JsonUtility.FromJson<HandTrackerMessage>(json);
+            msg = ParseBinaryPacket(packet);
         }
-        catch
+        else
         {
-            return;
+            string json;
+            try
+            {
+                json = Encoding.UTF8.GetString(packet);
+            }
+            catch
+            {
+                return;
+            }
+
+            try
+            {
+                msg = JsonUtility.FromJson<HandTrackerMessage>(json);
+            }
+            catch
+            {
+                return;
+            }
         }
 
         if (msg == null) return;